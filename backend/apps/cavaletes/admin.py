@@ -1,6 +1,12 @@
 from django.contrib import admin
+from django.urls import reverse
+from django.utils.html import format_html
+from apps.core.admin import LargeTableAdminMixin
 from .models import Cavalete, Slot
 
+# Acima disso o cavalete mostra um resumo com link em vez do inline de slots
+SLOT_INLINE_LIMIT = 100
+
 
 class SlotInline(admin.TabularInline):
     """
@@ -13,29 +19,83 @@ class SlotInline(admin.TabularInline):
     readonly_fields = ["updated_at"]
     ordering = ["side", "number"]
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("cavalete")
+
 
 @admin.register(Cavalete)
-class CavaleteAdmin(admin.ModelAdmin):
+class CavaleteAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """
     Admin para gestão de Cavaletes.
+    Cavaletes com mais de SLOT_INLINE_LIMIT slots não carregam o inline:
+    mostram os contadores e um link para a lista de slots filtrada.
     """
 
-    list_display = ["code", "type", "status", "user", "created_at"]
+    list_display = [
+        "code",
+        "type",
+        "status",
+        "user",
+        "slots_total",
+        "slots_completed",
+        "created_at",
+    ]
     list_filter = ["type", "status", "created_at"]
-    search_fields = ["code", "user__username", "user__first_name"]
+    search_fields = ["code__startswith", "user__username__startswith"]
+    list_select_related = ["user"]
     autocomplete_fields = ["user"]
     inlines = [SlotInline]
 
     fieldsets = (
         (None, {"fields": ("code", "type", "status")}),
         ("Responsável", {"fields": ("user",)}),
+        (
+            "Progresso",
+            {
+                "fields": (
+                    "slots_total",
+                    "slots_auditing",
+                    "slots_completed",
+                    "slots_link",
+                )
+            },
+        ),
     )
+    readonly_fields = [
+        "slots_total",
+        "slots_auditing",
+        "slots_completed",
+        "slots_link",
+    ]
+
+    def get_inlines(self, request, obj):
+        if obj is not None and obj.slots_total > SLOT_INLINE_LIMIT:
+            return []
+        return super().get_inlines(request, obj)
+
+    @admin.display(description="Slots")
+    def slots_link(self, obj):
+        if obj.pk is None:
+            return "-"
+        url = reverse("admin:cavaletes_slot_changelist")
+        return format_html(
+            '<a href="{}?cavalete__id__exact={}">Ver os {} slots</a>',
+            url,
+            obj.pk,
+            obj.slots_total,
+        )
+
+    def save_related(self, request, form, formsets, change):
+        """Slots editados no inline: recalcula os contadores do cavalete."""
+        super().save_related(request, form, formsets, change)
+        Cavalete.objects.filter(pk=form.instance.pk).recount_slots()
 
 
 @admin.register(Slot)
-class SlotAdmin(admin.ModelAdmin):
+class SlotAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """
     Admin para visualização de Slots (geralmente acessado via Cavalete).
+    Alterações pelo admin recalculam os contadores do cavalete.
     """
 
     list_display = [
@@ -47,5 +107,20 @@ class SlotAdmin(admin.ModelAdmin):
         "status",
     ]
     list_filter = ["status", "side", "cavalete__status"]
-    search_fields = ["cavalete__code", "product_code", "product_description"]
-    ordering = ["cavalete", "side", "number"]
+    search_fields = ["cavalete__code__startswith", "product_code__startswith"]
+    list_select_related = ["cavalete"]
+    # Mesma ordem do índice único (cavalete, side, number)
+    ordering = ["cavalete_id", "side", "number"]
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        Cavalete.objects.filter(pk=obj.cavalete_id).recount_slots()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        Cavalete.objects.filter(pk=obj.cavalete_id).recount_slots()
+
+    def delete_queryset(self, request, queryset):
+        cavalete_ids = list(queryset.values_list("cavalete_id", flat=True))
+        super().delete_queryset(request, queryset)
+        Cavalete.objects.filter(pk__in=cavalete_ids).recount_slots()
@@ -0,0 +1,31 @@
+import django_filters
+
+from .models import Cavalete
+
+
+class CavaleteFilter(django_filters.FilterSet):
+    """
+    Filtros da listagem de cavaletes.
+    almost_done / remaining_lte usam os contadores de progresso (índice em
+    slots_total - slots_completed), sem agregar slots.
+    """
+
+    almost_done = django_filters.BooleanFilter(method="filter_almost_done")
+    remaining_lte = django_filters.NumberFilter(
+        method="filter_remaining_lte", min_value=0
+    )
+
+    class Meta:
+        model = Cavalete
+        fields = ["status"]
+
+    def filter_almost_done(self, queryset, name, value):
+        if value is None:
+            return queryset
+        almost_done = queryset.almost_done()
+        if value:
+            return almost_done
+        return queryset.exclude(pk__in=almost_done.values("pk"))
+
+    def filter_remaining_lte(self, queryset, name, value):
+        return queryset.remaining_lte(int(value))
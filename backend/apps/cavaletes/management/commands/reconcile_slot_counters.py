@@ -0,0 +1,53 @@
+"""Recalcula os contadores de progresso (slots_*) dos cavaletes."""
+
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+
+from apps.cavaletes.models import Cavalete
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Confere slots_total/slots_auditing/slots_completed com os slots e "
+        "corrige os cavaletes divergentes em lotes (um UPDATE por lote)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recalcula todos os cavaletes, sem conferir a divergência antes.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas informa quantos cavaletes estão divergentes.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Cavaletes por UPDATE (padrão: {DEFAULT_BATCH_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        queryset = Cavalete.objects.order_by("pk")
+        if not options["all"]:
+            queryset = queryset.with_stale_counters()
+
+        if options["dry_run"]:
+            count = queryset.count()
+            self.stdout.write(f"{count} cavaletes com contadores divergentes.")
+            return
+
+        ids = queryset.values_list("pk", flat=True).iterator()
+        fixed = 0
+        while batch := list(islice(ids, options["batch_size"])):
+            fixed += Cavalete.objects.filter(pk__in=batch).recount_slots()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{fixed} cavaletes com contadores recalculados.")
+        )
@@ -6,6 +6,9 @@ from django.utils.translation import gettext_lazy as _
 CAVALETE_CREATED = _("Cavalete criado com sucesso.")
 CAVALETE_NOT_FOUND = _("Cavalete não encontrado.")
 CAVALETE_ASSIGNED = _("Cavalete atribuído com sucesso.")
+IMPORT_FILE_REQUIRED = _("Envie a planilha no campo 'file'.")
+EXPORT_INVALID_FORMAT = _("Formato inválido. Use output=csv ou output=xlsx.")
+TIMELINE_INVALID_CURSOR = _("Cursor inválido.")
 
 # =========================================================
 # SLOT
@@ -14,3 +17,9 @@ SLOT_NOT_FOUND = _("Slot não encontrado.")
 SLOT_INVALID_STATUS = _("O slot não está em conferência.")
 SLOT_CONFIRMATION_STARTED = _("Conferência iniciada no slot.")
 SLOT_CONFIRMATION_FINISHED = _("Conferência finalizada no slot.")
+SLOT_BULK_INVALID_PAYLOAD = _("Envie uma lista de alterações de slots.")
+SLOT_BULK_DUPLICATED = _("Slot repetido no lote.")
+SLOTS_CONFIRMATION_STARTED = _("Conferência iniciada nos slots elegíveis.")
+SLOTS_CONFIRMATION_FINISHED = _("Conferência finalizada nos slots elegíveis.")
+SLOT_INVALID_SIDE = _("Lado inválido. Use A ou B.")
+SYNC_OPERATION_DUPLICATED = _("Operação já aplicada.")
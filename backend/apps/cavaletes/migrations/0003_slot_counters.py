@@ -0,0 +1,70 @@
+# Generated by Django 6.0.1 on 2026-10-18 18:14
+
+import django.db.models.expressions
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def populate_slot_counters(apps, schema_editor):
+    """Preenche os contadores a partir dos slots existentes (um UPDATE)."""
+    Cavalete = apps.get_model("cavaletes", "Cavalete")
+    Slot = apps.get_model("cavaletes", "Slot")
+
+    def slot_count(**filters):
+        slots = (
+            Slot.objects.filter(cavalete=models.OuterRef("pk"), **filters)
+            .order_by()
+            .values("cavalete")
+            .annotate(count=models.Count("id"))
+            .values("count")
+        )
+        return Coalesce(models.Subquery(slots), 0)
+
+    Cavalete.objects.update(
+        slots_total=slot_count(),
+        slots_auditing=slot_count(status="AUDITING"),
+        slots_completed=slot_count(status="COMPLETED"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cavaletes", "0002_remove_cavalete_name_cavalete_type"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cavalete",
+            name="slots_auditing",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="slots em conferência"
+            ),
+        ),
+        migrations.AddField(
+            model_name="cavalete",
+            name="slots_completed",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="slots conferidos"
+            ),
+        ),
+        migrations.AddField(
+            model_name="cavalete",
+            name="slots_total",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="total de slots"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="cavalete",
+            index=models.Index(
+                django.db.models.expressions.CombinedExpression(
+                    models.F("slots_total"), "-", models.F("slots_completed")
+                ),
+                name="cavalete_slots_remaining_idx",
+            ),
+        ),
+        migrations.RunPython(populate_slot_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-18 22:10
+
+from django.db import migrations, models
+
+from apps.core.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação (PostgreSQL).
+    atomic = False
+
+    dependencies = [
+        ("cavaletes", "0003_slot_counters"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="slot",
+            index=models.Index(
+                fields=["product_code"],
+                name="slot_product_code_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ),
+    ]
@@ -1,10 +1,72 @@
 from django.db import models
+from django.db.models.functions import Coalesce, Now
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
 
+def _slot_count(**filters):
+    """Subquery: quantidade de slots do cavalete externo (0 se não houver)."""
+    slots = (
+        Slot.objects.filter(cavalete=models.OuterRef("pk"), **filters)
+        .order_by()
+        .values("cavalete")
+        .annotate(count=models.Count("id"))
+        .values("count")
+    )
+    return Coalesce(models.Subquery(slots), 0)
+
+
+class CavaleteQuerySet(models.QuerySet):
+    """QuerySet de Cavalete com os contadores de progresso."""
+
+    def with_actual_slot_counts(self):
+        """Anota as contagens reais de slots (para conferir os contadores)."""
+        return self.annotate(
+            actual_total=_slot_count(),
+            actual_auditing=_slot_count(status=Slot.Status.AUDITING),
+            actual_completed=_slot_count(status=Slot.Status.COMPLETED),
+        )
+
+    def with_stale_counters(self):
+        """Cavaletes cujos contadores divergem das contagens reais."""
+        return self.with_actual_slot_counts().exclude(
+            slots_total=models.F("actual_total"),
+            slots_auditing=models.F("actual_auditing"),
+            slots_completed=models.F("actual_completed"),
+        )
+
+    def recount_slots(self):
+        """
+        Recalcula os contadores a partir dos slots, em um único UPDATE, só nos
+        cavaletes divergentes. Atualiza também updated_at, que entra no ETag da
+        listagem (que serializa os contadores). Retorna quantos foram corrigidos.
+        """
+        stale = self.with_stale_counters().values("pk")
+        return self.model.objects.filter(pk__in=stale).update(
+            slots_total=_slot_count(),
+            slots_auditing=_slot_count(status=Slot.Status.AUDITING),
+            slots_completed=_slot_count(status=Slot.Status.COMPLETED),
+            updated_at=Now(),
+        )
+
+    def remaining_lte(self, max_remaining):
+        """
+        Cavaletes com no máximo `max_remaining` slots ainda não conferidos.
+        Filtra pela expressão indexada (slots_total - slots_completed).
+        """
+        return self.alias(
+            slots_remaining=models.F("slots_total") - models.F("slots_completed")
+        ).filter(slots_remaining__lte=max_remaining)
+
+    def almost_done(self):
+        """Cavaletes com slots pendentes, mas poucos (ALMOST_DONE_MAX_REMAINING)."""
+        return self.remaining_lte(Cavalete.ALMOST_DONE_MAX_REMAINING).filter(
+            slots_remaining__gt=0
+        )
+
+
 class Cavalete(models.Model):
     """
     Representa um cavalete físico que contém slots de produtos.
@@ -46,17 +108,45 @@ class Cavalete(models.Model):
         default=Status.AVAILABLE,
     )
 
+    # Contadores de progresso (desnormalizados). Mantidos pelos services de
+    # inventory com UPDATE ... SET x = x + n; reconcile_slot_counters corrige.
+    slots_total = models.PositiveIntegerField(
+        _("total de slots"), default=0, editable=False
+    )
+    slots_auditing = models.PositiveIntegerField(
+        _("slots em conferência"), default=0, editable=False
+    )
+    slots_completed = models.PositiveIntegerField(
+        _("slots conferidos"), default=0, editable=False
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CavaleteQuerySet.as_manager()
+
+    # "Quase concluído": até N slots ainda não conferidos.
+    ALMOST_DONE_MAX_REMAINING = 3
+
     class Meta:
         verbose_name = _("cavalete")
         verbose_name_plural = _("cavaletes")
         ordering = ["code"]
+        indexes = [
+            models.Index(
+                models.F("slots_total") - models.F("slots_completed"),
+                name="cavalete_slots_remaining_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.code} - {self.get_status_display()}"
 
+    @property
+    def slots_available(self):
+        """Slots aguardando conferência (derivado dos contadores)."""
+        return self.slots_total - self.slots_auditing - self.slots_completed
+
 
 class Slot(models.Model):
     """
@@ -73,6 +163,14 @@ class Slot(models.Model):
         AUDITING = "AUDITING", _("Em conferência")
         COMPLETED = "COMPLETED", _("Conferido")
 
+    # Campos editáveis pelo conferente apenas com status=AUDITING
+    EDITABLE_FIELDS = ["product_code", "product_description", "quantity"]
+    # Contador do Cavalete correspondente a cada status (AVAILABLE é derivado)
+    STATUS_COUNTERS = {
+        Status.AUDITING: "slots_auditing",
+        Status.COMPLETED: "slots_completed",
+    }
+
     cavalete = models.ForeignKey(
         Cavalete,
         on_delete=models.CASCADE,
@@ -110,6 +208,14 @@ class Slot(models.Model):
                 fields=["cavalete", "side", "number"], name="unique_slot_position"
             )
         ]
+        indexes = [
+            # Busca por prefixo (LIKE 'x%'); opclass aplicada só no PostgreSQL
+            models.Index(
+                fields=["product_code"],
+                name="slot_product_code_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ]
 
     def __str__(self):
         return f"{self.cavalete.code} - {self.side}{self.number}"
@@ -4,6 +4,18 @@ from apps.core import messages as core_messages
 from . import messages
 
 
+def validate_slot_edit(slot, data):
+    """
+    Regra de edição do slot: produto/quantidade só mudam se status=AUDITING.
+    Raises ValidationError se algum campo protegido for alterado fora dela.
+    """
+    if slot.status == Slot.Status.AUDITING:
+        return
+    for field in Slot.EDITABLE_FIELDS:
+        if field in data and data[field] != getattr(slot, field):
+            raise serializers.ValidationError({"detail": messages.SLOT_INVALID_STATUS})
+
+
 class SlotSerializer(serializers.ModelSerializer):
     """
     Serializer para o Slot.
@@ -29,17 +41,59 @@ class SlotSerializer(serializers.ModelSerializer):
         if not self.instance:
             return data
 
-        if self.instance.status != Slot.Status.AUDITING:
-            protected_fields = ["product_code", "product_description", "quantity"]
-            for field in protected_fields:
-                if field in data and data[field] != getattr(self.instance, field):
-                    raise serializers.ValidationError(
-                        {"detail": messages.SLOT_INVALID_STATUS}
-                    )
+        validate_slot_edit(self.instance, data)
+        return data
+
 
+class SlotBulkUpdateItemSerializer(serializers.ModelSerializer):
+    """
+    Item do PATCH em lote de slots de um cavalete.
+    Espera no contexto `slots` ({id: Slot}) com os slots do cavalete.
+    """
+
+    id = serializers.IntegerField()
+
+    class Meta:
+        model = Slot
+        fields = ["id", "product_code", "product_description", "quantity"]
+        extra_kwargs = {
+            "product_code": {"required": False},
+            "product_description": {"required": False},
+            "quantity": {"required": False},
+        }
+
+    def validate(self, data):
+        """Valida existência do slot no cavalete e a regra de AUDITING."""
+        slot = self.context["slots"].get(data["id"])
+        if slot is None:
+            raise serializers.ValidationError({"detail": messages.SLOT_NOT_FOUND})
+        validate_slot_edit(slot, data)
         return data
 
 
+class SyncOperationSerializer(serializers.Serializer):
+    """Operação de slot capturada offline (start, edit ou finish)."""
+
+    START = "start"
+    EDIT = "edit"
+    FINISH = "finish"
+
+    key = serializers.CharField(max_length=64)
+    type = serializers.ChoiceField(choices=[START, EDIT, FINISH])
+    slot = serializers.IntegerField()
+    data = serializers.DictField(required=False, default=dict)
+
+
+class SyncBatchSerializer(serializers.Serializer):
+    """Fila ordenada de operações offline enviada na reconexão."""
+
+    MAX_OPERATIONS = 500
+
+    operations = SyncOperationSerializer(
+        many=True, allow_empty=False, max_length=MAX_OPERATIONS
+    )
+
+
 class CavaleteSerializer(serializers.ModelSerializer):
     """
     Serializer completo do Cavalete, incluindo slots aninhados.
@@ -87,3 +141,31 @@ class CavaleteSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("O cavalete deve ter pelo menos 1 slot (Lado A ou B).")
             
         return value
+
+
+class CavaleteListSerializer(serializers.ModelSerializer):
+    """
+    Representação compacta do Cavalete para listagem.
+    Em vez dos slots aninhados, expõe os contadores de progresso do cavalete.
+    """
+
+    user_name = serializers.CharField(source="user.username", read_only=True)
+    slots_available = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Cavalete
+        fields = [
+            "id",
+            "code",
+            "type",
+            "status",
+            "user",
+            "user_name",
+            "slots_total",
+            "slots_available",
+            "slots_auditing",
+            "slots_completed",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = fields
@@ -0,0 +1,49 @@
+import pytest
+from rest_framework import status
+
+from apps.accounts.models import User
+from apps.cavaletes.models import Cavalete, Slot
+from apps.inventory.services import create_cavalete_structure
+
+
+@pytest.mark.django_db
+class TestCavaleteAdmin:
+    """Admin em modo tabela grande (sem inline de slots acima do limite)."""
+
+    @pytest.fixture
+    def admin_user_client(self, client):
+        user = User.objects.create_user(
+            username="root", password="password", role=User.Role.ADMIN
+        )
+        client.force_login(user)
+        return client
+
+    def test_large_cavalete_shows_summary_instead_of_inline(
+        self, admin_user_client, manager_user, monkeypatch
+    ):
+        monkeypatch.setattr("apps.cavaletes.admin.SLOT_INLINE_LIMIT", 4)
+        small = Cavalete.objects.create(code="ADM-1")
+        large = Cavalete.objects.create(code="ADM-2")
+        create_cavalete_structure(small, 2, 2)
+        create_cavalete_structure(large, 3, 3)
+
+        small_page = admin_user_client.get(
+            f"/admin/cavaletes/cavalete/{small.pk}/change/"
+        )
+        large_page = admin_user_client.get(
+            f"/admin/cavaletes/cavalete/{large.pk}/change/"
+        )
+
+        assert b"slots-TOTAL_FORMS" in small_page.content
+        assert b"slots-TOTAL_FORMS" not in large_page.content
+        assert f"cavalete__id__exact={large.pk}".encode() in large_page.content
+
+    def test_slot_changelist_prefix_search(self, admin_user_client):
+        cavalete = Cavalete.objects.create(code="ADM-1")
+        Slot.objects.create(cavalete=cavalete, side="A", number=1, product_code="P100")
+        Slot.objects.create(cavalete=cavalete, side="A", number=2, product_code="X100")
+
+        response = admin_user_client.get("/admin/cavaletes/slot/", {"q": "P1"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.context["cl"].result_count == 1
@@ -0,0 +1,165 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from apps.cavaletes.models import Cavalete, Slot
+from apps.inventory.models import Action, SlotHistory
+from apps.inventory.services import (
+    create_cavalete_structure,
+    finish_slot_audit,
+    start_slot_audit,
+    transition_slots,
+)
+
+
+def _counters(cavalete):
+    cavalete.refresh_from_db()
+    return (cavalete.slots_total, cavalete.slots_auditing, cavalete.slots_completed)
+
+
+@pytest.mark.django_db
+class TestSlotCounters:
+    """Contadores de progresso mantidos pelos services."""
+
+    def test_structure_and_transitions(self, cavalete, manager_user):
+        create_cavalete_structure(cavalete, slots_a=2, slots_b=2)
+        assert cavalete.slots_total == 4
+        first, second = cavalete.slots.all()[:2]
+
+        start_slot_audit(first, manager_user)
+        start_slot_audit(second, manager_user)
+        assert _counters(cavalete) == (4, 2, 0)
+
+        finish_slot_audit(first, manager_user)
+        assert _counters(cavalete) == (4, 1, 1)
+        assert cavalete.slots_available == 2
+
+        # Transição inválida não altera os contadores.
+        assert not finish_slot_audit(first, manager_user)
+        assert _counters(cavalete) == (4, 1, 1)
+
+    def test_repeated_transition_counts_once(self, cavalete, manager_user):
+        """Duas cópias do mesmo slot (requisições concorrentes): só uma aplica."""
+        create_cavalete_structure(cavalete, slots_a=1, slots_b=0)
+        slot = cavalete.slots.get()
+        stale = Slot.objects.get(pk=slot.pk)
+
+        assert start_slot_audit(slot, manager_user)
+        assert not start_slot_audit(stale, manager_user)
+        assert _counters(cavalete) == (1, 1, 0)
+
+        stale.refresh_from_db()
+        assert finish_slot_audit(slot, manager_user)
+        assert not finish_slot_audit(stale, manager_user)
+        assert _counters(cavalete) == (1, 0, 1)
+        assert (
+            SlotHistory.objects.filter(slot=slot, action=Action.START_AUDIT).count()
+            == 1
+        )
+        assert (
+            SlotHistory.objects.filter(slot=slot, action=Action.FINISH_AUDIT).count()
+            == 1
+        )
+
+    def test_bulk_transition(self, cavalete, manager_user):
+        create_cavalete_structure(cavalete, slots_a=3, slots_b=0)
+        slots = cavalete.slots.all()
+
+        transition_slots(
+            slots,
+            manager_user,
+            Slot.Status.AVAILABLE,
+            Slot.Status.AUDITING,
+            Action.START_AUDIT,
+        )
+        assert _counters(cavalete) == (3, 3, 0)
+
+        transition_slots(
+            slots,
+            manager_user,
+            Slot.Status.AUDITING,
+            Slot.Status.COMPLETED,
+            Action.FINISH_AUDIT,
+        )
+        assert _counters(cavalete) == (3, 0, 3)
+
+    def test_slot_delete_via_api(self, api_client, cavalete, manager_user):
+        create_cavalete_structure(cavalete, slots_a=2, slots_b=0)
+        slot = cavalete.slots.first()
+        start_slot_audit(slot, manager_user)
+
+        api_client.force_authenticate(user=manager_user)
+        response = api_client.delete(reverse("cavaletes:slot-detail", args=[slot.id]))
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert _counters(cavalete) == (1, 0, 0)
+
+    def test_almost_done_filter(
+        self, api_client, cavalete, another_cavalete, manager_user
+    ):
+        create_cavalete_structure(cavalete, slots_a=4, slots_b=0)
+        create_cavalete_structure(another_cavalete, slots_a=10, slots_b=0)
+        transition_slots(
+            cavalete.slots.filter(number__lte=2),
+            manager_user,
+            Slot.Status.AVAILABLE,
+            Slot.Status.COMPLETED,
+            Action.FINISH_AUDIT,
+        )
+
+        assert list(Cavalete.objects.almost_done()) == [cavalete]
+
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:cavalete-list")
+        response = api_client.get(url, {"almost_done": "true"})
+        assert [item["code"] for item in response.data["results"]] == ["CAV-001"]
+
+        response = api_client.get(url, {"remaining_lte": 10})
+        assert response.data["count"] == 2
+
+
+@pytest.mark.django_db
+class TestReconcileSlotCounters:
+    def test_fixes_stale_counters(self, cavalete, another_cavalete):
+        Slot.objects.create(cavalete=cavalete, side="A", number=1)
+        Slot.objects.create(
+            cavalete=cavalete, side="A", number=2, status=Slot.Status.COMPLETED
+        )
+        assert Cavalete.objects.with_stale_counters().count() == 1
+
+        out = io.StringIO()
+        call_command("reconcile_slot_counters", stdout=out)
+
+        assert "1 cavaletes" in out.getvalue()
+        assert _counters(cavalete) == (2, 0, 1)
+        assert not Cavalete.objects.with_stale_counters().exists()
+
+    def test_recount_changes_list_etag(
+        self, api_client, manager_user, cavalete, another_cavalete
+    ):
+        """Corrigir os contadores muda o ETag da listagem; só os divergentes mudam."""
+        Slot.objects.create(cavalete=cavalete, side="A", number=1)
+        Cavalete.objects.filter(pk=another_cavalete.pk).recount_slots()
+        untouched = Cavalete.objects.get(pk=another_cavalete.pk).updated_at
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:cavalete-list")
+        etag = api_client.get(url)["ETag"]
+
+        assert Cavalete.objects.recount_slots() == 1
+
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
+        assert Cavalete.objects.get(pk=another_cavalete.pk).updated_at == untouched
+
+    def test_dry_run(self, cavalete):
+        Slot.objects.create(cavalete=cavalete, side="A", number=1)
+
+        out = io.StringIO()
+        call_command("reconcile_slot_counters", "--dry-run", stdout=out)
+
+        assert "1 cavaletes com contadores divergentes" in out.getvalue()
+        assert _counters(cavalete) == (0, 0, 0)
@@ -0,0 +1,215 @@
+"""Orçamento de queries por endpoint (protege contra N+1)."""
+
+import pytest
+from rest_framework.reverse import reverse
+
+from apps.cavaletes.models import Cavalete, Slot
+from apps.inventory.models import Action, CavaleteHistory, SlotHistory
+from apps.inventory.services import create_cavalete_structure
+
+
+def _seed(user, count, slots_per_side=3):
+    """Cria `count` cavaletes com slots nos dois lados."""
+    cavaletes = []
+    for i in range(count):
+        cavalete = Cavalete.objects.create(code=f"Q-{i:03d}", user=user)
+        create_cavalete_structure(cavalete, slots_per_side, slots_per_side)
+        cavaletes.append(cavalete)
+    return cavaletes
+
+
+@pytest.mark.django_db
+class TestCavaleteQueryBudget:
+    """Número de queries fixo, independente do tamanho da página."""
+
+    def test_list(self, api_client, manager_user, django_assert_num_queries):
+        _seed(manager_user, 15)
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:cavalete-list")
+
+        # ETag + COUNT da paginação + página anotada com user (join).
+        with django_assert_num_queries(3):
+            api_client.get(url)
+
+    def test_list_expand_slots(
+        self, api_client, manager_user, django_assert_num_queries
+    ):
+        _seed(manager_user, 15)
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:cavalete-list")
+
+        # ETag + COUNT + página + prefetch dos slots.
+        with django_assert_num_queries(4):
+            api_client.get(url, {"expand": "slots"})
+
+    def test_retrieve(self, api_client, manager_user, django_assert_num_queries):
+        cavalete = _seed(manager_user, 1, slots_per_side=20)[0]
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:cavalete-detail", args=[cavalete.id])
+
+        # ETag + cavalete com user (join) + prefetch dos slots.
+        with django_assert_num_queries(3):
+            api_client.get(url)
+
+    def test_retrieve_not_modified(
+        self, api_client, manager_user, django_assert_num_queries
+    ):
+        cavalete = _seed(manager_user, 1, slots_per_side=20)[0]
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:cavalete-detail", args=[cavalete.id])
+        etag = api_client.get(url)["ETag"]
+
+        # Apenas a query do ETag; o corpo não é carregado.
+        with django_assert_num_queries(1):
+            api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_update(self, api_client, manager_user, django_assert_num_queries):
+        cavalete = _seed(manager_user, 1, slots_per_side=20)[0]
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:cavalete-detail", args=[cavalete.id])
+
+        with django_assert_num_queries(7):
+            api_client.patch(url, {"status": "BLOCKED"}, format="json")
+
+    def test_export(self, api_client, manager_user, django_assert_num_queries):
+        _seed(manager_user, 15)
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:cavalete-export")
+
+        # Um único SELECT (cavalete + user + slots) lido em streaming.
+        with django_assert_num_queries(1):
+            response = api_client.get(url)
+            lines = b"".join(response.streaming_content).splitlines()
+        assert len(lines) == 1 + 15 * 6
+
+    def test_timeline(self, api_client, manager_user, django_assert_num_queries):
+        cavalete = _seed(manager_user, 1, slots_per_side=20)[0]
+        SlotHistory.objects.bulk_create(
+            SlotHistory(slot=slot, user=manager_user, action=Action.UPDATE)
+            for slot in cavalete.slots.all()
+        )
+        CavaleteHistory.objects.create(
+            cavalete=cavalete, user=manager_user, action=Action.UPDATE
+        )
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:cavalete-timeline", args=[cavalete.id])
+
+        # Cavalete + um UNION ALL (histórico do cavalete e dos slots).
+        with django_assert_num_queries(2):
+            response = api_client.get(url)
+        assert len(response.data["results"]) == 20
+
+
+@pytest.mark.django_db
+class TestSlotQueryBudget:
+    """Endpoints de slots não carregam o cavalete por linha."""
+
+    def test_list(
+        self, api_client, auditor_user, manager_user, django_assert_num_queries
+    ):
+        _seed(manager_user, 5)
+        api_client.force_authenticate(user=auditor_user)
+        url = reverse("cavaletes:slot-list")
+
+        with django_assert_num_queries(3):
+            api_client.get(url)
+
+    def test_start_confirmation(
+        self, api_client, auditor_user, slot, django_assert_num_queries
+    ):
+        api_client.force_authenticate(user=auditor_user)
+        url = reverse("cavaletes:slot-start-confirmation", args=[slot.id])
+
+        # Inclui o UPDATE dos contadores do cavalete (F()).
+        with django_assert_num_queries(6):
+            api_client.post(url)
+
+    def test_bulk_update_slots(
+        self, api_client, manager_user, django_assert_num_queries
+    ):
+        cavalete = _seed(manager_user, 1, slots_per_side=20)[0]
+        cavalete.slots.update(status=Slot.Status.AUDITING)
+        payload = [
+            {"id": slot_id, "quantity": 1}
+            for slot_id in cavalete.slots.values_list("id", flat=True)
+        ]
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:cavalete-bulk-update-slots", args=[cavalete.id])
+
+        # cavalete + SAVEPOINT + slots (FOR UPDATE) + bulk_update + bulk_create
+        # + RELEASE.
+        with django_assert_num_queries(6):
+            api_client.patch(url, payload, format="json")
+
+    def test_finish_confirmation(
+        self, api_client, auditor_user, slot, django_assert_num_queries
+    ):
+        slot.status = Slot.Status.AUDITING
+        slot.save()
+        api_client.force_authenticate(user=auditor_user)
+        url = reverse("cavaletes:slot-finish-confirmation", args=[slot.id])
+
+        # SAVEPOINT + slot (join cavalete) + UPDATE condicional + contadores
+        # (F()) + histórico + RELEASE.
+        with django_assert_num_queries(6):
+            api_client.post(url)
+
+    def test_update(self, api_client, auditor_user, slot, django_assert_num_queries):
+        slot.status = Slot.Status.AUDITING
+        slot.save()
+        api_client.force_authenticate(user=auditor_user)
+        url = reverse("cavaletes:slot-detail", args=[slot.id])
+
+        # slot (join cavalete) + SAVEPOINT + UPDATE + histórico + RELEASE.
+        with django_assert_num_queries(5):
+            api_client.patch(url, {"quantity": 7}, format="json")
+
+    def test_destroy(self, api_client, manager_user, slot, django_assert_num_queries):
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:slot-detail", args=[slot.id])
+
+        # slot + SAVEPOINT + histórico DELETE + SET_NULL (histórico, sync) +
+        # DELETE + contadores + RELEASE.
+        with django_assert_num_queries(8):
+            api_client.delete(url)
+
+
+@pytest.mark.django_db
+class TestCavaleteWriteQueryBudget:
+    """Escritas em cavaletes: queries fixas, independente do número de slots."""
+
+    def test_create_with_structure(
+        self, api_client, manager_user, django_assert_num_queries
+    ):
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:cavalete-list")
+        payload = {"code": "NEW-001", "structure": {"slots_a": 20, "slots_b": 20}}
+
+        # unicidade do code + SAVEPOINT + cavalete + histórico + slots em um
+        # bulk_create + contadores + releitura do total + RELEASE + slots da
+        # resposta. Não cresce com o número de slots.
+        with django_assert_num_queries(9):
+            api_client.post(url, payload, format="json")
+
+    def test_assign_user(
+        self, api_client, manager_user, auditor_user, django_assert_num_queries
+    ):
+        cavalete = _seed(manager_user, 1, slots_per_side=20)[0]
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:cavalete-assign-user", args=[cavalete.id])
+
+        # cavalete (join user) + prefetch dos slots + conferente + SAVEPOINT +
+        # UPDATE + histórico + RELEASE.
+        with django_assert_num_queries(7):
+            api_client.post(url, {"user_id": auditor_user.id}, format="json")
+
+    def test_destroy(self, api_client, manager_user, django_assert_num_queries):
+        cavalete = _seed(manager_user, 1, slots_per_side=20)[0]
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:cavalete-detail", args=[cavalete.id])
+
+        # cavalete + slots + SAVEPOINT + histórico + coletor do delete (ids dos
+        # slots, SET_NULL em histórico/sync, DELETE slots e cavalete) + RELEASE.
+        # Os SET_NULL e DELETE usam IN, então não crescem com os slots.
+        with django_assert_num_queries(11):
+            api_client.delete(url)
@@ -1,8 +1,17 @@
+from datetime import timedelta
+
 import pytest
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.reverse import reverse
-from apps.cavaletes.models import Slot
+from apps.cavaletes.models import Cavalete, Slot
 from apps.cavaletes import messages
+from apps.inventory.models import Action, CavaleteHistory, SlotHistory
+from apps.inventory.services import (
+    create_cavalete_structure,
+    finish_slot_audit,
+    start_slot_audit,
+)
 
 
 @pytest.mark.django_db
@@ -37,6 +46,65 @@ class TestCavaleteViewSet:
         assert len(response.data["results"]) == 1
         assert response.data["results"][0]["id"] == cavalete.id
 
+    def test_list_cavaletes_compact_with_slot_counts(
+        self, api_client, manager_user, cavalete
+    ):
+        """Listagem retorna contagens por status, sem slots aninhados."""
+        create_cavalete_structure(cavalete, slots_a=2, slots_b=1)
+        _, slot_a2, slot_b1 = cavalete.slots.all()  # A1, A2, B1
+        start_slot_audit(slot_a2, manager_user)
+        start_slot_audit(slot_b1, manager_user)
+        finish_slot_audit(slot_b1, manager_user)
+
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:cavalete-list")
+        response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        item = response.data["results"][0]
+        assert "slots" not in item
+        assert item["slots_total"] == 3
+        assert item["slots_available"] == 1
+        assert item["slots_auditing"] == 1
+        assert item["slots_completed"] == 1
+
+    def test_list_cavaletes_expand_slots(self, api_client, manager_user, slot):
+        """Com ?expand=slots a listagem inclui os slots aninhados."""
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:cavalete-list")
+        response = api_client.get(url, {"expand": "slots"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"][0]["slots"]) == 1
+
+    def test_retrieve_cavalete_includes_slots(self, api_client, manager_user, slot):
+        """Detalhe do cavalete mantém os slots aninhados."""
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:cavalete-detail", args=[slot.cavalete_id])
+        response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["slots"][0]["id"] == slot.id
+
+    def test_list_cavaletes_cursor_pagination(self, api_client, manager_user):
+        """?pagination=cursor ordena por código e pagina por cursor."""
+        for i in range(22):
+            Cavalete.objects.create(code=f"CUR-{i:02d}", user=manager_user)
+
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:cavalete-list")
+        response = api_client.get(url, {"pagination": "cursor"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "count" not in response.data
+        assert response.data["results"][0]["code"] == "CUR-00"
+
+        second = api_client.get(response.data["next"])
+        assert [item["code"] for item in second.data["results"]] == [
+            "CUR-20",
+            "CUR-21",
+        ]
+
     def test_create_cavalete_manager(self, api_client, manager_user):
         """Gestor pode criar cavalete."""
         api_client.force_authenticate(user=manager_user)
@@ -58,10 +126,10 @@ class TestCavaleteViewSet:
 
         response = api_client.post(url, data, format="json")
         assert response.status_code == status.HTTP_201_CREATED
-        
+
         cavalete_id = response.data["id"]
         slots = Slot.objects.filter(cavalete_id=cavalete_id)
-        
+
         assert slots.count() == 3
         assert slots.filter(side="A").count() == 2
         assert slots.filter(side="B").count() == 1
@@ -78,7 +146,9 @@ class TestCavaleteViewSet:
 
         response = api_client.post(url, data, format="json")
         assert response.status_code == status.HTTP_400_BAD_REQUEST
-        assert "O cavalete deve ter pelo menos 1 slot" in str(response.data["structure"])
+        assert "O cavalete deve ter pelo menos 1 slot" in str(
+            response.data["structure"]
+        )
 
     def test_create_cavalete_auditor_forbidden(self, api_client, auditor_user):
         """Conferente NÃO pode criar cavalete."""
@@ -140,6 +210,44 @@ class TestSlotWorkflow:
         assert history.old_product_code == "OLD"
         assert history.new_product_code == "NEW"
 
+    def test_noop_edit_skips_history(self, api_client, auditor_user, slot):
+        """PATCH sem alteração efetiva não grava o slot nem o histórico."""
+        slot.status = Slot.Status.AUDITING
+        slot.quantity = 5
+        slot.save()
+        updated_at = slot.updated_at
+
+        api_client.force_authenticate(user=auditor_user)
+        url = reverse("cavaletes:slot-detail", args=[slot.id])
+        response = api_client.patch(url, {"quantity": 5})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert slot.history.count() == 0
+        slot.refresh_from_db()
+        assert slot.updated_at == updated_at
+
+    def test_consecutive_edits_merge_within_window(
+        self, api_client, auditor_user, slot, settings
+    ):
+        """Com a janela ativa, edições seguidas viram um único UPDATE."""
+        settings.INVENTORY_HISTORY_COMPACT_WINDOW = 60
+        slot.status = Slot.Status.AUDITING
+        slot.quantity = 5
+        slot.save()
+
+        api_client.force_authenticate(user=auditor_user)
+        url = reverse("cavaletes:slot-detail", args=[slot.id])
+        api_client.patch(url, {"quantity": 1})
+        first_id = slot.history.get().id
+        for quantity in (12, 120):
+            api_client.patch(url, {"quantity": quantity})
+
+        assert slot.history.count() == 1
+        history = slot.history.first()
+        assert (history.old_quantity, history.new_quantity) == (5, 120)
+        # A junção é uma entrada nova: o feed changes/ (after_id) a enxerga.
+        assert history.id > first_id
+
     def test_finish_confirmation(self, api_client, auditor_user, slot):
         """Deve finalizar a conferência (AUDITING -> COMPLETED)."""
         slot.status = Slot.Status.AUDITING
@@ -183,3 +291,508 @@ class TestSlotWorkflow:
 
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert str(response.data["detail"][0]) == str(messages.SLOT_INVALID_STATUS)
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    """ETag e If-None-Match em leituras de cavaletes e slots."""
+
+    def test_retrieve_returns_304_when_unchanged(self, api_client, manager_user, slot):
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:cavalete-detail", args=[slot.cavalete_id])
+
+        etag = api_client.get(url)["ETag"]
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+
+    def test_retrieve_etag_changes_when_slot_changes(
+        self, api_client, manager_user, slot
+    ):
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:cavalete-detail", args=[slot.cavalete_id])
+        etag = api_client.get(url)["ETag"]
+
+        slot.quantity = 7
+        slot.save()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
+
+    def test_list_etag_changes_when_cavalete_deleted(
+        self, api_client, manager_user, cavalete, another_cavalete
+    ):
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:cavalete-list")
+        etag = api_client.get(url)["ETag"]
+
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        another_cavalete.delete()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 1
+
+    def test_retrieve_missing_cavalete_returns_404(self, api_client, manager_user):
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:cavalete-detail", args=[999])
+        response = api_client.get(url, HTTP_IF_NONE_MATCH="*")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_slot_retrieve_returns_304_when_unchanged(
+        self, api_client, auditor_user, slot
+    ):
+        api_client.force_authenticate(user=auditor_user)
+        url = reverse("cavaletes:slot-detail", args=[slot.id])
+
+        etag = api_client.get(url)["ETag"]
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db
+class TestBulkSlotUpdate:
+    """PATCH /api/inventory/cavaletes/{id}/slots/bulk/."""
+
+    @pytest.fixture(autouse=True)
+    def assign_auditor(self, cavalete, auditor_user):
+        cavalete.user = auditor_user
+        cavalete.save()
+
+    def _url(self, cavalete):
+        return reverse("cavaletes:cavalete-bulk-update-slots", args=[cavalete.id])
+
+    def test_bulk_update_applies_changes_and_history(
+        self, api_client, auditor_user, cavalete
+    ):
+        """Aplica as alterações válidas e grava um histórico por slot."""
+        slots = [
+            Slot.objects.create(
+                cavalete=cavalete, side="A", number=i, status=Slot.Status.AUDITING
+            )
+            for i in (1, 2)
+        ]
+        api_client.force_authenticate(user=auditor_user)
+        payload = [
+            {"id": slots[0].id, "product_code": "P1", "quantity": 3},
+            {"id": slots[1].id, "quantity": 8},
+        ]
+
+        response = api_client.patch(self._url(cavalete), payload, format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["updated"] == 2
+        assert [r["status"] for r in response.data["results"]] == [
+            "updated",
+            "updated",
+        ]
+        slots[0].refresh_from_db()
+        assert slots[0].product_code == "P1"
+        assert slots[0].quantity == 3
+        history = slots[1].history.get()
+        assert history.old_quantity == 0
+        assert history.new_quantity == 8
+
+    def test_bulk_update_reports_per_item_errors(
+        self, api_client, auditor_user, cavalete, another_cavalete
+    ):
+        """Slot fora de AUDITING ou de outro cavalete falha sem afetar os demais."""
+        auditing = Slot.objects.create(
+            cavalete=cavalete, side="A", number=1, status=Slot.Status.AUDITING
+        )
+        available = Slot.objects.create(cavalete=cavalete, side="A", number=2)
+        foreign = Slot.objects.create(
+            cavalete=another_cavalete, side="A", number=1, status=Slot.Status.AUDITING
+        )
+        api_client.force_authenticate(user=auditor_user)
+        payload = [
+            {"id": auditing.id, "quantity": 5},
+            {"id": available.id, "quantity": 5},
+            {"id": foreign.id, "quantity": 5},
+            {"id": auditing.id, "quantity": 6},
+        ]
+
+        response = api_client.patch(self._url(cavalete), payload, format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["updated"] == 1
+        assert [r["status"] for r in response.data["results"]] == [
+            "updated",
+            "error",
+            "error",
+            "error",
+        ]
+        available.refresh_from_db()
+        foreign.refresh_from_db()
+        assert available.quantity == 0
+        assert foreign.quantity == 0
+
+    def test_bulk_update_accepts_numeric_string_ids(
+        self, api_client, auditor_user, cavalete
+    ):
+        """Id "4" é aceito pelo serializer; o slot é travado e atualizado."""
+        slot = Slot.objects.create(
+            cavalete=cavalete, side="A", number=1, status=Slot.Status.AUDITING
+        )
+        api_client.force_authenticate(user=auditor_user)
+        payload = [{"id": str(slot.id), "quantity": 3}, {"id": "abc", "quantity": 1}]
+
+        response = api_client.patch(self._url(cavalete), payload, format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["updated"] == 1
+        assert [r["status"] for r in response.data["results"]] == ["updated", "error"]
+        slot.refresh_from_db()
+        assert slot.quantity == 3
+
+    def test_bulk_update_rejects_non_list(self, api_client, auditor_user, cavalete):
+        api_client.force_authenticate(user=auditor_user)
+        response = api_client.patch(self._url(cavalete), {"id": 1}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestBulkTransitions:
+    """start-all / finish-all no cavalete (UPDATE condicional em massa)."""
+
+    @pytest.fixture
+    def slots(self, cavalete):
+        return [
+            Slot.objects.create(cavalete=cavalete, side=side, number=number)
+            for side, number in [("A", 1), ("A", 2), ("B", 1)]
+        ]
+
+    def test_start_all_moves_available_slots(
+        self, api_client, manager_user, cavalete, slots
+    ):
+        slots[0].status = Slot.Status.COMPLETED
+        slots[0].save()
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:cavalete-start-all", args=[cavalete.id])
+
+        response = api_client.post(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["transitioned"] == 2
+        assert set(cavalete.slots.values_list("status", flat=True)) == {
+            Slot.Status.COMPLETED,
+            Slot.Status.AUDITING,
+        }
+        assert slots[0].history.count() == 0
+        assert slots[1].history.get().action == "START_AUDIT"
+
+    def test_finish_all_by_side(self, api_client, manager_user, cavalete, slots):
+        cavalete.slots.update(status=Slot.Status.AUDITING)
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:cavalete-finish-all", args=[cavalete.id])
+
+        response = api_client.post(f"{url}?side=A")
+
+        assert response.data["transitioned"] == 2
+        slots[2].refresh_from_db()
+        assert slots[2].status == Slot.Status.AUDITING
+        assert slots[0].history.get().action == "FINISH_AUDIT"
+
+    def test_invalid_side(self, api_client, manager_user, cavalete):
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:cavalete-start-all", args=[cavalete.id])
+        response = api_client.post(url, {"side": "C"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_non_object_body(self, api_client, manager_user, cavalete, slots):
+        """Body JSON que não é objeto: 400, sem transição."""
+        api_client.force_authenticate(user=manager_user)
+        url = reverse("cavaletes:cavalete-start-all", args=[cavalete.id])
+
+        response = api_client.post(url, ["A"], format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not Slot.objects.filter(status=Slot.Status.AUDITING).exists()
+
+
+@pytest.mark.django_db
+class TestOfflineSync:
+    """POST /api/inventory/slots/sync/ (fila offline com idempotência)."""
+
+    def _sync(self, api_client, operations):
+        url = reverse("cavaletes:slot-sync")
+        return api_client.post(url, {"operations": operations}, format="json")
+
+    def test_sync_applies_queue_in_order(self, api_client, auditor_user, slot):
+        api_client.force_authenticate(user=auditor_user)
+        operations = [
+            {"key": "k1", "type": "start", "slot": slot.id},
+            {"key": "k2", "type": "edit", "slot": slot.id, "data": {"quantity": 4}},
+            {"key": "k3", "type": "finish", "slot": slot.id},
+        ]
+
+        response = self._sync(api_client, operations)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [r["status"] for r in response.data["results"]] == ["applied"] * 3
+        slot.refresh_from_db()
+        assert slot.status == Slot.Status.COMPLETED
+        assert slot.quantity == 4
+        assert list(slot.history.order_by("id").values_list("action", flat=True)) == [
+            "START_AUDIT",
+            "UPDATE",
+            "FINISH_AUDIT",
+        ]
+
+    def test_sync_skips_already_applied_keys(self, api_client, auditor_user, slot):
+        api_client.force_authenticate(user=auditor_user)
+        operations = [
+            {"key": "k1", "type": "start", "slot": slot.id},
+            {"key": "k2", "type": "edit", "slot": slot.id, "data": {"quantity": 4}},
+        ]
+        self._sync(api_client, operations)
+
+        response = self._sync(api_client, operations)
+
+        assert [r["status"] for r in response.data["results"]] == [
+            "duplicate",
+            "duplicate",
+        ]
+        assert slot.history.count() == 2
+
+    def test_sync_reports_invalid_operation(self, api_client, auditor_user, slot):
+        api_client.force_authenticate(user=auditor_user)
+        operations = [
+            {"key": "k1", "type": "finish", "slot": slot.id},
+            {"key": "k2", "type": "start", "slot": 9999},
+            {"key": "k3", "type": "start", "slot": slot.id},
+        ]
+
+        response = self._sync(api_client, operations)
+
+        assert [r["status"] for r in response.data["results"]] == [
+            "error",
+            "error",
+            "applied",
+        ]
+        # Operação com erro não é marcada como aplicada: pode ser reenviada.
+        response = self._sync(api_client, operations[:1])
+        assert response.data["results"][0]["status"] == "applied"
+
+    def test_sync_rejects_malformed_batch(self, api_client, auditor_user):
+        api_client.force_authenticate(user=auditor_user)
+        response = self._sync(api_client, [{"key": "k1", "type": "jump"}])
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestCavaleteImport:
+    """Importação de planilha via API."""
+
+    url = "/api/inventory/cavaletes/import/"
+
+    def _upload(self, content):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        return SimpleUploadedFile("cavaletes.csv", content.encode(), "text/csv")
+
+    def test_manager_imports_csv(self, api_client, manager_user):
+        api_client.force_authenticate(user=manager_user)
+        content = "code,type,slots_a,slots_b\nCAV10,DEFAULT,2,0\nCAV11,XYZ,1,0\n"
+        response = api_client.post(
+            self.url, {"file": self._upload(content)}, format="multipart"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["created"] == 1
+        assert response.data["error_count"] == 1
+        assert response.data["errors"][0]["line"] == 3
+        assert Cavalete.objects.get(code="CAV10").slots.count() == 2
+
+    def test_import_dry_run(self, api_client, manager_user):
+        api_client.force_authenticate(user=manager_user)
+        content = "code,type,slots_a,slots_b\nCAV10,DEFAULT,2,0\n"
+        response = api_client.post(
+            f"{self.url}?dry_run=true",
+            {"file": self._upload(content)},
+            format="multipart",
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["dry_run"] is True
+        assert response.data["created"] == 1
+        assert not Cavalete.objects.filter(code="CAV10").exists()
+
+    def test_import_requires_file_and_header(self, api_client, manager_user):
+        api_client.force_authenticate(user=manager_user)
+        response = api_client.post(self.url, {}, format="multipart")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = api_client.post(
+            self.url, {"file": self._upload("code\nCAV10\n")}, format="multipart"
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_auditor_cannot_import(self, api_client, auditor_user):
+        api_client.force_authenticate(user=auditor_user)
+        content = "code,type,slots_a,slots_b\nCAV10,DEFAULT,2,0\n"
+        response = api_client.post(
+            self.url, {"file": self._upload(content)}, format="multipart"
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestCavaleteExport:
+    """Exportação em streaming (CSV/XLSX)."""
+
+    url = "/api/inventory/cavaletes/export/"
+
+    def _csv_lines(self, response):
+        content = b"".join(response.streaming_content).decode("utf-8-sig")
+        return content.splitlines()
+
+    def test_export_csv_one_line_per_slot(
+        self, api_client, manager_user, cavalete, another_cavalete
+    ):
+        Slot.objects.create(cavalete=cavalete, side="A", number=1, quantity=5)
+        Slot.objects.create(cavalete=cavalete, side="B", number=1)
+        api_client.force_authenticate(user=manager_user)
+
+        response = api_client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert "attachment" in response["Content-Disposition"]
+        lines = self._csv_lines(response)
+        assert lines[0].startswith("code,type,status,user,side,number")
+        assert lines[1].startswith("CAV-001,DEFAULT,AVAILABLE,manager,A,1,")
+        assert lines[1].endswith(",5")
+        assert lines[2].startswith("CAV-001,DEFAULT,AVAILABLE,manager,B,1,")
+        # Cavalete sem slots aparece com as colunas do slot vazias.
+        assert lines[3] == "CAV-002,DEFAULT,AVAILABLE,manager,,,,,,"
+
+    def test_export_honours_filters_and_role(
+        self, api_client, auditor_user, cavalete, another_cavalete
+    ):
+        cavalete.user = auditor_user
+        cavalete.save()
+        another_cavalete.status = Cavalete.Status.BLOCKED
+        another_cavalete.user = auditor_user
+        another_cavalete.save()
+        api_client.force_authenticate(user=auditor_user)
+
+        response = api_client.get(self.url, {"status": "BLOCKED"})
+
+        lines = self._csv_lines(response)
+        assert [line.split(",")[0] for line in lines[1:]] == ["CAV-002"]
+
+    def test_export_xlsx(self, api_client, manager_user, slot):
+        openpyxl = pytest.importorskip("openpyxl")
+        import io
+
+        api_client.force_authenticate(user=manager_user)
+        response = api_client.get(self.url, {"output": "xlsx"})
+
+        assert response.status_code == status.HTTP_200_OK
+        workbook = openpyxl.load_workbook(
+            io.BytesIO(b"".join(response.streaming_content)), read_only=True
+        )
+        rows = list(workbook.active.iter_rows(values_only=True))
+        assert rows[0][0] == "code"
+        assert rows[1][:6] == ("CAV-001", "DEFAULT", "AVAILABLE", "manager", "A", 1)
+
+    def test_export_invalid_output(self, api_client, manager_user):
+        api_client.force_authenticate(user=manager_user)
+        response = api_client.get(self.url, {"output": "pdf"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestCavaleteTimeline:
+    """Histórico do cavalete + slots em uma lista (UNION ALL, keyset)."""
+
+    @pytest.fixture
+    def timeline(self, manager_user, cavalete, another_cavalete, slot):
+        now = timezone.now()
+        other_slot = Slot.objects.create(cavalete=another_cavalete, side="A", number=1)
+
+        def at(minutes):
+            return now - timedelta(minutes=minutes)
+
+        CavaleteHistory.objects.bulk_create(
+            CavaleteHistory(
+                cavalete=cavalete, user=manager_user, action=Action.CREATE, timestamp=t
+            )
+            for t in (at(5), at(0))
+        )
+        SlotHistory.objects.bulk_create(
+            SlotHistory(
+                slot=s,
+                user=manager_user,
+                action=Action.UPDATE,
+                old_quantity=1,
+                new_quantity=2,
+                timestamp=t,
+            )
+            for s, t in (
+                (slot, at(4)),
+                (slot, at(0)),
+                (slot, at(1)),
+                (other_slot, at(2)),
+            )
+        )
+        return now
+
+    def test_merges_both_histories_newest_first(
+        self, api_client, manager_user, cavalete, timeline
+    ):
+        api_client.force_authenticate(user=manager_user)
+
+        response = api_client.get(f"/api/inventory/cavaletes/{cavalete.id}/timeline/")
+
+        assert response.status_code == status.HTTP_200_OK
+        results = response.data["results"]
+        # Mesmo timestamp: slot antes de cavalete (-source).
+        assert [row["source"] for row in results] == [
+            "slot",
+            "cavalete",
+            "slot",
+            "slot",
+            "cavalete",
+        ]
+        assert results[0]["side"] == "A"
+        assert results[0]["new_quantity"] == 2
+        assert results[1]["slot"] is None
+        assert response.data["next"] is None
+
+    def test_keyset_pages(
+        self, api_client, manager_user, cavalete, timeline, monkeypatch
+    ):
+        monkeypatch.setattr("apps.cavaletes.views.TIMELINE_PAGE_SIZE", 2)
+        api_client.force_authenticate(user=manager_user)
+        url = f"/api/inventory/cavaletes/{cavalete.id}/timeline/"
+
+        seen = []
+        while url:
+            response = api_client.get(url)
+            seen += [(row["source"], row["id"]) for row in response.data["results"]]
+            url = response.data["next"]
+
+        assert len(seen) == 5
+        assert len(set(seen)) == 5
+
+    def test_invalid_cursor(self, api_client, manager_user, cavalete):
+        api_client.force_authenticate(user=manager_user)
+
+        response = api_client.get(
+            f"/api/inventory/cavaletes/{cavalete.id}/timeline/", {"cursor": "x"}
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["detail"] == messages.TIMELINE_INVALID_CURSOR
+
+    def test_auditor_only_sees_own_cavaletes(self, api_client, auditor_user, cavalete):
+        api_client.force_authenticate(user=auditor_user)
+
+        response = api_client.get(f"/api/inventory/cavaletes/{cavalete.id}/timeline/")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -1,52 +1,152 @@
 from django.db import transaction
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.db.models import Count, Max
 from django.contrib.auth import get_user_model
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.filters import SearchFilter
+from rest_framework.utils.urls import replace_query_param
 from django_filters.rest_framework import DjangoFilterBackend
 
+from apps.core.mixins import ConditionalGetMixin
+from apps.core.pagination import OptionalCursorPagination
 from apps.core.permissions import IsAuditor, IsManager
 from apps.core import messages as core_messages
-from apps.inventory.models import Action
-from apps.inventory.services import log_cavalete_action, log_slot_action, create_cavalete_structure
+from apps.inventory.exports import EXPORT_FORMATS, export_rows, stream_csv, write_xlsx
+from apps.inventory.imports import CavaleteImportError, import_cavaletes, iter_rows
+from apps.inventory.models import Action, SyncOperation
+from apps.inventory.serializers import TimelineEntrySerializer
+from apps.inventory.services import (
+    bulk_update_slots,
+    create_cavalete_structure,
+    delete_slot,
+    finish_slot_audit,
+    log_cavalete_action,
+    save_slot_update,
+    start_slot_audit,
+    transition_slots,
+)
+from apps.inventory.timeline import (
+    PAGE_SIZE as TIMELINE_PAGE_SIZE,
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    timeline_queryset,
+)
+from .filters import CavaleteFilter
 from .models import Cavalete, Slot
-from .serializers import CavaleteSerializer, SlotSerializer
+from .serializers import (
+    CavaleteListSerializer,
+    CavaleteSerializer,
+    SlotBulkUpdateItemSerializer,
+    SlotSerializer,
+    SyncBatchSerializer,
+    SyncOperationSerializer,
+)
 from . import messages
 
 User = get_user_model()
 
 
-class CavaleteViewSet(viewsets.ModelViewSet):
+class CavaleteViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     CRUD de Cavaletes.
     Gestores podem gerenciar tudo.
     Conferentes veem apenas os atribuídos a eles.
-    Filtros: ?status=AVAILABLE. Busca: ?search=CAV-001 (por código).
+    Filtros: ?status=AVAILABLE, ?almost_done=true, ?remaining_lte=N.
+    Busca: ?search=CAV-001 (por código).
+    Listagem compacta (contadores de slots por status); slots aninhados
+    apenas no detalhe ou com ?expand=slots.
+    Paginação por cursor (code, id) com ?pagination=cursor.
+    GET condicional: ETag + If-None-Match (304) em list e retrieve.
     """
 
     queryset = Cavalete.objects.all()
     serializer_class = CavaleteSerializer
+    pagination_class = OptionalCursorPagination
+    cursor_ordering = ("code", "id")
+    manager_actions = [
+        "create",
+        "update",
+        "partial_update",
+        "destroy",
+        "assign_user",
+        "import_file",
+    ]
+    # Actions que não serializam o cavalete com slots (dispensam o prefetch)
+    actions_without_nested_slots = [
+        "bulk_update_slots",
+        "start_all",
+        "finish_all",
+        "export",
+        "timeline",
+    ]
     filter_backends = [DjangoFilterBackend, SearchFilter]
-    filterset_fields = ["status"]
+    filterset_class = CavaleteFilter
     search_fields = ["code"]
 
     def get_permissions(self):
         """Define permissões baseadas na action."""
-        if self.action in ["create", "update", "partial_update", "destroy", "assign_user"]:
+        if self.action in self.manager_actions:
             return [IsManager()]
         return [IsAuditor()]
 
-    def get_queryset(self):
+    def _expand_slots(self):
+        """Indica se a listagem deve incluir os slots aninhados (?expand=slots)."""
+        expand = self.request.query_params.get("expand", "")
+        return "slots" in [item.strip() for item in expand.split(",")]
+
+    def get_serializer_class(self):
+        """Usa a representação compacta na listagem, salvo ?expand=slots."""
+        if self.action == "list" and not self._expand_slots():
+            return CavaleteListSerializer
+        return CavaleteSerializer
+
+    def get_etag_queryset(self):
         """Filtra cavaletes por usuário se for conferente."""
         user = self.request.user
-        qs = super().get_queryset()
+        qs = Cavalete.objects.all()
 
         if user.is_authenticated and user.role == "AUDITOR":
             return qs.filter(user=user)
 
         return qs
 
+    def get_queryset(self):
+        """Cavaletes visíveis ao usuário, com joins/anotações por action."""
+        qs = self.get_etag_queryset().select_related("user")
+
+        # Listagem compacta lê os contadores do próprio cavalete (sem JOIN).
+        compact_list = self.action == "list" and not self._expand_slots()
+        if compact_list or self.action in self.actions_without_nested_slots:
+            return qs
+
+        return qs.prefetch_related("slots")
+
+    def get_list_etag_parts(self, queryset):
+        """MAX(updated_at) de cavaletes e slots + contagens do filtro."""
+        return tuple(
+            queryset.aggregate(
+                cavalete_count=Count("id", distinct=True),
+                slot_count=Count("slots"),
+                cavalete_updated=Max("updated_at"),
+                slot_updated=Max("slots__updated_at"),
+            ).values()
+        )
+
+    def get_object_etag_parts(self, queryset):
+        """updated_at do cavalete + slot mais recente (sem carregar o corpo)."""
+        return (
+            queryset.annotate(
+                slot_count=Count("slots"), slot_updated=Max("slots__updated_at")
+            )
+            .values_list("id", "updated_at", "slot_count", "slot_updated")
+            .first()
+        )
+
     def perform_create(self, serializer):
         """Salva e registra log de criação."""
         with transaction.atomic():
@@ -108,39 +208,262 @@ class CavaleteViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(cavalete)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @action(detail=False, methods=["post"], url_path="import")
+    def import_file(self, request):
+        """
+        Importa cavaletes e slots de planilha CSV/XLSX (multipart, campo
+        "file"; colunas code, type, slots_a, slots_b). Apenas gestores.
+        ?dry_run=true apenas valida. Retorna o resumo com erros por linha.
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response(
+                {"detail": messages.IMPORT_FILE_REQUIRED},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        dry_run = request.query_params.get("dry_run", "").lower() in (
+            "1",
+            "true",
+            "yes",
+        )
+
+        try:
+            result = import_cavaletes(
+                iter_rows(upload, upload.name), user=request.user, dry_run=dry_run
+            )
+        except CavaleteImportError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(result.as_dict())
+
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        """
+        Exporta os cavaletes visíveis (mesmos filtros da listagem: status,
+        search e papel do usuário), uma linha por slot. ?output=csv (padrão)
+        ou xlsx. Linhas lidas com cursor no servidor e escritas em streaming.
+        """
+        output = request.query_params.get("output", "csv").lower()
+        if output not in EXPORT_FORMATS:
+            return Response(
+                {"detail": messages.EXPORT_INVALID_FORMAT},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        rows = export_rows(self.filter_queryset(self.get_queryset()))
+        filename = f"cavaletes-{timezone.localtime():%Y%m%d-%H%M}.{output}"
+        if output == "xlsx":
+            return FileResponse(
+                write_xlsx(rows),
+                as_attachment=True,
+                filename=filename,
+                content_type=(
+                    "application/vnd.openxmlformats-officedocument"
+                    ".spreadsheetml.sheet"
+                ),
+            )
+
+        response = StreamingHttpResponse(
+            stream_csv(rows), content_type="text/csv; charset=utf-8"
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    @action(detail=True, methods=["patch"], url_path="slots/bulk")
+    def bulk_update_slots(self, request, pk=None):
+        """
+        Edita vários slots do cavalete em uma transação.
+        Body: lista de {id, product_code, product_description, quantity}.
+        Mesma regra de AUDITING do SlotSerializer; itens inválidos não impedem
+        os demais. Retorna o resultado por item.
+        """
+        cavalete = self.get_object()
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                {"detail": messages.SLOT_BULK_INVALID_PAYLOAD},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with transaction.atomic():
+            slots = cavalete.slots.select_for_update().in_bulk(
+                self._bulk_item_ids(items)
+            )
+            results, changes = self._validate_bulk_items(items, slots)
+            updated = bulk_update_slots(changes, request.user)
+
+        updated_ids = {slot.id for slot in updated}
+        for result in results:
+            if "status" not in result:
+                result["status"] = (
+                    "updated" if result["id"] in updated_ids else "unchanged"
+                )
+        return Response({"updated": len(updated_ids), "results": results})
+
+    @action(detail=True, methods=["post"], url_path="start-all")
+    def start_all(self, request, pk=None):
+        """
+        Inicia a conferência de todos os slots AVAILABLE do cavalete.
+        Opcional: ?side=A|B (ou "side" no body) restringe a um lado.
+        """
+        return self._transition_all(
+            Slot.Status.AVAILABLE,
+            Slot.Status.AUDITING,
+            Action.START_AUDIT,
+            "Conferência iniciada",
+            messages.SLOTS_CONFIRMATION_STARTED,
+        )
+
+    @action(detail=True, methods=["post"], url_path="finish-all")
+    def finish_all(self, request, pk=None):
+        """
+        Finaliza a conferência de todos os slots AUDITING do cavalete.
+        Opcional: ?side=A|B (ou "side" no body) restringe a um lado.
+        """
+        return self._transition_all(
+            Slot.Status.AUDITING,
+            Slot.Status.COMPLETED,
+            Action.FINISH_AUDIT,
+            "Conferência finalizada",
+            messages.SLOTS_CONFIRMATION_FINISHED,
+        )
 
-class SlotViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=["get"], url_path="timeline")
+    def timeline(self, request, pk=None):
+        """
+        Histórico do cavalete e dos seus slots em uma lista só, do mais
+        recente para o mais antigo (UNION ALL no banco). Paginação por
+        keyset: {"next": <url com ?cursor=>, "results": [...]}.
+        """
+        cavalete = self.get_object()
+        cursor = request.query_params.get("cursor")
+        try:
+            position = decode_cursor(cursor) if cursor else None
+        except InvalidCursor:
+            return Response(
+                {"detail": messages.TIMELINE_INVALID_CURSOR},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        rows = list(
+            timeline_queryset(cavalete, position, limit=TIMELINE_PAGE_SIZE + 1)
+        )
+        next_url = None
+        if len(rows) > TIMELINE_PAGE_SIZE:
+            rows = rows[:TIMELINE_PAGE_SIZE]
+            next_url = replace_query_param(
+                request.build_absolute_uri(), "cursor", encode_cursor(rows[-1])
+            )
+        return Response(
+            {"next": next_url, "results": TimelineEntrySerializer(rows, many=True).data}
+        )
+
+    def _transition_all(self, from_status, to_status, log_action, description, detail):
+        """Transição em massa (UPDATE condicional) nos slots do cavalete."""
+        cavalete = self.get_object()
+        data = self.request.data
+        if not isinstance(data, dict):
+            return Response(
+                {"detail": str(core_messages.INVALID_INPUT)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        side = self.request.query_params.get("side", data.get("side"))
+        slots = cavalete.slots.all()
+        if side:
+            if side not in Slot.Side.values:
+                return Response(
+                    {"detail": messages.SLOT_INVALID_SIDE},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            slots = slots.filter(side=side)
+
+        count = transition_slots(
+            slots, self.request.user, from_status, to_status, log_action, description
+        )
+        return Response({"status": to_status, "transitioned": count, "detail": detail})
+
+    def _bulk_item_ids(self, items):
+        """Ids dos itens convertidos como no serializer ("4" -> 4), sem os inválidos."""
+        field = SlotBulkUpdateItemSerializer().fields["id"]
+        ids = set()
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            try:
+                ids.add(field.to_internal_value(item.get("id")))
+            except ValidationError:
+                continue
+        return list(ids)
+
+    def _validate_bulk_items(self, items, slots):
+        """Valida cada item do lote. Retorna (resultados, [(slot, dados)])."""
+        results = []
+        changes = []
+        seen = set()
+        for item in items:
+            serializer = SlotBulkUpdateItemSerializer(
+                data=item, context={"slots": slots}
+            )
+            if not serializer.is_valid():
+                item_id = item.get("id") if isinstance(item, dict) else None
+                results.append(
+                    {"id": item_id, "status": "error", "errors": serializer.errors}
+                )
+                continue
+
+            data = dict(serializer.validated_data)
+            slot_id = data.pop("id")
+            if slot_id in seen:
+                results.append(
+                    {
+                        "id": slot_id,
+                        "status": "error",
+                        "errors": {"detail": [messages.SLOT_BULK_DUPLICATED]},
+                    }
+                )
+                continue
+
+            seen.add(slot_id)
+            changes.append((slots[slot_id], data))
+            results.append({"id": slot_id})
+        return results, changes
+
+
+class SlotViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     Gestão de slots. Conferentes editam produto/quantidade durante conferência.
+    Paginação por cursor (id) com ?pagination=cursor.
+    GET condicional: ETag + If-None-Match (304) em list e retrieve.
     """
 
-    queryset = Slot.objects.all()
+    queryset = Slot.objects.select_related("cavalete")
     serializer_class = SlotSerializer
+    pagination_class = OptionalCursorPagination
+    cursor_ordering = ("id",)
     permission_classes = [IsAuditor]
 
+    def get_etag_queryset(self):
+        return Slot.objects.all()
+
+    def get_list_etag_parts(self, queryset):
+        return tuple(
+            queryset.aggregate(
+                slot_count=Count("id"), updated=Max("updated_at")
+            ).values()
+        )
+
+    def get_object_etag_parts(self, queryset):
+        return queryset.values_list("id", "updated_at").first()
+
     def perform_update(self, serializer):
         """Salva e registra log detalhado de atualização."""
         with transaction.atomic():
-            instance = serializer.instance
-            old_data = {
-                "product_code": instance.product_code,
-                "quantity": instance.quantity,
-            }
+            save_slot_update(serializer, self.request.user)
 
-            updated_instance = serializer.save()
-
-            new_data = {
-                "product_code": updated_instance.product_code,
-                "quantity": updated_instance.quantity,
-            }
-
-            log_slot_action(
-                updated_instance,
-                self.request.user,
-                Action.UPDATE,
-                old_data=old_data,
-                new_data=new_data,
-            )
+    def perform_destroy(self, instance):
+        """Exclui, registra log e atualiza os contadores do cavalete."""
+        with transaction.atomic():
+            delete_slot(instance, self.request.user)
 
     @action(detail=True, methods=["post"], url_path="start-confirmation")
     def start_confirmation(self, request, pk=None):
@@ -148,22 +471,12 @@ class SlotViewSet(viewsets.ModelViewSet):
         with transaction.atomic():
             slot = self.get_object()
 
-            if slot.status != Slot.Status.AVAILABLE:
+            if not start_slot_audit(slot, request.user):
                 return Response(
                     {"detail": messages.SLOT_INVALID_STATUS},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            slot.status = Slot.Status.AUDITING
-            slot.save()
-
-            log_slot_action(
-                slot,
-                request.user,
-                Action.START_AUDIT,
-                description="Conferência iniciada",
-            )
-
         return Response(
             {"status": "AUDITING", "detail": messages.SLOT_CONFIRMATION_STARTED}
         )
@@ -174,22 +487,90 @@ class SlotViewSet(viewsets.ModelViewSet):
         with transaction.atomic():
             slot = self.get_object()
 
-            if slot.status != Slot.Status.AUDITING:
+            if not finish_slot_audit(slot, request.user):
                 return Response(
                     {"detail": messages.SLOT_INVALID_STATUS},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            slot.status = Slot.Status.COMPLETED
-            slot.save()
-
-            log_slot_action(
-                slot,
-                request.user,
-                Action.FINISH_AUDIT,
-                description="Conferência finalizada",
-            )
-
         return Response(
             {"status": "COMPLETED", "detail": messages.SLOT_CONFIRMATION_FINISHED}
         )
+
+    @action(detail=False, methods=["post"], url_path="sync")
+    def sync(self, request):
+        """
+        Aplica em ordem a fila de operações offline do PWA (start/edit/finish).
+        Body: {"operations": [{"key", "type", "slot", "data"}]}. Cada `key` é
+        gerada pelo cliente; chaves já aplicadas são ignoradas (duplicate).
+        Retorna o resultado por operação: applied, duplicate ou error.
+        """
+        batch = SyncBatchSerializer(data=request.data)
+        batch.is_valid(raise_exception=True)
+        operations = batch.validated_data["operations"]
+
+        with transaction.atomic():
+            # Trava os slots antes de ler as chaves: envios concorrentes da
+            # mesma fila enxergam as chaves gravadas pelo primeiro.
+            slots = Slot.objects.select_for_update().in_bulk(
+                {operation["slot"] for operation in operations}
+            )
+            applied_keys = set(
+                SyncOperation.objects.filter(
+                    user=request.user,
+                    key__in=[operation["key"] for operation in operations],
+                ).values_list("key", flat=True)
+            )
+
+            results = []
+            records = []
+            for operation in operations:
+                key = operation["key"]
+                if key in applied_keys:
+                    results.append(
+                        {
+                            "key": key,
+                            "status": "duplicate",
+                            "detail": messages.SYNC_OPERATION_DUPLICATED,
+                        }
+                    )
+                    continue
+
+                slot = slots.get(operation["slot"])
+                error = self._apply_sync_operation(operation, slot)
+                if error:
+                    results.append({"key": key, "status": "error", "detail": error})
+                    continue
+
+                applied_keys.add(key)
+                records.append(
+                    SyncOperation(
+                        key=key,
+                        user=request.user,
+                        slot_id=operation["slot"],
+                        operation=operation["type"],
+                    )
+                )
+                results.append({"key": key, "status": "applied"})
+
+            SyncOperation.objects.bulk_create(records)
+
+        return Response({"results": results})
+
+    def _apply_sync_operation(self, operation, slot):
+        """Aplica uma operação offline. Retorna a mensagem de erro ou None."""
+        if slot is None:
+            return messages.SLOT_NOT_FOUND
+
+        if operation["type"] == SyncOperationSerializer.START:
+            applied = start_slot_audit(slot, self.request.user)
+        elif operation["type"] == SyncOperationSerializer.FINISH:
+            applied = finish_slot_audit(slot, self.request.user)
+        else:
+            serializer = SlotSerializer(slot, data=operation["data"], partial=True)
+            if not serializer.is_valid():
+                return serializer.errors
+            save_slot_update(serializer, self.request.user)
+            applied = True
+
+        return None if applied else messages.SLOT_INVALID_STATUS
@@ -1,3 +1,60 @@
-from django.contrib import admin
+"""
+Recursos compartilhados do Django Admin para tabelas grandes.
+"""
 
-# Register your models here.
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+# Abaixo disso a contagem é exata; acima, estimada ou limitada.
+EXACT_COUNT_LIMIT = 10000
+
+
+def estimated_row_count(model, using="default"):
+    """
+    Estimativa de linhas da tabela pelas estatísticas do PostgreSQL
+    (pg_class.reltuples, somando as partições). None fora do PostgreSQL ou
+    sem estatísticas (tabela nunca analisada).
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT SUM(GREATEST(c.reltuples, 0))::bigint, MAX(c.reltuples) "
+            "FROM pg_class c WHERE c.oid = %s::regclass OR c.oid IN ("
+            "SELECT inhrelid FROM pg_inherits WHERE inhparent = %s::regclass)",
+            [model._meta.db_table] * 2,
+        )
+        total, analyzed = cursor.fetchone()
+    return total if analyzed is not None and analyzed >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator do admin sem COUNT(*) completo:
+    - sem filtro/busca, no PostgreSQL: estimativa do planner;
+    - demais casos: COUNT limitado a EXACT_COUNT_LIMIT + 1 linhas (subquery
+      com LIMIT). Acima disso a paginação mostra só as primeiras páginas.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > EXACT_COUNT_LIMIT:
+                return estimate
+        return queryset[: EXACT_COUNT_LIMIT + 1].count()
+
+
+class LargeTableAdminMixin:
+    """
+    Changelist de tabela grande: contagem estimada/limitada e sem o COUNT
+    extra do total sem filtros. As classes ainda devem definir
+    list_select_related e search_fields com lookups de prefixo indexados
+    (ex.: "code__startswith").
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
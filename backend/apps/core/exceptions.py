@@ -3,7 +3,22 @@
 from rest_framework.response import Response
 from rest_framework.views import exception_handler as drf_exception_handler
 
-from clients.sankhya.exceptions import SankhyaAuthError, SankhyaProductError
+from clients.sankhya.exceptions import (
+    SankhyaAuthError,
+    SankhyaProductError,
+    SankhyaProductNotFoundError,
+)
+
+
+def sankhya_error_status(exc):
+    """Status HTTP de uma exceção do client Sankhya (None se não for uma)."""
+    if isinstance(exc, SankhyaAuthError):
+        return 503
+    if isinstance(exc, SankhyaProductNotFoundError):
+        return 404
+    if isinstance(exc, SankhyaProductError):
+        return 502
+    return None
 
 
 def custom_exception_handler(exc, context):
@@ -11,9 +26,7 @@ def custom_exception_handler(exc, context):
     response = drf_exception_handler(exc, context)
     if response is not None:
         return response
-    if isinstance(exc, SankhyaAuthError):
-        return Response({"detail": str(exc)}, status=503)
-    if isinstance(exc, SankhyaProductError):
-        status = 404 if "Produto não encontrado" in str(exc) else 502
+    status = sankhya_error_status(exc)
+    if status is not None:
         return Response({"detail": str(exc)}, status=status)
     return None
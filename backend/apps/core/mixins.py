@@ -0,0 +1,75 @@
+"""Mixins reutilizáveis para ViewSets DRF."""
+
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class ConditionalGetMixin:
+    """
+    ETag forte e GET condicional (If-None-Match -> 304) em list e retrieve.
+
+    O ETag é calculado a partir de metadados baratos (ex.: MAX(updated_at) e
+    COUNT), sem serializar o corpo. A view implementa `get_list_etag_parts`
+    e `get_object_etag_parts`, que devolvem tuplas de valores; retornar
+    None desativa o ETag (ex.: objeto inexistente, que segue para o 404).
+    """
+
+    def get_etag_queryset(self):
+        """QuerySet base para o cálculo do ETag (sem anotações pesadas)."""
+        return self.get_queryset()
+
+    def get_list_etag_parts(self, queryset):
+        raise NotImplementedError
+
+    def get_object_etag_parts(self, queryset):
+        raise NotImplementedError
+
+    def make_etag(self, parts):
+        """ETag forte: hash das partes + usuário + URL (inclui query string)."""
+        user = self.request.user
+        parts = (*parts, getattr(user, "pk", None), self.request.get_full_path())
+        raw = "|".join(str(part) for part in parts)
+        return quote_etag(hashlib.sha256(raw.encode()).hexdigest()[:32])
+
+    def _etag_matches(self, etag):
+        header = self.request.headers.get("If-None-Match")
+        if not header:
+            return False
+        etags = parse_etags(header)
+        if "*" in etags:
+            return True
+        # If-None-Match usa comparação fraca (RFC 9110).
+        return etag.removeprefix("W/") in {tag.removeprefix("W/") for tag in etags}
+
+    def _conditional_response(self, parts, handler, *args, **kwargs):
+        if parts is None:
+            return handler(self.request, *args, **kwargs)
+        etag = self.make_etag(parts)
+        if self._etag_matches(etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(self.request, *args, **kwargs)
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response["ETag"] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_etag_queryset())
+        parts = self.get_list_etag_parts(queryset)
+        return self._conditional_response(parts, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_etag_queryset())
+        try:
+            queryset = queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+            parts = self.get_object_etag_parts(queryset)
+        except (TypeError, ValueError, ValidationError):
+            parts = None
+        return self._conditional_response(parts, super().retrieve, *args, **kwargs)
@@ -0,0 +1,51 @@
+"""Operações de migração reutilizáveis."""
+
+from django.db import migrations
+
+
+def is_partitioned_table(connection, table):
+    """Indica se a tabela é particionada (declarativa; só PostgreSQL)."""
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+class AddIndexConcurrently(migrations.AddIndex):
+    """
+    AddIndex que, no PostgreSQL, usa CREATE INDEX CONCURRENTLY (não bloqueia
+    escritas em tabelas grandes). Em outros bancos, e em tabelas
+    particionadas (onde o PostgreSQL não aceita CONCURRENTLY), equivale ao
+    AddIndex. A migração precisa de `atomic = False`.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self._concurrently(schema_editor, model):
+            return super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.add_index(model, self.index, concurrently=True)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not self._concurrently(schema_editor, model):
+            return super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.remove_index(model, self.index, concurrently=True)
+
+    @staticmethod
+    def _concurrently(schema_editor, model):
+        connection = schema_editor.connection
+        return connection.vendor == "postgresql" and not is_partitioned_table(
+            connection, model._meta.db_table
+        )
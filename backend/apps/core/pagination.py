@@ -0,0 +1,157 @@
+"""Paginação da API: número de página (padrão) ou cursor (keyset) sob demanda."""
+
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, PageNumberPagination
+
+
+class ViewOrderingCursorPagination(CursorPagination):
+    """
+    Paginação por cursor com ordenação definida em `view.cursor_ordering`.
+
+    O CursorPagination do DRF guarda no cursor só o valor do primeiro campo
+    da ordenação e pula as linhas empatadas com OFFSET (limitado a
+    offset_cutoff). Com muitas linhas no mesmo timestamp a página fica
+    mais lenta e, acima do limite, repete linhas. Aqui o cursor guarda o
+    valor de todos os campos da ordenação e a página filtra pela posição
+    composta (keyset): (a < x) OR (a = x AND b < y) ... sem OFFSET. O último
+    campo deve ser único (ex.: id).
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, "cursor_ordering", None) or self.ordering
+        if isinstance(ordering, str):
+            return (ordering,)
+        return tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+        positions = self._decode_positions(self.cursor)
+
+        if reverse:
+            queryset = queryset.order_by(*_reversed(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if positions is not None:
+            queryset = queryset.filter(self._after(positions, reverse))
+
+        results = list(queryset[: self.page_size + 1])
+        self.page = results[: self.page_size]
+        has_following = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = positions is not None, has_following
+        else:
+            self.has_next, self.has_previous = has_following, positions is not None
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self._link(self.page[0], reverse=True)
+
+    def _link(self, instance, reverse):
+        positions = [str(self._field_value(instance, field)) for field in self.ordering]
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=reverse, position=json.dumps(positions))
+        )
+
+    def _decode_positions(self, cursor):
+        if cursor is None or cursor.position is None:
+            return None
+        try:
+            positions = json.loads(cursor.position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(positions, list) or len(positions) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return positions
+
+    def _after(self, positions, reverse):
+        """Linhas depois da posição (antes, se reverse) na ordenação composta."""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, positions):
+            name = field.lstrip("-")
+            descending = field.startswith("-") != reverse
+            condition |= equal & Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+            equal &= Q(**{name: value})
+        # Limite no primeiro campo para o planner usar o índice.
+        first = self.ordering[0]
+        descending = first.startswith("-") != reverse
+        bound = Q(
+            **{f"{first.lstrip('-')}__{'lte' if descending else 'gte'}": positions[0]}
+        )
+        return bound & condition
+
+    @staticmethod
+    def _field_value(instance, field):
+        name = field.lstrip("-")
+        if isinstance(instance, dict):
+            return instance[name]
+        return getattr(instance, name)
+
+
+def _reversed(ordering):
+    return tuple(
+        field[1:] if field.startswith("-") else f"-{field}" for field in ordering
+    )
+
+
+class OptionalCursorPagination(PageNumberPagination):
+    """
+    PageNumberPagination por padrão; cursor (keyset) quando o cliente pede.
+
+    O modo cursor é ativado com ?pagination=cursor (primeira página) ou pela
+    presença de ?cursor= (links next/previous). Não executa COUNT(*) nem
+    OFFSET: cada página filtra pela posição do cursor, então páginas
+    profundas custam o mesmo que a primeira. A view define a ordenação em
+    `cursor_ordering` (ex.: ("-timestamp", "-id")); o primeiro campo deve
+    ser indexado e o último, único. Empates no primeiro campo não degradam a
+    paginação (ver ViewOrderingCursorPagination).
+    """
+
+    mode_query_param = "pagination"
+    cursor_mode = "cursor"
+    cursor_paginator_class = ViewOrderingCursorPagination
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def use_cursor(self, request, view):
+        """Indica se a requisição pediu paginação por cursor."""
+        if not getattr(view, "cursor_ordering", None):
+            return False
+        cursor_param = self.cursor_paginator_class.cursor_query_param
+        return (
+            request.query_params.get(self.mode_query_param) == self.cursor_mode
+            or cursor_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request, view):
+            self.cursor_paginator = self.cursor_paginator_class()
+            self.cursor_paginator.page_size = self.page_size
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        self.cursor_paginator = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
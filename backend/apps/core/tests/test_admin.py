@@ -0,0 +1,31 @@
+"""Paginator do admin para tabelas grandes."""
+
+import pytest
+
+from apps.accounts.models import User
+from apps.core import admin as core_admin
+from apps.core.admin import EstimatedCountPaginator
+
+
+@pytest.mark.django_db
+class TestEstimatedCountPaginator:
+    def test_exact_count_below_limit(self):
+        for i in range(3):
+            User.objects.create_user(username=f"u{i}", password="password")
+
+        paginator = EstimatedCountPaginator(User.objects.order_by("id"), 2)
+
+        assert paginator.count == 3
+        assert paginator.num_pages == 2
+
+    def test_count_is_capped(self, monkeypatch, django_assert_num_queries):
+        monkeypatch.setattr(core_admin, "EXACT_COUNT_LIMIT", 2)
+        for i in range(5):
+            User.objects.create_user(username=f"u{i}", password="password")
+        queryset = User.objects.filter(username__startswith="u").order_by("id")
+
+        with django_assert_num_queries(1) as context:
+            count = EstimatedCountPaginator(queryset, 2).count
+
+        assert count == 3
+        assert "LIMIT 3" in context.captured_queries[0]["sql"]
@@ -1,12 +1,15 @@
 from django.contrib import admin
-from .models import CavaleteHistory, SlotHistory
+from apps.core.admin import LargeTableAdminMixin
+from .models import CavaleteHistory, SlotHistory, SyncOperation
 
 
 @admin.register(CavaleteHistory)
-class CavaleteHistoryAdmin(admin.ModelAdmin):
+class CavaleteHistoryAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ["cavalete", "action", "user", "timestamp"]
     list_filter = ["action", "timestamp", "user"]
-    search_fields = ["cavalete__code", "user__username", "description"]
+    # Prefixo (LIKE 'x%') nos índices de código/usuário; sem busca em texto
+    search_fields = ["cavalete__code__startswith", "user__username__startswith"]
+    list_select_related = ["cavalete", "user"]
     readonly_fields = [
         "cavalete",
         "user",
@@ -14,7 +17,7 @@ class CavaleteHistoryAdmin(admin.ModelAdmin):
         "timestamp",
         "description",
     ]
-    ordering = ["-timestamp"]
+    ordering = ["-timestamp", "-id"]
 
     def has_add_permission(self, request):
         return False
@@ -27,7 +30,7 @@ class CavaleteHistoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(SlotHistory)
-class SlotHistoryAdmin(admin.ModelAdmin):
+class SlotHistoryAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = [
         "slot",
         "action",
@@ -38,11 +41,10 @@ class SlotHistoryAdmin(admin.ModelAdmin):
     ]
     list_filter = ["action", "timestamp", "user"]
     search_fields = [
-        "slot__cavalete__code",
-        "user__username",
-        "description",
-        "new_product_code",
+        "slot__cavalete__code__startswith",
+        "user__username__startswith",
     ]
+    list_select_related = ["slot__cavalete", "user"]
     readonly_fields = [
         "slot",
         "user",
@@ -54,7 +56,7 @@ class SlotHistoryAdmin(admin.ModelAdmin):
         "new_quantity",
         "description",
     ]
-    ordering = ["-timestamp"]
+    ordering = ["-timestamp", "-id"]
 
     def has_add_permission(self, request):
         return False
@@ -64,3 +66,19 @@ class SlotHistoryAdmin(admin.ModelAdmin):
 
     def has_delete_permission(self, request, obj=None):
         return False
+
+
+@admin.register(SyncOperation)
+class SyncOperationAdmin(admin.ModelAdmin):
+    list_display = ["key", "operation", "user", "slot_id", "applied_at"]
+    list_filter = ["operation", "applied_at"]
+    search_fields = ["key", "user__username"]
+    list_select_related = ["user"]
+    readonly_fields = ["key", "user", "slot", "operation", "applied_at"]
+    ordering = ["-applied_at"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
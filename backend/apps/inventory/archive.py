@@ -0,0 +1,262 @@
+"""
+Arquivamento do histórico antigo em arquivos JSONL compactados (gzip).
+
+`archive_history` lê as entradas anteriores a um corte em ordem de
+(timestamp, id), grava arquivos de até `chunk_size` linhas e um manifesto
+por execução, confere as contagens relendo os arquivos e só então apaga as
+linhas do banco, em lotes de `batch_size`. `iter_archived` lê os arquivos
+de volta (sem restaurá-los no banco), pulando os que estão fora do período.
+
+Cada execução arquiva só a partir do maior corte (`before`) já registrado
+em manifesto, então repetir o comando (após `--keep` ou um DELETE
+interrompido) não grava as mesmas linhas de novo; em vez disso, apaga as
+linhas dos manifestos ainda não marcados com `deleted`. Apagar histórico
+de slots invalida o cache do relatório de divergências.
+
+Estrutura em settings.HISTORY_ARCHIVE_DIR:
+    <tipo>/manifest-<execução>.json
+    <tipo>/<execução>-0001.jsonl.gz, <execução>-0002.jsonl.gz, ...
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import reports
+from .models import CavaleteHistory, SlotHistory
+
+ARCHIVE_MODELS = {"cavaletes": CavaleteHistory, "slots": SlotHistory}
+# Colunas extras, para filtrar o arquivo sem consultar o banco
+ARCHIVE_EXTRA_FIELDS = {"slots": {"cavalete_id": F("slot__cavalete_id")}}
+CHUNK_SIZE = 100000
+BATCH_SIZE = 5000
+
+
+class ArchiveError(Exception):
+    """Conferência falhou; nada foi apagado do banco."""
+
+
+@dataclass
+class ArchiveResult:
+    kind: str
+    rows: int = 0
+    deleted: int = 0
+    files: list = field(default_factory=list)
+    manifest: Path = None
+
+
+def archive_dir(kind, directory=None):
+    return Path(directory or settings.HISTORY_ARCHIVE_DIR) / kind
+
+
+def archived_until(kind, directory=None):
+    """Maior corte já arquivado de `kind` (None se não há manifestos)."""
+    cutoffs = [parse_datetime(m["before"]) for m in load_manifests(kind, directory)]
+    return max(cutoffs, default=None)
+
+
+def archive_rows(kind, before, after=None):
+    """QuerySet (values) das entradas de `kind` em [after, before)."""
+    model = ARCHIVE_MODELS[kind]
+    fields = [f.attname for f in model._meta.concrete_fields]
+    queryset = model.objects.filter(timestamp__lt=before)
+    if after:
+        queryset = queryset.filter(timestamp__gte=after)
+    return queryset.order_by("timestamp", "id").values(
+        *fields, **ARCHIVE_EXTRA_FIELDS.get(kind, {})
+    )
+
+
+def archive_history(
+    kind,
+    before,
+    directory=None,
+    chunk_size=CHUNK_SIZE,
+    batch_size=BATCH_SIZE,
+    delete=True,
+):
+    """
+    Arquiva (e, com `delete`, remove do banco) as entradas de `kind`
+    ("cavaletes" ou "slots") anteriores a `before` e ainda não arquivadas.
+    """
+    result = ArchiveResult(kind)
+    target = archive_dir(kind, directory)
+    if delete:
+        result.deleted += _delete_pending(kind, target, batch_size)
+
+    after = archived_until(kind, directory)
+    queryset = archive_rows(kind, before, after)
+    expected = queryset.count()
+    if expected:
+        _archive(result, queryset, expected, before, after, target, chunk_size)
+        if delete:
+            result.deleted += _delete_manifest(
+                kind, target, result.manifest, batch_size
+            )
+
+    if kind == "slots" and result.deleted:
+        reports.invalidate_divergence_cache()
+    return result
+
+
+def _archive(result, queryset, expected, before, after, target, chunk_size):
+    """Grava os arquivos e o manifesto da execução, conferindo as contagens."""
+    target.mkdir(parents=True, exist_ok=True)
+    run = timezone.now().strftime("%Y%m%dT%H%M%S%f")
+
+    chunks = []
+    rows = queryset.iterator(chunk_size=min(chunk_size, 2000))
+    while batch := list(islice(rows, chunk_size)):
+        path = target / f"{run}-{len(chunks) + 1:04d}.jsonl.gz"
+        chunks.append(_write_chunk(path, batch))
+        result.rows += len(batch)
+
+    manifest = {
+        "kind": result.kind,
+        "model": ARCHIVE_MODELS[result.kind]._meta.label,
+        "after": after.isoformat() if after else None,
+        "before": before.isoformat(),
+        "created_at": timezone.now().isoformat(),
+        "rows": result.rows,
+        "deleted": False,
+        "chunks": chunks,
+    }
+    try:
+        _verify(target, manifest, expected)
+    except ArchiveError:
+        for chunk in chunks:
+            (target / chunk["file"]).unlink(missing_ok=True)
+        raise
+
+    result.manifest = target / f"manifest-{run}.json"
+    _write_atomic(result.manifest, json.dumps(manifest, indent=2).encode())
+    result.files = [target / chunk["file"] for chunk in chunks]
+
+
+def _delete_pending(kind, target, batch_size):
+    """Conclui o DELETE de execuções anteriores (--keep ou interrompidas)."""
+    return sum(
+        _delete_manifest(kind, target, path, batch_size)
+        for path in sorted(target.glob("manifest-*.json"))
+        if not json.loads(path.read_text()).get("deleted")
+    )
+
+
+def _delete_manifest(kind, target, path, batch_size):
+    """Apaga as linhas do manifesto e o marca como `deleted`."""
+    manifest = json.loads(path.read_text())
+    before = parse_datetime(manifest["before"])
+    deleted = _delete_archived(kind, before, target, manifest["chunks"], batch_size)
+    manifest["deleted"] = True
+    _write_atomic(path, json.dumps(manifest, indent=2).encode())
+    return deleted
+
+
+def _write_chunk(path, batch):
+    tmp = path.with_suffix(".tmp")
+    with gzip.open(tmp, "wt", encoding="utf-8") as fileobj:
+        for row in batch:
+            fileobj.write(json.dumps(row, cls=DjangoJSONEncoder) + "\n")
+    os.replace(tmp, path)
+    return {
+        "file": path.name,
+        "rows": len(batch),
+        "first_timestamp": batch[0]["timestamp"].isoformat(),
+        "last_timestamp": batch[-1]["timestamp"].isoformat(),
+        "first_id": batch[0]["id"],
+        "last_id": batch[-1]["id"],
+        "sha256": _sha256(path),
+    }
+
+
+def _write_atomic(path, content):
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(content)
+    os.replace(tmp, path)
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fileobj:
+        for block in iter(lambda: fileobj.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _verify(target, manifest, expected):
+    """Relê os arquivos e confere contagens e checksums antes de apagar."""
+    if manifest["rows"] != expected:
+        raise ArchiveError(
+            f"{manifest['kind']}: {manifest['rows']} linhas gravadas, "
+            f"{expected} esperadas."
+        )
+    for chunk in manifest["chunks"]:
+        path = target / chunk["file"]
+        with gzip.open(path, "rt", encoding="utf-8") as fileobj:
+            lines = sum(1 for _ in fileobj)
+        if lines != chunk["rows"] or _sha256(path) != chunk["sha256"]:
+            raise ArchiveError(f"{chunk['file']}: conteúdo não confere.")
+
+
+def _delete_archived(kind, before, target, chunks, batch_size):
+    """Apaga só os ids gravados nos arquivos, em lotes."""
+    model = ARCHIVE_MODELS[kind]
+    deleted = 0
+    for chunk in chunks:
+        ids = (row["id"] for row in _read_chunk(target / chunk["file"]))
+        while batch := list(islice(ids, batch_size)):
+            count, _ = model.objects.filter(pk__in=batch, timestamp__lt=before).delete()
+            deleted += count
+    return deleted
+
+
+def _read_chunk(path):
+    with gzip.open(path, "rt", encoding="utf-8") as fileobj:
+        for line in fileobj:
+            yield json.loads(line)
+
+
+def load_manifests(kind, directory=None):
+    """Manifestos de `kind`, do mais antigo para o mais novo."""
+    target = archive_dir(kind, directory)
+    manifests = []
+    for path in sorted(target.glob("manifest-*.json")):
+        manifests.append(json.loads(path.read_text()))
+    return manifests
+
+
+def iter_archived(kind, start=None, end=None, directory=None, **filters):
+    """
+    Entradas arquivadas de `kind` com start <= timestamp < end, em ordem
+    cronológica. `filters` compara colunas do arquivo (ex.: user_id=3,
+    action="UPDATE"). Arquivos fora do período não são abertos.
+    """
+    target = archive_dir(kind, directory)
+    filters = {key: str(value) for key, value in filters.items()}
+    for manifest in load_manifests(kind, directory):
+        for chunk in manifest["chunks"]:
+            if end and parse_datetime(chunk["first_timestamp"]) >= end:
+                continue
+            if start and parse_datetime(chunk["last_timestamp"]) < start:
+                continue
+            for row in _read_chunk(target / chunk["file"]):
+                if _matches(row, start, end, filters):
+                    yield row
+
+
+def _matches(row, start, end, filters):
+    if start or end:
+        timestamp = parse_datetime(row["timestamp"])
+        if (start and timestamp < start) or (end and timestamp >= end):
+            return False
+    return all(str(row.get(key)) == value for key, value in filters.items())
@@ -0,0 +1,142 @@
+"""
+Compactação de edições seguidas do mesmo slot (SlotHistory UPDATE).
+
+Uma sequência de UPDATEs do mesmo slot e do mesmo usuário, sem outra ação
+no meio e com no máximo `window` segundos entre uma edição e a seguinte,
+vira uma única linha: valores antigos da primeira edição, valores novos e
+horário da última.
+
+- Na gravação (settings.INVENTORY_HISTORY_COMPACT_WINDOW > 0):
+  `merge_slot_update` grava a linha juntada como uma entrada nova e apaga a
+  anterior. Nenhuma linha é reescrita no lugar, então o id sempre avança e
+  o feed changes/ (after_id) enxerga a junção.
+- Dados existentes: `compact_slot_history` (comando compact_slot_history),
+  que mantém o id da primeira linha. Por isso é uma operação offline: use
+  --since só para um período que os clientes do feed já leram.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import history, reports
+from .models import Action, SlotHistory
+
+BATCH_SIZE = 1000
+MERGED_FIELDS = ["new_product_code", "new_quantity", "timestamp"]
+
+
+def compact_window():
+    """Janela em segundos (0 desliga a compactação na gravação)."""
+    return getattr(settings, "INVENTORY_HISTORY_COMPACT_WINDOW", 0)
+
+
+def can_merge(previous, user_id, timestamp, window):
+    return (
+        previous is not None
+        and previous.action == Action.UPDATE
+        and previous.user_id == user_id
+        and timestamp - previous.timestamp <= timedelta(seconds=window)
+    )
+
+
+def merge_slot_update(slot, user, new_data, window):
+    """
+    Junta a edição à última linha do slot se ela for um UPDATE do mesmo
+    usuário dentro da janela: grava a junção como entrada nova (id maior) e
+    apaga a anterior, na transação da requisição. Retorna False se não houver
+    o que juntar (a edição deve ser registrada normalmente). Chamar com o slot
+    já salvo: a trava da linha do slot serializa edições concorrentes.
+    """
+    now = timezone.now()
+    previous = (
+        SlotHistory.objects.filter(slot=slot).order_by("-timestamp", "-id").first()
+    )
+    if not can_merge(previous, user.pk, now, window):
+        return False
+
+    merged = SlotHistory(
+        slot=slot,
+        user=user,
+        action=Action.UPDATE,
+        description=previous.description,
+        old_product_code=previous.old_product_code,
+        old_quantity=previous.old_quantity,
+        new_product_code=new_data.get("product_code"),
+        new_quantity=new_data.get("quantity"),
+        timestamp=now,
+    )
+    previous.delete()
+    # Na hora, independente do writer: a troca não pode ficar pela metade.
+    history.write([merged])
+    return True
+
+
+def compact_slot_history(window, since=None, batch_size=BATCH_SIZE, dry_run=False):
+    """
+    Compacta o histórico existente. Percorre as linhas em ordem de
+    (slot, timestamp, id) e aplica as junções em lotes (bulk_update das
+    linhas mantidas + DELETE das absorvidas). Retorna (linhas mantidas
+    alteradas, linhas removidas). Se algo mudou, invalida o cache do
+    relatório de divergências.
+    """
+    queryset = SlotHistory.objects.exclude(slot=None).order_by(
+        "slot_id", "timestamp", "id"
+    )
+    if since:
+        queryset = queryset.filter(timestamp__gte=since)
+    rows = queryset.only(
+        "id",
+        "slot_id",
+        "user_id",
+        "action",
+        "timestamp",
+        "new_product_code",
+        "new_quantity",
+    ).iterator(chunk_size=batch_size)
+
+    kept, removed = [], []
+    totals = [0, 0]
+    head = last = None
+    absorbed = False
+    for row in rows:
+        if (
+            last is not None
+            and last.slot_id == row.slot_id
+            and row.action == Action.UPDATE
+            and can_merge(last, row.user_id, row.timestamp, window)
+        ):
+            head.new_product_code = row.new_product_code
+            head.new_quantity = row.new_quantity
+            head.timestamp = row.timestamp
+            removed.append(row.id)
+            absorbed = True
+        else:
+            # Fim de uma sequência: só então grava, para nunca apagar as
+            # linhas absorvidas sem atualizar a mantida na mesma transação.
+            if absorbed:
+                kept.append(head)
+            if len(kept) + len(removed) >= batch_size:
+                _flush(kept, removed, totals, dry_run)
+            head, absorbed = row, False
+        last = row
+
+    if absorbed:
+        kept.append(head)
+    _flush(kept, removed, totals, dry_run)
+    if totals[1] and not dry_run:
+        reports.invalidate_divergence_cache()
+    return tuple(totals)
+
+
+def _flush(kept, removed, totals, dry_run):
+    if not dry_run and kept:
+        with transaction.atomic():
+            SlotHistory.objects.bulk_update(kept, MERGED_FIELDS)
+            SlotHistory.objects.filter(pk__in=removed).delete()
+    totals[0] += len(kept)
+    totals[1] += len(removed)
+    kept.clear()
+    removed.clear()
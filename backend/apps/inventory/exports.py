@@ -0,0 +1,85 @@
+"""
+Exportação de cavaletes (uma linha por slot) em CSV ou XLSX.
+
+As linhas vêm de um único SELECT (cavalete LEFT JOIN slots) lido com
+`.iterator()` — cursor no servidor no PostgreSQL — e são escritas à medida
+que chegam. CSV é gerado durante a resposta (StreamingHttpResponse); XLSX
+usa o modo write_only do openpyxl e é montado em arquivo temporário. Em
+ambos os casos a memória não cresce com o número de linhas.
+"""
+
+import csv
+import tempfile
+
+EXPORT_COLUMNS = [
+    "code",
+    "type",
+    "status",
+    "user",
+    "side",
+    "number",
+    "slot_status",
+    "product_code",
+    "product_description",
+    "quantity",
+]
+EXPORT_FIELDS = [
+    "code",
+    "type",
+    "status",
+    "user__username",
+    "slots__side",
+    "slots__number",
+    "slots__status",
+    "slots__product_code",
+    "slots__product_description",
+    "slots__quantity",
+]
+EXPORT_FORMATS = ("csv", "xlsx")
+CHUNK_SIZE = 2000
+
+
+def export_rows(queryset, chunk_size=CHUNK_SIZE):
+    """
+    Linhas da exportação para o QuerySet de cavaletes (já filtrado).
+    Cavaletes sem slots aparecem uma vez, com as colunas do slot vazias.
+    """
+    return (
+        queryset.order_by("code", "id", "slots__side", "slots__number")
+        .values_list(*EXPORT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+class _Echo:
+    """Buffer mínimo para csv.writer: devolve a linha em vez de guardá-la."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    """Gera o CSV linha a linha (UTF-8 com BOM, para abrir no Excel)."""
+    writer = csv.writer(_Echo())
+    yield "\ufeff" + writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        yield writer.writerow(["" if value is None else value for value in row])
+
+
+def write_xlsx(rows):
+    """
+    Escreve o XLSX em arquivo temporário (openpyxl write_only) e o devolve
+    posicionado no início. O arquivo é removido ao ser fechado.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Cavaletes")
+    sheet.append(EXPORT_COLUMNS)
+    for row in rows:
+        sheet.append(row)
+
+    fileobj = tempfile.TemporaryFile()
+    workbook.save(fileobj)
+    fileobj.seek(0)
+    return fileobj
@@ -0,0 +1,269 @@
+"""
+Gravação do histórico (CavaleteHistory / SlotHistory).
+
+Os services montam as entradas (instâncias não salvas) e as entregam a
+`record`. O modo é definido em settings.INVENTORY_HISTORY_WRITER:
+
+- "immediate" (padrão): grava na hora, dentro da transação da requisição.
+- "deferred": acumula as entradas da transação e grava todas com um
+  bulk_create por modelo em `transaction.on_commit`.
+- "background": no commit, entrega as entradas a uma thread que grava em
+  lotes (fila em memória do processo, limitada a QUEUE_MAX_SIZE; com a fila
+  cheia a gravação é feita na hora pela própria requisição). A fila é
+  esvaziada no encerramento normal do processo (atexit), mas entradas ainda
+  na fila se perdem se o processo for morto (SIGKILL, OOM). Use "deferred"
+  quando o histórico não puder ter perda.
+
+Nos modos adiados, entradas de uma transação (ou savepoint) desfeita são
+descartadas, como no modo imediato. O horário registrado é o da ação
+(`timestamp` é preenchido ao montar a entrada), não o da gravação.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+import weakref
+from functools import partial
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, close_old_connections, models, transaction
+
+logger = logging.getLogger(__name__)
+
+IMMEDIATE = "immediate"
+DEFERRED = "deferred"
+BACKGROUND = "background"
+MODES = (IMMEDIATE, DEFERRED, BACKGROUND)
+
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.5
+QUEUE_MAX_SIZE = 10000
+
+# Callback de on_commit da transação em curso, por thread (ver _transaction_batch).
+_pending = threading.local()
+
+
+def get_mode():
+    """Modo configurado em settings.INVENTORY_HISTORY_WRITER."""
+    mode = getattr(settings, "INVENTORY_HISTORY_WRITER", IMMEDIATE)
+    if mode not in MODES:
+        raise ImproperlyConfigured(
+            f"INVENTORY_HISTORY_WRITER inválido: {mode!r} (use {', '.join(MODES)})."
+        )
+    return mode
+
+
+def record(entries):
+    """Registra entradas de histórico conforme o modo configurado."""
+    entries = list(entries)
+    if not entries:
+        return
+
+    mode = get_mode()
+    if mode == IMMEDIATE:
+        write(entries)
+        return
+
+    dispatch = partial(_dispatch, mode, entries)
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        dispatch()
+    elif connection.savepoint_ids:
+        # Dentro de savepoint: callback próprio, descartado pelo Django se o
+        # savepoint for desfeito.
+        transaction.on_commit(dispatch, robust=True)
+    else:
+        _transaction_batch().extend(entries)
+
+
+def _transaction_batch():
+    """
+    Lista de entradas da transação em curso. No primeiro uso registra o
+    callback de on_commit que grava a lista inteira.
+
+    A thread guarda só uma referência fraca ao callback: quem o mantém vivo é
+    a lista de callbacks da conexão, que o Django limpa no commit (depois de
+    executá-lo) e no rollback. Callback morto = transação encerrada, e a
+    próxima chamada abre um lote novo.
+    """
+    ref = getattr(_pending, "flush", None)
+    flush_history = ref() if ref is not None else None
+    if flush_history is not None:
+        return flush_history.history_entries
+
+    mode = get_mode()
+    entries = []
+
+    def flush_history():
+        _pending.flush = None
+        _dispatch(mode, entries)
+
+    flush_history.history_entries = entries
+    _pending.flush = weakref.ref(flush_history)
+    transaction.on_commit(flush_history, robust=True)
+    return entries
+
+
+def _dispatch(mode, entries):
+    if mode == BACKGROUND:
+        _flusher.submit(entries)
+    else:
+        write(entries, after_commit=True)
+
+
+def write(entries, after_commit=False):
+    """
+    Grava as entradas com um bulk_create por modelo.
+    after_commit: gravação fora da transação original, em uma transação
+    própria. Se um objeto referenciado foi excluído nesse meio-tempo, a FK
+    fica nula (como o SET_NULL faria com a entrada já gravada).
+    """
+    by_model = {}
+    for entry in entries:
+        by_model.setdefault(type(entry), []).append(entry)
+
+    if not after_commit:
+        _bulk_create(by_model)
+        return
+
+    for model, items in by_model.items():
+        _detach_deleted_instances(model, items)
+    try:
+        with transaction.atomic():
+            _bulk_create(by_model)
+    except IntegrityError:
+        for model, items in by_model.items():
+            _detach_missing_references(model, items)
+        with transaction.atomic():
+            _bulk_create(by_model)
+
+
+def _bulk_create(by_model):
+    for model, items in by_model.items():
+        model.objects.bulk_create(items, batch_size=BATCH_SIZE)
+
+
+def _set_null_fields(model):
+    return [
+        field
+        for field in model._meta.concrete_fields
+        if field.is_relation and field.remote_field.on_delete == models.SET_NULL
+    ]
+
+
+def _detach_deleted_instances(model, items):
+    """Instâncias excluídas nesta thread (pk None em memória)."""
+    for field in _set_null_fields(model):
+        for item in items:
+            if field.is_cached(item):
+                related = getattr(item, field.name)
+                if related is not None and related.pk is None:
+                    setattr(item, field.name, None)
+
+
+def _detach_missing_references(model, items):
+    """Referências excluídas por outra transação (consulta as existentes)."""
+    for item in items:
+        # PKs atribuídos pela tentativa desfeita.
+        item.pk = None
+        item._state.adding = True
+
+    for field in _set_null_fields(model):
+        ids = {getattr(item, field.attname) for item in items} - {None}
+        existing = set(
+            field.related_model._base_manager.filter(pk__in=ids).values_list(
+                "pk", flat=True
+            )
+        )
+        for item in items:
+            if getattr(item, field.attname) not in existing:
+                setattr(item, field.attname, None)
+
+
+class BackgroundFlusher:
+    """Thread que grava em lotes as entradas recebidas após o commit."""
+
+    def __init__(
+        self, batch_size=BATCH_SIZE, interval=FLUSH_INTERVAL, maxsize=QUEUE_MAX_SIZE
+    ):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.maxsize = maxsize
+        self.queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def submit(self, entries):
+        """Enfileira as entradas; com a fila cheia, grava o restante na hora."""
+        self._ensure_started()
+        for index, entry in enumerate(entries):
+            try:
+                self.queue.put_nowait(entry)
+            except queue.Full:
+                logger.warning(
+                    "Fila do histórico cheia; gravando %d entradas na requisição.",
+                    len(entries) - index,
+                )
+                write(entries[index:], after_commit=True)
+                return
+
+    def join(self):
+        """Bloqueia até todas as entradas enviadas serem gravadas."""
+        self.queue.join()
+
+    def _ensure_started(self):
+        # Após fork (ex.: workers do gunicorn) a thread do pai não existe.
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self.queue = queue.Queue(maxsize=self.maxsize)
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._run, name="history-flusher", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._flush(batch)
+
+    def _flush(self, batch):
+        try:
+            close_old_connections()
+            write(batch, after_commit=True)
+        except Exception:
+            logger.exception("Falha ao gravar %d entradas de histórico.", len(batch))
+        finally:
+            for _ in batch:
+                self.queue.task_done()
+
+    def drain(self):
+        """Grava o que estiver na fila na thread atual (usado no encerramento)."""
+        batch = []
+        while True:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._flush(batch)
+
+
+_flusher = BackgroundFlusher()
+atexit.register(_flusher.drain)
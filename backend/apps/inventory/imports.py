@@ -0,0 +1,271 @@
+"""
+Importação em massa de cavaletes (e slots) a partir de planilha CSV/XLSX.
+
+Colunas: code, type, slots_a, slots_b. O arquivo é lido em streaming e
+gravado em lotes (bulk_create de cavaletes e slots; histórico CREATE pelo
+writer de history.py), com memória limitada ao tamanho do lote. Linhas inválidas são reportadas e não
+impedem as demais; use dry_run para apenas validar.
+"""
+
+import csv
+import io
+import zipfile
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+
+from apps.cavaletes.models import Cavalete, Slot
+from . import history
+from .models import Action, CavaleteHistory
+
+IMPORT_COLUMNS = ["code", "type", "slots_a", "slots_b"]
+DEFAULT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 500
+
+
+class CavaleteImportError(Exception):
+    """Arquivo de importação ilegível (formato, cabeçalho ou dependência)."""
+
+    pass
+
+
+@dataclass
+class ImportResult:
+    """Resumo da importação (ou da validação, em dry_run)."""
+
+    dry_run: bool = False
+    rows: int = 0
+    created: int = 0
+    slots_created: int = 0
+    error_count: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, line, code, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "code": code, "errors": errors})
+
+    def as_dict(self):
+        return {
+            "dry_run": self.dry_run,
+            "rows": self.rows,
+            "created": self.created,
+            "slots_created": self.slots_created,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+
+def iter_rows(fileobj, filename):
+    """
+    Lê a planilha em streaming. Gera (número da linha, dict por coluna).
+    XLSX usa openpyxl em modo read_only; demais extensões são tratadas como
+    CSV (separador "," ou ";", UTF-8 com ou sem BOM). Arquivo corrompido ou
+    fora do formato levanta CavaleteImportError; no CSV o erro de codificação
+    aparece no trecho em que ocorre, então lotes anteriores já podem ter sido
+    gravados (use dry_run para validar antes).
+    """
+    if filename.lower().endswith(".xlsx"):
+        rows = _iter_xlsx(fileobj)
+    else:
+        rows = _iter_csv(fileobj)
+
+    header = next(rows, None)
+    if header is None:
+        raise CavaleteImportError("Arquivo vazio.")
+    header = [str(name or "").strip().lower() for name in header]
+    missing = [name for name in IMPORT_COLUMNS if name not in header]
+    if missing:
+        raise CavaleteImportError(
+            f"Colunas obrigatórias ausentes: {', '.join(missing)}."
+        )
+
+    for line, values in enumerate(rows, start=2):
+        row = dict(zip(header, values))
+        if not any(row.get(name) not in (None, "") for name in IMPORT_COLUMNS):
+            continue
+        yield line, row
+
+
+def _iter_csv(fileobj):
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        first_line = text.readline()
+        delimiter = ";" if first_line.count(";") > first_line.count(",") else ","
+        yield next(csv.reader([first_line], delimiter=delimiter), [])
+        yield from csv.reader(text, delimiter=delimiter)
+    except UnicodeDecodeError as e:
+        raise CavaleteImportError(
+            "Arquivo CSV com codificação inválida (use UTF-8)."
+        ) from e
+    finally:
+        # Devolve o arquivo original sem fechá-lo junto com o wrapper.
+        text.detach()
+
+
+def _iter_xlsx(fileobj):
+    try:
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+    except ImportError as e:
+        raise CavaleteImportError("Importação XLSX requer openpyxl.") from e
+
+    try:
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError) as e:
+        # KeyError: ZIP válido sem as partes de uma planilha XLSX.
+        raise CavaleteImportError("Arquivo XLSX inválido ou corrompido.") from e
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def _parse_count(value):
+    """Quantidade de slots: vazio -> 0; aceita int, float inteiro ou texto."""
+    if value in (None, ""):
+        return 0
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    try:
+        number = int(str(value).strip())
+    except ValueError:
+        return None
+    return number if number >= 0 else None
+
+
+def _validate_row(row, seen_codes):
+    """Valida uma linha. Retorna (dados normalizados, lista de erros)."""
+    errors = []
+    code = str(row.get("code") or "").strip()
+    cavalete_type = str(row.get("type") or "").strip().upper()
+    cavalete_type = cavalete_type or Cavalete.Type.DEFAULT
+    slots_a = _parse_count(row.get("slots_a"))
+    slots_b = _parse_count(row.get("slots_b"))
+
+    max_length = Cavalete._meta.get_field("code").max_length
+    if not code:
+        errors.append("code é obrigatório.")
+    elif len(code) > max_length:
+        errors.append(f"code excede {max_length} caracteres.")
+    elif code in seen_codes:
+        errors.append("code repetido no arquivo.")
+    if cavalete_type not in Cavalete.Type.values:
+        errors.append(f"type inválido: {cavalete_type}.")
+    if slots_a is None or slots_b is None:
+        errors.append("slots_a e slots_b devem ser inteiros não negativos.")
+    elif slots_a == 0 and slots_b == 0:
+        errors.append("O cavalete deve ter pelo menos 1 slot (Lado A ou B).")
+
+    data = {"code": code, "type": cavalete_type, "slots_a": slots_a, "slots_b": slots_b}
+    return data, errors
+
+
+def import_cavaletes(rows, user=None, dry_run=False, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Importa cavaletes de `rows` (iterável de (linha, dict), ex.: iter_rows).
+    Cada lote é validado com uma query (códigos existentes) e gravado em uma
+    transação: bulk_create de cavaletes e slots e histórico CREATE via
+    history.record (respeita INVENTORY_HISTORY_WRITER).
+    """
+    result = ImportResult(dry_run=dry_run)
+    seen_codes = set()
+    rows = iter(rows)
+
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            break
+        result.rows += len(chunk)
+
+        valid = []
+        for line, row in chunk:
+            data, errors = _validate_row(row, seen_codes)
+            if errors:
+                result.add_error(line, data["code"], errors)
+                continue
+            seen_codes.add(data["code"])
+            valid.append((line, data))
+
+        valid, _ = _drop_existing(valid, result)
+
+        if dry_run:
+            result.created += len(valid)
+            result.slots_created += sum(d["slots_a"] + d["slots_b"] for _, d in valid)
+            continue
+
+        _save_batch(valid, user, result, batch_size)
+
+    return result
+
+
+def _drop_existing(valid, result):
+    """Tira do lote (e reporta) os códigos já cadastrados. Retorna (lote, quantos)."""
+    existing = set(
+        Cavalete.objects.filter(
+            code__in=[data["code"] for _, data in valid]
+        ).values_list("code", flat=True)
+    )
+    for line, data in valid:
+        if data["code"] in existing:
+            result.add_error(line, data["code"], ["code já cadastrado."])
+    return [item for item in valid if item[1]["code"] not in existing], len(existing)
+
+
+def _save_batch(valid, user, result, batch_size):
+    """
+    Grava o lote em uma transação. Se outra requisição cadastrou um dos
+    códigos depois da conferência (IntegrityError), reporta esses códigos e
+    tenta de novo com o restante.
+    """
+    while valid:
+        try:
+            with transaction.atomic():
+                _create_batch([data for _, data in valid], user, result, batch_size)
+            return
+        except IntegrityError:
+            valid, dropped = _drop_existing(valid, result)
+            if not dropped:
+                raise
+
+
+def _create_batch(valid, user, result, batch_size):
+    """Grava um lote já validado (cavaletes, slots e histórico)."""
+    cavaletes = Cavalete.objects.bulk_create(
+        [
+            Cavalete(
+                code=data["code"],
+                type=data["type"],
+                slots_total=data["slots_a"] + data["slots_b"],
+            )
+            for data in valid
+        ],
+        batch_size=batch_size,
+    )
+    slots = [
+        Slot(
+            cavalete=cavalete,
+            side=side,
+            number=number,
+            status=Slot.Status.AVAILABLE,
+        )
+        for cavalete, data in zip(cavaletes, valid)
+        for side, count in (
+            (Slot.Side.SIDE_A, data["slots_a"]),
+            (Slot.Side.SIDE_B, data["slots_b"]),
+        )
+        for number in range(1, count + 1)
+    ]
+    Slot.objects.bulk_create(slots, batch_size=batch_size)
+    history.record(
+        CavaleteHistory(
+            cavalete=cavalete,
+            user=user,
+            action=Action.CREATE,
+            description="Importado via planilha",
+        )
+        for cavalete in cavaletes
+    )
+    result.created += len(cavaletes)
+    result.slots_created += len(slots)
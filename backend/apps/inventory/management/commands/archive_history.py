@@ -0,0 +1,100 @@
+"""
+Arquiva o histórico antigo em JSONL compactado e o remove do banco.
+
+Exemplo (cron mensal):
+    python manage.py archive_history --older-than-days 365
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from apps.inventory.archive import (
+    ARCHIVE_MODELS,
+    BATCH_SIZE,
+    CHUNK_SIZE,
+    ArchiveError,
+    archive_history,
+    archive_rows,
+    archived_until,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Grava as entradas de histórico anteriores ao corte em arquivos "
+        "JSONL.gz (settings.HISTORY_ARCHIVE_DIR), confere as contagens e "
+        "apaga as linhas arquivadas em lotes."
+    )
+
+    def add_arguments(self, parser):
+        cutoff = parser.add_mutually_exclusive_group(required=True)
+        cutoff.add_argument("--before", help="Data de corte (AAAA-MM-DD).")
+        cutoff.add_argument(
+            "--older-than-days", type=int, help="Corte relativo a hoje, em dias."
+        )
+        parser.add_argument(
+            "--kind",
+            choices=[*ARCHIVE_MODELS, "all"],
+            default="all",
+            help="Histórico a arquivar (padrão: os dois).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help=f"Linhas por arquivo (padrão: {CHUNK_SIZE}).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help=f"Linhas por DELETE (padrão: {BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Grava os arquivos sem apagar as linhas do banco.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas informa quantas linhas seriam arquivadas.",
+        )
+
+    def handle(self, *args, **options):
+        before = self.cutoff(options)
+        kinds = ARCHIVE_MODELS if options["kind"] == "all" else [options["kind"]]
+
+        for kind in kinds:
+            if options["dry_run"]:
+                count = archive_rows(kind, before, archived_until(kind)).count()
+                self.stdout.write(f"{kind}: {count} linhas antes de {before:%Y-%m-%d}.")
+                continue
+            try:
+                result = archive_history(
+                    kind,
+                    before,
+                    chunk_size=options["chunk_size"],
+                    batch_size=options["batch_size"],
+                    delete=not options["keep"],
+                )
+            except ArchiveError as exc:
+                raise CommandError(f"{exc} Nenhuma linha foi apagada.")
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{kind}: {result.rows} linhas em {len(result.files)} "
+                    f"arquivos, {result.deleted} apagadas do banco."
+                )
+            )
+
+    def cutoff(self, options):
+        if options["older_than_days"] is not None:
+            day = timezone.localdate() - timedelta(days=options["older_than_days"])
+        else:
+            day = parse_date(options["before"])
+            if day is None:
+                raise CommandError("--before deve estar no formato AAAA-MM-DD.")
+        return timezone.make_aware(datetime.combine(day, time.min))
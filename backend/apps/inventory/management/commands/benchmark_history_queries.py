@@ -0,0 +1,196 @@
+"""
+Compara os planos das consultas de histórico com e sem os índices compostos.
+
+Uso típico (PostgreSQL, banco de testes):
+    python manage.py benchmark_history_queries --seed 2000000 --analyze
+
+O plano "antes" é obtido dentro de uma transação que remove os índices
+compostos e recria os índices simples das FKs (estado anterior à migração
+0004); a transação é desfeita ao final. Não rode em produção: a troca de
+índices bloqueia as tabelas enquanto a transação está aberta.
+"""
+
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from apps.cavaletes.models import Cavalete, Slot
+from apps.inventory.models import Action, CavaleteHistory, SlotHistory
+from apps.inventory.services import create_cavalete_structure
+from apps.inventory.views import CavaleteHistoryViewSet, SlotHistoryViewSet
+
+PAGE_SIZE = 20
+SEED_CAVALETES = 200
+SEED_SLOTS_PER_SIDE = 10
+SEED_USERS = 20
+# FKs que tinham índice simples antes dos índices compostos
+LEGACY_FK_INDEXES = {
+    CavaleteHistory: ["cavalete", "user"],
+    SlotHistory: ["slot", "user"],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Mostra o plano (EXPLAIN) das consultas dos ViewSets de histórico "
+        "antes e depois dos índices compostos; opcionalmente popula as tabelas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Linhas a inserir em cada tabela de histórico antes de medir.",
+        )
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="EXPLAIN ANALYZE (PostgreSQL): executa as consultas e mostra tempos.",
+        )
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            self.seed(options["seed"], options["batch_size"])
+
+        queries = self.build_queries()
+        explain_options = {}
+        if options["analyze"] and connection.vendor == "postgresql":
+            explain_options = {"analyze": True, "buffers": True}
+
+        after = {label: qs.explain(**explain_options) for label, qs in queries}
+        before = self.explain_without_composite_indexes(queries, explain_options)
+
+        for label, _ in queries:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n== {label}"))
+            self.stdout.write("-- antes (só índices das FKs):")
+            self.stdout.write(before[label])
+            self.stdout.write("-- depois (índices compostos):")
+            self.stdout.write(after[label])
+
+    def build_queries(self):
+        """Primeira página de cada filtro suportado pelos ViewSets."""
+        slot_history = SlotHistoryViewSet.queryset.all()
+        cavalete_history = CavaleteHistoryViewSet.queryset.all()
+        sample = SlotHistory.objects.exclude(slot=None).values(
+            "slot_id", "slot__cavalete_id", "user_id"
+        )[:1]
+        sample = sample[0] if sample else {}
+
+        queries = [
+            ("slots: sem filtro", slot_history),
+            ("slots: slot", slot_history.filter(slot=sample.get("slot_id"))),
+            (
+                "slots: slot__cavalete",
+                slot_history.filter(slot__cavalete=sample.get("slot__cavalete_id")),
+            ),
+            ("slots: user", slot_history.filter(user=sample.get("user_id"))),
+            ("slots: action", slot_history.filter(action=Action.UPDATE)),
+            ("cavaletes: sem filtro", cavalete_history),
+            (
+                "cavaletes: cavalete",
+                cavalete_history.filter(cavalete=sample.get("slot__cavalete_id")),
+            ),
+            ("cavaletes: user", cavalete_history.filter(user=sample.get("user_id"))),
+            ("cavaletes: action", cavalete_history.filter(action=Action.UPDATE)),
+        ]
+        return [(label, qs[:PAGE_SIZE]) for label, qs in queries]
+
+    def explain_without_composite_indexes(self, queries, explain_options):
+        plans = {}
+        statements = self.legacy_index_sql()
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
+            if connection.vendor == "postgresql":
+                self.analyze_tables()
+            for label, qs in queries:
+                plans[label] = qs.explain(**explain_options)
+            transaction.set_rollback(True)
+        return plans
+
+    def legacy_index_sql(self):
+        """SQL que volta os índices ao estado anterior (só FKs indexadas)."""
+        editor = connection.schema_editor()
+        statements = []
+        for model, fk_fields in LEGACY_FK_INDEXES.items():
+            for index in model._meta.indexes:
+                statements.append(f"DROP INDEX {editor.quote_name(index.name)}")
+            for field in fk_fields:
+                index = models.Index(
+                    fields=[field], name=f"bench_{model._meta.model_name}_{field}"
+                )
+                statements.append(str(index.create_sql(model, editor)))
+        return statements
+
+    def analyze_tables(self):
+        with connection.cursor() as cursor:
+            for model in LEGACY_FK_INDEXES:
+                cursor.execute(f"ANALYZE {model._meta.db_table}")
+
+    def seed(self, rows, batch_size):
+        """Insere `rows` entradas em cada tabela, espalhadas em um ano."""
+        users, cavalete_ids, slot_ids = self.seed_structure()
+        actions = Action.values
+        now = timezone.now()
+        seconds = int(timedelta(days=365).total_seconds())
+
+        def timestamp():
+            return now - timedelta(seconds=random.randrange(seconds))
+
+        for start in range(0, rows, batch_size):
+            size = min(batch_size, rows - start)
+            SlotHistory.objects.bulk_create(
+                SlotHistory(
+                    slot_id=random.choice(slot_ids),
+                    user_id=random.choice(users),
+                    action=random.choice(actions),
+                    timestamp=timestamp(),
+                )
+                for _ in range(size)
+            )
+            CavaleteHistory.objects.bulk_create(
+                CavaleteHistory(
+                    cavalete_id=random.choice(cavalete_ids),
+                    user_id=random.choice(users),
+                    action=random.choice(actions),
+                    timestamp=timestamp(),
+                )
+                for _ in range(size)
+            )
+            self.stdout.write(f"{start + size}/{rows} linhas por tabela")
+
+        if connection.vendor == "postgresql":
+            self.analyze_tables()
+
+    def seed_structure(self):
+        """Usuários, cavaletes e slots BENCH-* usados pelas linhas geradas."""
+        User = get_user_model()
+        for i in range(SEED_USERS):
+            User.objects.get_or_create(
+                username=f"bench-{i:02d}", defaults={"role": User.Role.AUDITOR}
+            )
+        for i in range(SEED_CAVALETES):
+            cavalete, created = Cavalete.objects.get_or_create(code=f"BENCH-{i:04d}")
+            if created:
+                create_cavalete_structure(
+                    cavalete, SEED_SLOTS_PER_SIDE, SEED_SLOTS_PER_SIDE
+                )
+
+        users = list(
+            User.objects.filter(username__startswith="bench-").values_list(
+                "id", flat=True
+            )
+        )
+        cavaletes = Cavalete.objects.filter(code__startswith="BENCH-")
+        cavalete_ids = list(cavaletes.values_list("id", flat=True))
+        slot_ids = list(
+            Slot.objects.filter(cavalete__in=cavaletes).values_list("id", flat=True)
+        )
+        return users, cavalete_ids, slot_ids
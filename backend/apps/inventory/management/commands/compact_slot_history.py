@@ -0,0 +1,60 @@
+"""Junta edições seguidas do mesmo slot e usuário no histórico existente."""
+
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from apps.inventory.compaction import BATCH_SIZE, compact_slot_history, compact_window
+
+
+class Command(BaseCommand):
+    help = (
+        "Compacta sequências de UPDATE do mesmo slot e usuário (sem outra ação "
+        "no meio e até --window segundos entre edições) em uma linha: valores "
+        "antigos da primeira, novos e horário da última."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--window",
+            type=int,
+            help="Segundos entre edições (padrão: HISTORY_COMPACT_WINDOW).",
+        )
+        parser.add_argument("--since", help="Só entradas a partir de AAAA-MM-DD.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help=f"Linhas por transação (padrão: {BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas informa quantas linhas seriam juntadas.",
+        )
+
+    def handle(self, *args, **options):
+        window = options["window"] or compact_window()
+        if window <= 0:
+            raise CommandError("Informe --window ou defina HISTORY_COMPACT_WINDOW.")
+        since = None
+        if options["since"]:
+            day = parse_date(options["since"])
+            if day is None:
+                raise CommandError("--since deve estar no formato AAAA-MM-DD.")
+            since = timezone.make_aware(datetime.combine(day, time.min))
+
+        merged, removed = compact_slot_history(
+            window,
+            since=since,
+            batch_size=options["batch_size"],
+            dry_run=options["dry_run"],
+        )
+        verb = "seriam removidas" if options["dry_run"] else "removidas"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{merged} sequências compactadas, {removed} linhas {verb}."
+            )
+        )
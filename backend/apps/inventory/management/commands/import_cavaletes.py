@@ -0,0 +1,65 @@
+"""Importa cavaletes e slots de planilha CSV/XLSX (code, type, slots_a, slots_b)."""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.inventory.imports import (
+    DEFAULT_BATCH_SIZE,
+    CavaleteImportError,
+    import_cavaletes,
+    iter_rows,
+)
+
+
+class Command(BaseCommand):
+    help = "Importa cavaletes e slots em lote a partir de planilha CSV/XLSX."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Caminho do arquivo .csv ou .xlsx.")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas valida o arquivo, sem gravar.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Linhas por lote (padrão: {DEFAULT_BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            "--user",
+            help="Username registrado como autor no histórico (opcional).",
+        )
+
+    def handle(self, *args, **options):
+        user = None
+        if options["user"]:
+            User = get_user_model()
+            try:
+                user = User.objects.get(username=options["user"])
+            except User.DoesNotExist as e:
+                raise CommandError(f"Usuário {options['user']} não existe.") from e
+
+        try:
+            with open(options["path"], "rb") as fileobj:
+                result = import_cavaletes(
+                    iter_rows(fileobj, options["path"]),
+                    user=user,
+                    dry_run=options["dry_run"],
+                    batch_size=options["batch_size"],
+                )
+        except (OSError, CavaleteImportError) as e:
+            raise CommandError(str(e)) from e
+
+        for error in result.errors:
+            self.stderr.write(
+                f"Linha {error['line']} ({error['code']}): {' '.join(error['errors'])}"
+            )
+        verb = "validados" if result.dry_run else "criados"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{result.rows} linhas lidas; {result.created} cavaletes e "
+                f"{result.slots_created} slots {verb}; {result.error_count} erros."
+            )
+        )
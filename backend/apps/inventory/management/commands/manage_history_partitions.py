@@ -0,0 +1,93 @@
+"""
+Manutenção das partições mensais do histórico (PostgreSQL).
+
+Rodar diariamente (cron), por exemplo:
+    python manage.py manage_history_partitions --ahead 3 --retain-months 24
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from apps.inventory.models import CavaleteHistory, SlotHistory
+from apps.inventory.partitions import (
+    DEFAULT_MONTHS_AHEAD,
+    add_months,
+    detach_partitions,
+    ensure_partitions,
+    is_partitioned,
+    list_partitions,
+    month_start,
+)
+
+HISTORY_MODELS = (CavaleteHistory, SlotHistory)
+
+
+class Command(BaseCommand):
+    help = (
+        "Cria as partições mensais futuras do histórico e, com --retain-months, "
+        "desanexa (ou remove, com --drop) as partições mais antigas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=DEFAULT_MONTHS_AHEAD,
+            help=f"Meses futuros com partição pronta (padrão: {DEFAULT_MONTHS_AHEAD}).",
+        )
+        parser.add_argument(
+            "--retain-months",
+            type=int,
+            help="Mantém anexados só o mês atual e os N anteriores.",
+        )
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Remove as partições desanexadas (padrão: mantém as tabelas).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas lista as partições e o que seria desanexado.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            self.stdout.write(
+                "Particionamento disponível apenas no PostgreSQL; nada a fazer."
+            )
+            return
+
+        current = month_start(timezone.now())
+        before = None
+        if options["retain_months"] is not None:
+            before = add_months(current, -options["retain_months"])
+
+        for model in HISTORY_MODELS:
+            table = model._meta.db_table
+            if not is_partitioned(model):
+                self.stdout.write(
+                    self.style.WARNING(f"{table}: não particionada (migração 0005).")
+                )
+                continue
+            if options["dry_run"]:
+                self.report(model, before)
+                continue
+
+            created = ensure_partitions(model, months_ahead=options["ahead"])
+            detached = []
+            if before is not None:
+                detached = detach_partitions(model, before, drop=options["drop"])
+            action = "removidas" if options["drop"] else "desanexadas"
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{table}: {len(created)} partições criadas, "
+                    f"{len(detached)} {action}."
+                )
+            )
+
+    def report(self, model, before):
+        for month, name in list_partitions(model):
+            note = " (seria desanexada)" if before and month < before else ""
+            self.stdout.write(f"{name}{note}")
@@ -0,0 +1,67 @@
+# Generated by Django 6.0.1 on 2026-10-18 18:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cavaletes", "0002_remove_cavalete_name_cavalete_type"),
+        ("inventory", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SyncOperation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "key",
+                    models.CharField(
+                        max_length=64, verbose_name="chave de idempotência"
+                    ),
+                ),
+                ("operation", models.CharField(max_length=10, verbose_name="operação")),
+                ("applied_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "slot",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="sync_operations",
+                        to="cavaletes.slot",
+                        verbose_name="slot",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sync_operations",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="usuário",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "operação sincronizada",
+                "verbose_name_plural": "operações sincronizadas",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "key"), name="unique_sync_operation_key"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,128 @@
+# Generated by Django 6.0.1 on 2026-10-18 18:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from apps.core.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação (PostgreSQL).
+    atomic = False
+
+    dependencies = [
+        ("cavaletes", "0003_slot_counters"),
+        ("inventory", "0003_history_timestamp_default"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="cavaletehistory",
+            options={
+                "ordering": ["-timestamp", "-id"],
+                "verbose_name": "histórico de cavalete",
+                "verbose_name_plural": "históricos de cavaletes",
+            },
+        ),
+        migrations.AlterModelOptions(
+            name="slothistory",
+            options={
+                "ordering": ["-timestamp", "-id"],
+                "verbose_name": "histórico de slot",
+                "verbose_name_plural": "históricos de slots",
+            },
+        ),
+        AddIndexConcurrently(
+            model_name="cavaletehistory",
+            index=models.Index(fields=["-timestamp", "-id"], name="cavhist_ts_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="cavaletehistory",
+            index=models.Index(
+                fields=["cavalete", "-timestamp", "-id"], name="cavhist_cavalete_ts_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="cavaletehistory",
+            index=models.Index(
+                fields=["user", "-timestamp", "-id"], name="cavhist_user_ts_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="cavaletehistory",
+            index=models.Index(
+                fields=["action", "-timestamp", "-id"], name="cavhist_action_ts_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="slothistory",
+            index=models.Index(fields=["-timestamp", "-id"], name="slothist_ts_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="slothistory",
+            index=models.Index(
+                fields=["slot", "-timestamp", "-id"], name="slothist_slot_ts_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="slothistory",
+            index=models.Index(
+                fields=["user", "-timestamp", "-id"], name="slothist_user_ts_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="slothistory",
+            index=models.Index(
+                fields=["action", "-timestamp", "-id"], name="slothist_action_ts_idx"
+            ),
+        ),
+        # Índices simples das FKs só saem depois que os compostos existem.
+        migrations.AlterField(
+            model_name="cavaletehistory",
+            name="cavalete",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="history",
+                to="cavaletes.cavalete",
+                verbose_name="cavalete",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="cavaletehistory",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="usuário",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="slothistory",
+            name="slot",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="history",
+                to="cavaletes.slot",
+                verbose_name="slot",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="slothistory",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="usuário",
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0.1 on 2026-10-18 21:05
+
+from django.db import migrations
+
+from apps.inventory.partitions import convert_to_partitioned, is_partitioned
+
+HISTORY_MODELS = ("CavaleteHistory", "SlotHistory")
+
+
+def partition_history(apps, schema_editor):
+    """
+    PostgreSQL: converte as tabelas de histórico em particionadas por mês.
+    Nos demais bancos não faz nada (o esquema do Django não muda).
+    """
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+    for name in HISTORY_MODELS:
+        model = apps.get_model("inventory", name)
+        if not is_partitioned(model, connection):
+            convert_to_partitioned(model, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0004_history_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_history, migrations.RunPython.noop),
+    ]
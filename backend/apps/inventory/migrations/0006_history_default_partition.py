@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-18 22:40
+
+from django.db import migrations
+
+from apps.inventory.partitions import ensure_default_partition
+
+HISTORY_MODELS = ("CavaleteHistory", "SlotHistory")
+
+
+def create_default_partitions(apps, schema_editor):
+    """
+    PostgreSQL: partição DEFAULT nas tabelas já convertidas pela 0005 (as
+    convertidas depois dela já nascem com a DEFAULT). Nos demais bancos não
+    faz nada.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+    for name in HISTORY_MODELS:
+        ensure_default_partition(apps.get_model("inventory", name), connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0005_partition_history"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_default_partitions, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth import get_user_model
 
@@ -18,10 +19,12 @@ class Action(models.TextChoices):
 class CavaleteHistory(models.Model):
     """Histórico de ações em Cavaletes."""
 
+    # Sem índice próprio nas FKs: cobertas pelos índices compostos (Meta)
     cavalete = models.ForeignKey(
         "cavaletes.Cavalete",
         on_delete=models.SET_NULL,
         null=True,
+        db_index=False,
         related_name="history",
         verbose_name=_("cavalete"),
     )
@@ -29,10 +32,12 @@ class CavaleteHistory(models.Model):
         User,
         on_delete=models.SET_NULL,
         null=True,
+        db_index=False,
         verbose_name=_("usuário"),
     )
     action = models.CharField(_("ação"), max_length=20, choices=Action.choices)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Preenchido ao montar a entrada: gravação adiada mantém o horário da ação
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
 
     # Snapshot dos dados relevantes no momento da ação
     description = models.TextField(_("descrição"), blank=True)
@@ -40,7 +45,20 @@ class CavaleteHistory(models.Model):
     class Meta:
         verbose_name = _("histórico de cavalete")
         verbose_name_plural = _("históricos de cavaletes")
-        ordering = ["-timestamp"]
+        ordering = ["-timestamp", "-id"]
+        # Um índice por filtro do CavaleteHistoryViewSet, na ordem da listagem
+        indexes = [
+            models.Index(fields=["-timestamp", "-id"], name="cavhist_ts_idx"),
+            models.Index(
+                fields=["cavalete", "-timestamp", "-id"], name="cavhist_cavalete_ts_idx"
+            ),
+            models.Index(
+                fields=["user", "-timestamp", "-id"], name="cavhist_user_ts_idx"
+            ),
+            models.Index(
+                fields=["action", "-timestamp", "-id"], name="cavhist_action_ts_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.cavalete} - {self.action} by {self.user}"
@@ -49,10 +67,12 @@ class CavaleteHistory(models.Model):
 class SlotHistory(models.Model):
     """Histórico de ações em Slots."""
 
+    # Sem índice próprio nas FKs: cobertas pelos índices compostos (Meta)
     slot = models.ForeignKey(
         "cavaletes.Slot",
         on_delete=models.SET_NULL,
         null=True,
+        db_index=False,
         related_name="history",
         verbose_name=_("slot"),
     )
@@ -60,10 +80,12 @@ class SlotHistory(models.Model):
         User,
         on_delete=models.SET_NULL,
         null=True,
+        db_index=False,
         verbose_name=_("usuário"),
     )
     action = models.CharField(_("ação"), max_length=20, choices=Action.choices)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Preenchido ao montar a entrada: gravação adiada mantém o horário da ação
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
 
     # Snapshot dos dados
     old_product_code = models.CharField(max_length=50, blank=True, null=True)
@@ -76,7 +98,57 @@ class SlotHistory(models.Model):
     class Meta:
         verbose_name = _("histórico de slot")
         verbose_name_plural = _("históricos de slots")
-        ordering = ["-timestamp"]
+        ordering = ["-timestamp", "-id"]
+        # Um índice por filtro do SlotHistoryViewSet, na ordem da listagem
+        # (slot__cavalete usa o de slot, via join com os slots do cavalete)
+        indexes = [
+            models.Index(fields=["-timestamp", "-id"], name="slothist_ts_idx"),
+            models.Index(
+                fields=["slot", "-timestamp", "-id"], name="slothist_slot_ts_idx"
+            ),
+            models.Index(
+                fields=["user", "-timestamp", "-id"], name="slothist_user_ts_idx"
+            ),
+            models.Index(
+                fields=["action", "-timestamp", "-id"], name="slothist_action_ts_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.slot} - {self.action} by {self.user}"
+
+
+class SyncOperation(models.Model):
+    """
+    Operação offline já aplicada via sincronização (idempotência).
+    A chave é gerada pelo cliente e única por usuário.
+    """
+
+    key = models.CharField(_("chave de idempotência"), max_length=64)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="sync_operations",
+        verbose_name=_("usuário"),
+    )
+    slot = models.ForeignKey(
+        "cavaletes.Slot",
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="sync_operations",
+        verbose_name=_("slot"),
+    )
+    operation = models.CharField(_("operação"), max_length=10)
+    applied_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("operação sincronizada")
+        verbose_name_plural = _("operações sincronizadas")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "key"], name="unique_sync_operation_key"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.key} - {self.operation} by {self.user_id}"
@@ -0,0 +1,259 @@
+"""
+Particionamento mensal (RANGE em `timestamp`) das tabelas de histórico.
+
+Apenas PostgreSQL. A migração 0005 converte CavaleteHistory e SlotHistory em
+tabelas particionadas e cria as partições já necessárias; o comando
+`manage_history_partitions` cria as partições futuras e desanexa as antigas.
+Em outros bancos (SQLite no desenvolvimento) as funções não fazem nada.
+
+Cada partição cobre um mês em UTC e se chama <tabela>_<AAAAMM>. A chave
+primária no banco passa a ser (id, timestamp), exigência do PostgreSQL;
+para o Django `id` continua sendo a PK (gerado por sequência).
+
+Há também uma partição DEFAULT (<tabela>_default): se o cron parar e chegar
+um mês sem partição, o histórico cai nela em vez de o INSERT falhar. Ao criar
+a partição do mês, create_partition move essas linhas para ela. Com a
+DEFAULT, o PostgreSQL não aceita DETACH ... CONCURRENTLY: detach_partitions
+trava a tabela mãe (ACCESS EXCLUSIVE) a cada partição desanexada.
+"""
+
+import re
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.db import connection as default_connection
+from django.db import models, transaction
+from django.db.backends.utils import truncate_name
+from django.utils import timezone
+
+from apps.core.operations import is_partitioned_table
+
+DEFAULT_MONTHS_AHEAD = 3
+PARTITION_SUFFIX = re.compile(r"_(\d{4})(\d{2})$")
+
+
+def month_start(value):
+    """Primeiro dia do mês de `value` (date ou datetime, em UTC)."""
+    if isinstance(value, datetime):
+        value = value.astimezone(dt_timezone.utc).date()
+    return value.replace(day=1)
+
+
+def add_months(month, count):
+    """Soma `count` meses ao primeiro dia do mês `month`."""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table, month):
+    return f"{table}_{month:%Y%m}"
+
+
+def default_partition_name(table):
+    return f"{table}_default"
+
+
+def _bound(month):
+    return datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc).isoformat()
+
+
+def is_partitioned(model, connection=default_connection):
+    """Indica se a tabela do modelo já é particionada (sempre False fora do PG)."""
+    return is_partitioned_table(connection, model._meta.db_table)
+
+
+def list_partitions(model, connection=default_connection):
+    """Partições mensais anexadas: lista ordenada de (mês, nome)."""
+    if not is_partitioned(model, connection):
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = %s AND pg_table_is_visible(parent.oid)",
+            [model._meta.db_table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        match = PARTITION_SUFFIX.search(name)
+        if match:
+            partitions.append((date(int(match[1]), int(match[2]), 1), name))
+    return sorted(partitions)
+
+
+def _table_exists(cursor, name):
+    cursor.execute("SELECT to_regclass(%s)", [name])
+    return cursor.fetchone()[0] is not None
+
+
+def ensure_default_partition(model, connection=default_connection):
+    """Cria a partição DEFAULT da tabela (se particionada e ainda sem ela)."""
+    if not is_partitioned(model, connection):
+        return
+    table = model._meta.db_table
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {qn(default_partition_name(table))} "
+            f"PARTITION OF {qn(table)} DEFAULT"
+        )
+
+
+def create_partition(model, month, connection=default_connection):
+    """
+    Cria a partição do mês (se ainda não existir). As linhas do mês que estão
+    na partição DEFAULT são movidas para a nova tabela antes do ATTACH, na
+    mesma transação (o ATTACH varre a DEFAULT e falharia com elas lá).
+    """
+    table = model._meta.db_table
+    name = partition_name(table, month)
+    default = default_partition_name(table)
+    start, end = _bound(month), _bound(add_months(month, 1))
+    qn = connection.ops.quote_name
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        if _table_exists(cursor, name):
+            return
+        cursor.execute(
+            f"CREATE TABLE {qn(name)} (LIKE {qn(table)} "
+            f"INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+        if _table_exists(cursor, default):
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {qn(default)} "
+                f'WHERE "timestamp" >= %s AND "timestamp" < %s RETURNING *) '
+                f"INSERT INTO {qn(name)} SELECT * FROM moved",
+                [start, end],
+            )
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} ATTACH PARTITION {qn(name)} "
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+
+
+def ensure_partitions(
+    model,
+    first_month=None,
+    months_ahead=DEFAULT_MONTHS_AHEAD,
+    connection=default_connection,
+):
+    """
+    Garante a partição DEFAULT e as mensais de `first_month` (padrão: mês
+    atual) até o mês atual + `months_ahead`. Retorna os nomes das partições
+    mensais criadas.
+    """
+    if not is_partitioned(model, connection):
+        return []
+    ensure_default_partition(model, connection)
+    current = month_start(timezone.now())
+    month = first_month or current
+    last = add_months(current, months_ahead)
+    existing = {name for _, name in list_partitions(model, connection)}
+
+    created = []
+    while month <= last:
+        name = partition_name(model._meta.db_table, month)
+        if name not in existing:
+            create_partition(model, month, connection)
+            created.append(name)
+        month = add_months(month, 1)
+    return created
+
+
+def detach_partitions(model, before, drop=False, connection=default_connection):
+    """
+    Desanexa as partições de meses anteriores a `before` (primeiro dia do
+    mês). As tabelas desanexadas continuam no banco (para arquivamento),
+    a menos que `drop`. Retorna os nomes das partições afetadas.
+
+    Cada DETACH pega ACCESS EXCLUSIVE na tabela mãe: é rápido, mas espera as
+    consultas em curso e bloqueia leituras e gravações do histórico enquanto
+    isso. Não há como usar CONCURRENTLY, que o PostgreSQL recusa quando existe
+    partição DEFAULT (sempre criada por ensure_partitions).
+    """
+    qn = connection.ops.quote_name
+    table = model._meta.db_table
+
+    detached = []
+    for month, name in list_partitions(model, connection):
+        if month >= before:
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {qn(table)} DETACH PARTITION {qn(name)}")
+            if drop:
+                cursor.execute(f"DROP TABLE {qn(name)}")
+        detached.append(name)
+    return detached
+
+
+def convert_to_partitioned(model, schema_editor, months_ahead=DEFAULT_MONTHS_AHEAD):
+    """
+    Converte a tabela do modelo em particionada por mês, preservando dados,
+    ids, CHECKs, FKs e os índices de Meta.indexes. Usado pela migração.
+
+    Custo: roda na transação da migração, e o RENAME pega ACCESS EXCLUSIVE na
+    tabela. Leituras e gravações do histórico (e as requisições que gravam
+    histórico) ficam bloqueadas até o commit. O INSERT ... SELECT copia todas
+    as linhas e depois PK, FKs e índices são recriados, então o tempo cresce
+    com o tamanho da tabela. Precisa de espaço em disco para duas cópias. Meça
+    com uma cópia do banco de produção e rode em janela de manutenção.
+    """
+    connection = schema_editor.connection
+    qn = connection.ops.quote_name
+    table = model._meta.db_table
+    legacy = f"{table}_legacy"
+    sequence = f"{table}_id_seq"
+    execute = schema_editor.execute
+
+    execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}")
+    execute(
+        f"CREATE TABLE {qn(table)} (LIKE {qn(legacy)} INCLUDING DEFAULTS "
+        f"INCLUDING CONSTRAINTS INCLUDING STORAGE) "
+        f'PARTITION BY RANGE ("timestamp")'
+    )
+    execute(f'ALTER TABLE {qn(table)} ADD PRIMARY KEY ("id", "timestamp")')
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT MIN("timestamp") FROM {qn(legacy)}')
+        oldest = cursor.fetchone()[0]
+    first_month = month_start(oldest) if oldest else None
+    ensure_partitions(model, first_month, months_ahead, connection)
+
+    execute(f"INSERT INTO {qn(table)} SELECT * FROM {qn(legacy)}")
+    # Remove também a sequência (identity) e os índices da tabela antiga.
+    execute(f"DROP TABLE {qn(legacy)}")
+
+    execute(f"CREATE SEQUENCE {qn(sequence)} OWNED BY {qn(table)}.{qn('id')}")
+    execute(
+        f"ALTER TABLE {qn(table)} ALTER COLUMN {qn('id')} "
+        f"SET DEFAULT nextval('{sequence}')"
+    )
+    execute(
+        f"SELECT setval('{sequence}', "
+        f"COALESCE((SELECT MAX({qn('id')}) FROM {qn(table)}), 0) + 1, false)"
+    )
+
+    for field in model._meta.concrete_fields:
+        if isinstance(field, models.ForeignKey) and field.db_constraint:
+            execute(_foreign_key_sql(model, field, connection))
+    for index in model._meta.indexes:
+        schema_editor.add_index(model, index)
+
+
+def _foreign_key_sql(model, field, connection):
+    """ADD CONSTRAINT ... FOREIGN KEY igual ao do Django (DEFERRABLE INITIALLY DEFERRED)."""
+    qn = connection.ops.quote_name
+    table = model._meta.db_table
+    target = field.target_field
+    to_table = target.model._meta.db_table
+    name = truncate_name(
+        f"{table}_{field.column}_fk_{to_table}_{target.column}",
+        connection.ops.max_name_length(),
+    )
+    return (
+        f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} "
+        f"FOREIGN KEY ({qn(field.column)}) "
+        f"REFERENCES {qn(to_table)} ({qn(target.column)}) "
+        f"DEFERRABLE INITIALLY DEFERRED"
+    )
@@ -0,0 +1,166 @@
+"""
+Relatório de divergências a partir dos snapshots das edições (SlotHistory
+UPDATE: old/new quantity e product_code).
+
+Uma query agrega as edições do período por (auditor, produto); os totais
+por produto, por auditor e gerais são somas desses grupos. Todas as métricas
+são aditivas, então o cache guarda, por período, os grupos das entradas com
+timestamp anterior a um limite (settled_until) e cada consulta agrega só o
+trecho novo até agora - settle_margin, mais o final do período, que é sempre
+recalculado. O corte é por timestamp e não por id: o id sai da sequência no
+INSERT e não no commit, então uma transação concorrente (em qualquer modo do
+writer) ou que grava tarde pode ter id menor que o de entradas já contadas.
+O feed changes/ tem o mesmo problema (ver ChangeFeedMixin e ?lookback=).
+
+Compactar entradas antigas (compact_slot_history) invalida o cache.
+"""
+
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Abs, Coalesce
+from django.utils import timezone
+
+from . import compaction
+from .models import Action, SlotHistory
+
+CACHE_PREFIX = "inventory:v2:divergences"
+GENERATION_KEY = f"{CACHE_PREFIX}:generation"
+CACHE_TIMEOUT = 60 * 60
+SETTLE_MARGIN = timedelta(minutes=5)
+METRICS = (
+    "updates",
+    "quantity_changes",
+    "quantity_delta",
+    "quantity_abs_delta",
+    "code_changes",
+)
+
+
+def divergence_groups(start=None, end=None):
+    """
+    Agregados por (user_id, username, product_code) das edições com
+    start <= timestamp < end. Produto: o código novo ou, se removido, o antigo.
+    """
+    queryset = SlotHistory.objects.filter(action=Action.UPDATE)
+    if start:
+        queryset = queryset.filter(timestamp__gte=start)
+    if end:
+        queryset = queryset.filter(timestamp__lt=end)
+
+    delta = F("new_qty") - F("old_qty")
+    return list(
+        queryset.alias(
+            old_qty=Coalesce("old_quantity", Value(0)),
+            new_qty=Coalesce("new_quantity", Value(0)),
+            old_code=Coalesce("old_product_code", Value("")),
+            new_code=Coalesce("new_product_code", Value("")),
+        )
+        .values(
+            "user_id",
+            username=F("user__username"),
+            product_code=Coalesce("new_product_code", "old_product_code"),
+        )
+        .annotate(
+            updates=Count("id"),
+            quantity_changes=Count("id", filter=~Q(old_qty=F("new_qty"))),
+            quantity_delta=Sum(delta),
+            quantity_abs_delta=Sum(Abs(delta)),
+            code_changes=Count(
+                "id", filter=~Q(old_code="") & ~Q(old_code=F("new_code"))
+            ),
+        )
+        .order_by()
+    )
+
+
+def divergence_report(start=None, end=None, refresh=False):
+    """
+    Relatório do período: totais, por produto e por auditor. Os grupos das
+    entradas já assentadas (timestamp < agora - settle_margin) ficam em cache e
+    só o trecho novo é somado; o final do período é sempre agregado de novo.
+    `refresh` recalcula tudo.
+    """
+    key = f"{CACHE_PREFIX}:{_generation()}:{_stamp(start)}:{_stamp(end)}"
+    cached = None if refresh else cache.get(key)
+    groups, settled_until = cached if cached else ({}, start)
+
+    boundary = timezone.now() - settle_margin()
+    if end:
+        boundary = min(boundary, end)
+    if settled_until:
+        boundary = max(boundary, settled_until)
+    if settled_until is None or boundary > settled_until:
+        _add(groups, divergence_groups(settled_until, boundary))
+        cache.set(key, (groups, boundary), CACHE_TIMEOUT)
+
+    result = {group_key: dict(group) for group_key, group in groups.items()}
+    if not end or boundary < end:
+        _add(result, divergence_groups(boundary, end))
+    return _build_report(result.values(), boundary)
+
+
+def settle_margin():
+    """
+    Idade a partir da qual as entradas entram no cache. Cobre transações
+    concorrentes que commitam fora da ordem dos ids, as que gravam tarde
+    (writer adiado/background) e a janela de compactação, em que
+    merge_slot_update ainda troca a última linha do slot.
+    """
+    return max(SETTLE_MARGIN, timedelta(seconds=compaction.compact_window()))
+
+
+def invalidate_divergence_cache():
+    """Descarta os relatórios em cache (ex.: após compactar entradas antigas)."""
+    cache.add(GENERATION_KEY, 0, timeout=None)
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, 1, timeout=None)
+
+
+def _generation():
+    return cache.get(GENERATION_KEY, 0)
+
+
+def _add(groups, new_groups):
+    for group in new_groups:
+        group_key = (group["user_id"], group["product_code"])
+        current = groups.setdefault(group_key, dict(group, **_zero()))
+        for metric in METRICS:
+            current[metric] += group[metric] or 0
+
+
+def _stamp(moment):
+    return moment.isoformat() if moment else "-"
+
+
+def _zero():
+    return dict.fromkeys(METRICS, 0)
+
+
+def _rollup(groups, fields):
+    totals = {}
+    for group in groups:
+        key = tuple(group[field] for field in fields)
+        row = totals.setdefault(key, dict(zip(fields, key), **_zero()))
+        for metric in METRICS:
+            row[metric] += group[metric]
+    return sorted(
+        totals.values(), key=lambda row: row["quantity_abs_delta"], reverse=True
+    )
+
+
+def _build_report(groups, settled_until):
+    groups = list(groups)
+    totals = _zero()
+    for group in groups:
+        for metric in METRICS:
+            totals[metric] += group[metric]
+    return {
+        "totals": totals,
+        "by_product": _rollup(groups, ("product_code",)),
+        "by_auditor": _rollup(groups, ("user_id", "username")),
+        "settled_until": settled_until,
+    }
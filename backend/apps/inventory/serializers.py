@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import CavaleteHistory, SlotHistory
+from .models import Action, CavaleteHistory, SlotHistory
 
 
 class CavaleteHistorySerializer(serializers.ModelSerializer):
@@ -40,3 +40,30 @@ class SlotHistorySerializer(serializers.ModelSerializer):
             "description",
             "timestamp",
         ]
+
+
+class TimelineEntrySerializer(serializers.Serializer):
+    """Linha da timeline do cavalete (dict vindo do UNION em timeline.py)."""
+
+    id = serializers.IntegerField()
+    source = serializers.CharField()
+    timestamp = serializers.DateTimeField()
+    user = serializers.IntegerField(source="user_id", allow_null=True)
+    user_name = serializers.CharField(source="username", allow_null=True)
+    action = serializers.CharField()
+    action_display = serializers.SerializerMethodField()
+    description = serializers.CharField()
+    slot = serializers.IntegerField(source="slot_ref", allow_null=True)
+    side = serializers.CharField(source="slot_side", allow_null=True)
+    number = serializers.IntegerField(source="slot_number", allow_null=True)
+    old_product_code = serializers.CharField(
+        source="product_code_before", allow_null=True
+    )
+    new_product_code = serializers.CharField(
+        source="product_code_after", allow_null=True
+    )
+    old_quantity = serializers.IntegerField(source="quantity_before", allow_null=True)
+    new_quantity = serializers.IntegerField(source="quantity_after", allow_null=True)
+
+    def get_action_display(self, obj):
+        return Action(obj["action"]).label
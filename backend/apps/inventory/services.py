@@ -1,5 +1,39 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from . import compaction, history
 from .models import CavaleteHistory, SlotHistory, Action
-from apps.cavaletes.models import Slot
+from apps.cavaletes.models import Cavalete, Slot
+
+
+def adjust_slot_counters(cavalete_id, **deltas):
+    """
+    Soma `deltas` aos contadores do cavalete (ex.: slots_auditing=-1) com um
+    UPDATE atômico (SET campo = campo + delta), sem ler a linha antes.
+    Decrementos param em 0: um contador divergente não bloqueia o workflow
+    (reconcile_slot_counters corrige).
+    """
+    changes = {
+        field: F(field) + delta if delta > 0 else Greatest(F(field) + delta, 0)
+        for field, delta in deltas.items()
+        if delta
+    }
+    if changes:
+        Cavalete.objects.filter(pk=cavalete_id).update(**changes)
+
+
+def _status_deltas(from_status, to_status, count=1):
+    """Deltas dos contadores para `count` slots de from_status -> to_status."""
+    deltas = Counter()
+    if from_status in Slot.STATUS_COUNTERS:
+        deltas[Slot.STATUS_COUNTERS[from_status]] -= count
+    if to_status in Slot.STATUS_COUNTERS:
+        deltas[Slot.STATUS_COUNTERS[to_status]] += count
+    return deltas
 
 
 def create_cavalete_structure(cavalete, slots_a: int, slots_b: int):
@@ -31,18 +65,26 @@ def create_cavalete_structure(cavalete, slots_a: int, slots_b: int):
         )
 
     Slot.objects.bulk_create(new_slots)
+    adjust_slot_counters(cavalete.pk, slots_total=len(new_slots))
+    cavalete.refresh_from_db(fields=["slots_total"])
 
 
 def log_cavalete_action(cavalete, user, action, description=""):
-    """Registra uma ação no histórico do cavalete."""
-    CavaleteHistory.objects.create(
-        cavalete=cavalete, user=user, action=action, description=description
+    """Registra uma ação no histórico do cavalete (ver inventory/history.py)."""
+    history.record(
+        [
+            CavaleteHistory(
+                cavalete=cavalete, user=user, action=action, description=description
+            )
+        ]
     )
 
 
-def log_slot_action(slot, user, action, description="", old_data=None, new_data=None):
+def build_slot_history(
+    slot, user, action, description="", old_data=None, new_data=None
+):
     """
-    Registra uma ação no histórico do slot.
+    Monta (sem salvar) uma entrada de histórico do slot.
     old_data/new_data: dicts com product_code e quantity
     """
     old_product = old_data.get("product_code") if old_data else None
@@ -51,7 +93,7 @@ def log_slot_action(slot, user, action, description="", old_data=None, new_data=
     new_product = new_data.get("product_code") if new_data else None
     new_qty = new_data.get("quantity") if new_data else None
 
-    SlotHistory.objects.create(
+    return SlotHistory(
         slot=slot,
         user=user,
         action=action,
@@ -61,3 +103,188 @@ def log_slot_action(slot, user, action, description="", old_data=None, new_data=
         new_product_code=new_product,
         new_quantity=new_qty,
     )
+
+
+def log_slot_action(slot, user, action, description="", old_data=None, new_data=None):
+    """
+    Registra uma ação no histórico do slot (ver inventory/history.py).
+    old_data/new_data: dicts com product_code e quantity
+    """
+    history.record(
+        [
+            build_slot_history(
+                slot, user, action, description, old_data=old_data, new_data=new_data
+            )
+        ]
+    )
+
+
+def save_slot_update(serializer, user):
+    """
+    Salva a edição do slot (serializer validado) e registra UPDATE.
+    Edição sem alteração efetiva não grava nada (nem histórico). Com
+    INVENTORY_HISTORY_COMPACT_WINDOW, edições seguidas do mesmo usuário
+    viram uma linha só (ver inventory/compaction.py).
+    """
+    instance = serializer.instance
+    if all(
+        getattr(instance, field) == value
+        for field, value in serializer.validated_data.items()
+    ):
+        return instance
+
+    old_data = {"product_code": instance.product_code, "quantity": instance.quantity}
+
+    updated_instance = serializer.save()
+
+    new_data = {
+        "product_code": updated_instance.product_code,
+        "quantity": updated_instance.quantity,
+    }
+    window = compaction.compact_window()
+    if window and compaction.merge_slot_update(
+        updated_instance, user, new_data, window
+    ):
+        return updated_instance
+    log_slot_action(
+        updated_instance, user, Action.UPDATE, old_data=old_data, new_data=new_data
+    )
+    return updated_instance
+
+
+def _transition_slot(slot, user, from_status, to_status, action, description):
+    """
+    Move um slot de from_status para to_status com UPDATE condicional
+    (status=from_status). Só quem efetivamente mudou a linha ajusta os contadores
+    e registra o histórico: duas requisições concorrentes com a mesma cópia do
+    slot não contam a transição duas vezes.
+    """
+    if slot.status != from_status:
+        return False
+
+    now = timezone.now()
+    changed = Slot.objects.filter(pk=slot.pk, status=from_status).update(
+        status=to_status, updated_at=now
+    )
+    if changed != 1:
+        return False
+
+    slot.status = to_status
+    slot.updated_at = now
+    adjust_slot_counters(slot.cavalete_id, **_status_deltas(from_status, to_status))
+    log_slot_action(slot, user, action, description=description)
+    return True
+
+
+def start_slot_audit(slot, user):
+    """
+    Inicia a conferência do slot (AVAILABLE -> AUDITING) e registra START_AUDIT.
+    Retorna False, sem alterar nada, se o status atual não permitir.
+    """
+    return _transition_slot(
+        slot,
+        user,
+        Slot.Status.AVAILABLE,
+        Slot.Status.AUDITING,
+        Action.START_AUDIT,
+        "Conferência iniciada",
+    )
+
+
+def finish_slot_audit(slot, user):
+    """
+    Finaliza a conferência do slot (AUDITING -> COMPLETED) e registra FINISH_AUDIT.
+    Retorna False, sem alterar nada, se o status atual não permitir.
+    """
+    return _transition_slot(
+        slot,
+        user,
+        Slot.Status.AUDITING,
+        Slot.Status.COMPLETED,
+        Action.FINISH_AUDIT,
+        "Conferência finalizada",
+    )
+
+
+def bulk_update_slots(changes, user):
+    """
+    Aplica edições de produto/quantidade em lote.
+    changes: lista de (slot, dados validados). Slots sem alteração efetiva são
+    ignorados. Um bulk_update nos slots; o histórico vai em lote para o writer.
+    Retorna a lista de slots alterados.
+    """
+    now = timezone.now()
+    updated_slots = []
+    entries = []
+
+    for slot, data in changes:
+        old_data = {"product_code": slot.product_code, "quantity": slot.quantity}
+        changed = False
+        for field in Slot.EDITABLE_FIELDS:
+            if field in data and data[field] != getattr(slot, field):
+                setattr(slot, field, data[field])
+                changed = True
+        if not changed:
+            continue
+
+        # bulk_update não aplica auto_now; mantém o ETag coerente.
+        slot.updated_at = now
+        updated_slots.append(slot)
+        entries.append(
+            build_slot_history(
+                slot,
+                user,
+                Action.UPDATE,
+                old_data=old_data,
+                new_data={"product_code": slot.product_code, "quantity": slot.quantity},
+            )
+        )
+
+    if updated_slots:
+        Slot.objects.bulk_update(updated_slots, [*Slot.EDITABLE_FIELDS, "updated_at"])
+        history.record(entries)
+
+    return updated_slots
+
+
+def transition_slots(slots, user, from_status, to_status, action, description=""):
+    """
+    Move em massa os slots de `slots` (QuerySet) de from_status para to_status.
+    Trava os elegíveis, aplica um UPDATE condicional (status=from_status),
+    ajusta os contadores de cada cavalete e registra o histórico em lote.
+    Retorna quantos slots mudaram.
+    """
+    with transaction.atomic():
+        locked = list(
+            slots.filter(status=from_status)
+            .select_for_update()
+            .values_list("id", "cavalete_id")
+        )
+        if not locked:
+            return 0
+
+        slot_ids = [slot_id for slot_id, _ in locked]
+        count = Slot.objects.filter(id__in=slot_ids, status=from_status).update(
+            status=to_status, updated_at=timezone.now()
+        )
+        per_cavalete = Counter(cavalete_id for _, cavalete_id in locked)
+        for cavalete_id, moved in per_cavalete.items():
+            adjust_slot_counters(
+                cavalete_id, **_status_deltas(from_status, to_status, moved)
+            )
+        history.record(
+            SlotHistory(
+                slot_id=slot_id, user=user, action=action, description=description
+            )
+            for slot_id in slot_ids
+        )
+    return count
+
+
+def delete_slot(slot, user):
+    """Exclui o slot, registra DELETE e desconta dos contadores do cavalete."""
+    log_slot_action(slot, user, Action.DELETE, description=f"Slot {slot} excluído")
+    deltas = _status_deltas(slot.status, None)
+    deltas["slots_total"] -= 1
+    slot.delete()
+    adjust_slot_counters(slot.cavalete_id, **deltas)
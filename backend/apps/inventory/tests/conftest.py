@@ -0,0 +1,22 @@
+import pytest
+from rest_framework.test import APIClient
+from apps.accounts.models import User
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def manager_user(db):
+    return User.objects.create_user(
+        username="manager", password="password", role=User.Role.MANAGER
+    )
+
+
+@pytest.fixture
+def auditor_user(db):
+    return User.objects.create_user(
+        username="auditor", password="password", role=User.Role.AUDITOR
+    )
@@ -0,0 +1,206 @@
+"""Arquivamento do histórico em JSONL.gz e leitura dos arquivos."""
+
+import gzip
+import io
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.cavaletes.models import Cavalete, Slot
+from apps.inventory.archive import (
+    ArchiveError,
+    archive_history,
+    iter_archived,
+    load_manifests,
+)
+from apps.inventory import reports
+from apps.inventory.models import Action, CavaleteHistory, SlotHistory
+
+
+@pytest.fixture
+def archive_dir(settings, tmp_path):
+    settings.HISTORY_ARCHIVE_DIR = tmp_path
+    return tmp_path
+
+
+@pytest.fixture
+def old_history(manager_user):
+    """10 entradas de slot com 400+ dias e 2 recentes."""
+    now = timezone.now()
+    cavalete = Cavalete.objects.create(code="ARQ-001")
+    slot = Slot.objects.create(cavalete=cavalete, side="A", number=1)
+    for i in range(10):
+        SlotHistory.objects.create(
+            slot=slot,
+            user=manager_user,
+            action=Action.UPDATE if i % 2 else Action.START_AUDIT,
+            timestamp=now - timedelta(days=400 + i),
+        )
+    for _ in range(2):
+        SlotHistory.objects.create(slot=slot, user=manager_user, action=Action.UPDATE)
+    return slot
+
+
+@pytest.mark.django_db
+class TestArchiveHistory:
+    def test_archives_in_chunks_and_deletes(self, archive_dir, old_history):
+        cutoff = timezone.now() - timedelta(days=365)
+
+        result = archive_history("slots", cutoff, chunk_size=4, batch_size=3)
+
+        assert (result.rows, result.deleted, len(result.files)) == (10, 10, 3)
+        assert SlotHistory.objects.count() == 2
+        manifest = load_manifests("slots")[0]
+        assert [chunk["rows"] for chunk in manifest["chunks"]] == [4, 4, 2]
+        with gzip.open(result.files[0], "rt") as fileobj:
+            row = json.loads(fileobj.readline())
+        assert row["slot_id"] == old_history.id
+        assert row["cavalete_id"] == old_history.cavalete_id
+
+    def test_keep_does_not_delete(self, archive_dir, old_history):
+        result = archive_history(
+            "slots", timezone.now() - timedelta(days=365), delete=False
+        )
+
+        assert (result.rows, result.deleted) == (10, 0)
+        assert SlotHistory.objects.count() == 12
+
+    def test_rerun_after_keep_does_not_duplicate(self, archive_dir, old_history):
+        """Nova execução apaga o que ficou do manifesto anterior e não regrava."""
+        cutoff = timezone.now() - timedelta(days=365)
+        archive_history("slots", cutoff, delete=False)
+
+        result = archive_history("slots", cutoff)
+
+        assert (result.rows, result.deleted, result.manifest) == (0, 10, None)
+        assert SlotHistory.objects.count() == 2
+        assert [m["deleted"] for m in load_manifests("slots")] == [True]
+        assert len(list(iter_archived("slots"))) == 10
+
+    def test_later_cutoff_archives_only_new_range(self, archive_dir, old_history):
+        archive_history("slots", timezone.now() - timedelta(days=405))
+
+        result = archive_history("slots", timezone.now() - timedelta(days=365))
+
+        assert (result.rows, result.deleted) == (5, 5)
+        ids = [row["id"] for row in iter_archived("slots")]
+        assert len(ids) == len(set(ids)) == 10
+
+    def test_deleting_slot_history_invalidates_report_cache(
+        self, archive_dir, old_history
+    ):
+        generation = reports._generation()
+
+        archive_history("slots", timezone.now() - timedelta(days=365), delete=False)
+        assert reports._generation() == generation
+
+        archive_history("slots", timezone.now() - timedelta(days=365))
+        assert reports._generation() != generation
+
+    def test_nothing_to_archive(self, archive_dir, db):
+        result = archive_history("cavaletes", timezone.now())
+
+        assert result.rows == 0
+        assert list(archive_dir.iterdir()) == []
+
+    def test_count_mismatch_aborts_before_delete(
+        self, archive_dir, old_history, monkeypatch
+    ):
+        monkeypatch.setattr("django.db.models.QuerySet.count", lambda self: 11)
+
+        with pytest.raises(ArchiveError):
+            archive_history("slots", timezone.now() - timedelta(days=365))
+
+        monkeypatch.undo()
+        assert SlotHistory.objects.count() == 12
+        assert list((archive_dir / "slots").iterdir()) == []
+
+
+@pytest.mark.django_db
+class TestIterArchived:
+    def test_filters_by_period_and_columns(self, archive_dir, old_history):
+        now = timezone.now()
+        archive_history("slots", now - timedelta(days=365), chunk_size=3)
+
+        rows = list(
+            iter_archived(
+                "slots",
+                start=now - timedelta(days=405, hours=12),
+                end=now - timedelta(days=401, hours=12),
+                action=Action.UPDATE,
+            )
+        )
+
+        # UPDATE com 403 e 405 dias; os demais do período são START_AUDIT
+        assert len(rows) == 2
+        assert [row["timestamp"] for row in rows] == sorted(
+            row["timestamp"] for row in rows
+        )
+
+
+@pytest.mark.django_db
+class TestArchiveCommand:
+    def test_dry_run_only_counts(self, archive_dir, old_history):
+        out = io.StringIO()
+
+        call_command(
+            "archive_history", "--older-than-days", "365", "--dry-run", stdout=out
+        )
+
+        assert "slots: 10 linhas" in out.getvalue()
+        assert SlotHistory.objects.count() == 12
+
+    def test_archives_both_kinds(self, archive_dir, old_history, manager_user):
+        CavaleteHistory.objects.create(
+            user=manager_user,
+            action=Action.CREATE,
+            timestamp=timezone.now() - timedelta(days=500),
+        )
+
+        call_command(
+            "archive_history", "--older-than-days", "365", stdout=io.StringIO()
+        )
+
+        assert CavaleteHistory.objects.count() == 0
+        assert SlotHistory.objects.count() == 2
+
+
+@pytest.mark.django_db
+class TestArchivedEndpoint:
+    def test_streams_archived_rows(
+        self, api_client, manager_user, archive_dir, old_history
+    ):
+        archive_history("slots", timezone.now() - timedelta(days=365))
+        api_client.force_authenticate(user=manager_user)
+
+        response = api_client.get(
+            "/api/inventory/history/slots/archived/",
+            {"slot__cavalete": old_history.cavalete_id, "action": "START_AUDIT"},
+        )
+
+        assert response.status_code == 200
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        assert len(rows) == 5
+        assert {row["action"] for row in rows} == {"START_AUDIT"}
+
+    def test_invalid_date(self, api_client, manager_user, archive_dir):
+        api_client.force_authenticate(user=manager_user)
+
+        response = api_client.get(
+            "/api/inventory/history/cavaletes/archived/", {"start": "ontem"}
+        )
+
+        assert response.status_code == 400
+
+    def test_auditor_forbidden(self, api_client, auditor_user, archive_dir):
+        api_client.force_authenticate(user=auditor_user)
+
+        response = api_client.get("/api/inventory/history/cavaletes/archived/")
+
+        assert response.status_code == 403
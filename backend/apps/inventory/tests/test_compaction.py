@@ -0,0 +1,84 @@
+"""Compactação de UPDATEs seguidos do mesmo slot e usuário."""
+
+import io
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from apps.cavaletes.models import Cavalete, Slot
+from apps.inventory.compaction import compact_slot_history
+from apps.inventory.models import Action, SlotHistory
+
+
+@pytest.fixture
+def slot(db):
+    cavalete = Cavalete.objects.create(code="CMP-001")
+    return Slot.objects.create(cavalete=cavalete, side="A", number=1)
+
+
+def entry(slot, user, seconds, action=Action.UPDATE, old=None, new=None):
+    return SlotHistory.objects.create(
+        slot=slot,
+        user=user,
+        action=action,
+        old_quantity=old,
+        new_quantity=new,
+        timestamp=timezone.now() - timedelta(hours=1) + timedelta(seconds=seconds),
+    )
+
+
+@pytest.mark.django_db
+class TestCompactSlotHistory:
+    def test_merges_runs_of_same_user_within_window(
+        self, slot, manager_user, auditor_user
+    ):
+        first = entry(slot, auditor_user, 0, old=1, new=2)
+        entry(slot, auditor_user, 10, old=2, new=3)
+        last = entry(slot, auditor_user, 20, old=3, new=4)
+        # Outro usuário, outra ação e intervalo grande quebram a sequência.
+        entry(slot, manager_user, 25, old=4, new=5)
+        entry(slot, manager_user, 26, action=Action.FINISH_AUDIT)
+        entry(slot, manager_user, 27, old=5, new=6)
+        entry(slot, manager_user, 500, old=6, new=7)
+
+        merged, removed = compact_slot_history(window=30, batch_size=2)
+
+        assert (merged, removed) == (1, 2)
+        first.refresh_from_db()
+        assert (first.old_quantity, first.new_quantity) == (1, 4)
+        assert first.timestamp == last.timestamp
+        assert SlotHistory.objects.count() == 5
+
+    def test_runs_do_not_cross_slots(self, slot, auditor_user):
+        other = Slot.objects.create(cavalete=slot.cavalete, side="A", number=2)
+        entry(slot, auditor_user, 0, old=1, new=2)
+        entry(other, auditor_user, 1, old=1, new=2)
+
+        assert compact_slot_history(window=30) == (0, 0)
+
+    def test_dry_run_keeps_rows(self, slot, auditor_user):
+        entry(slot, auditor_user, 0, old=1, new=2)
+        entry(slot, auditor_user, 5, old=2, new=3)
+
+        assert compact_slot_history(window=30, dry_run=True) == (1, 1)
+        assert SlotHistory.objects.count() == 2
+
+
+@pytest.mark.django_db
+class TestCompactCommand:
+    def test_command(self, slot, auditor_user):
+        entry(slot, auditor_user, 0, old=1, new=2)
+        entry(slot, auditor_user, 5, old=2, new=3)
+        out = io.StringIO()
+
+        call_command("compact_slot_history", "--window", "30", stdout=out)
+
+        assert "1 sequências compactadas, 1 linhas removidas" in out.getvalue()
+        assert SlotHistory.objects.count() == 1
+
+    def test_window_required(self, db):
+        with pytest.raises(CommandError):
+            call_command("compact_slot_history", stdout=io.StringIO())
@@ -0,0 +1,125 @@
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.cavaletes.models import Cavalete, Slot
+from apps.inventory import history
+from apps.inventory.models import Action, CavaleteHistory, SlotHistory
+from apps.inventory.services import log_cavalete_action, log_slot_action
+
+
+@pytest.fixture
+def cavalete(db):
+    return Cavalete.objects.create(code="CAV01")
+
+
+@pytest.mark.django_db
+class TestImmediateWriter:
+    def test_writes_inside_transaction(self, cavalete, manager_user):
+        """Modo padrão: entrada gravada na hora, na transação da requisição."""
+        with transaction.atomic():
+            log_cavalete_action(cavalete, manager_user, Action.UPDATE)
+            assert CavaleteHistory.objects.count() == 1
+
+    def test_invalid_mode(self, settings, cavalete):
+        settings.INVENTORY_HISTORY_WRITER = "later"
+        with pytest.raises(history.ImproperlyConfigured):
+            log_cavalete_action(cavalete, None, Action.UPDATE)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestDeferredWriter:
+    @pytest.fixture(autouse=True)
+    def deferred(self, settings):
+        settings.INVENTORY_HISTORY_WRITER = history.DEFERRED
+
+    def test_flushes_once_on_commit(self, cavalete, manager_user):
+        slot = Slot.objects.create(cavalete=cavalete, side="A", number=1)
+
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                log_cavalete_action(cavalete, manager_user, Action.UPDATE)
+                log_slot_action(slot, manager_user, Action.START_AUDIT)
+                log_slot_action(slot, manager_user, Action.FINISH_AUDIT)
+                pending = len(queries)
+
+        # Nada gravado durante a transação; um INSERT por modelo no commit.
+        inserts = [q for q in queries[pending:] if q["sql"].startswith("INSERT")]
+        assert not [q for q in queries[:pending] if q["sql"].startswith("INSERT")]
+        assert len(inserts) == 2
+        assert CavaleteHistory.objects.count() == 1
+        assert list(
+            SlotHistory.objects.order_by("id").values_list("action", flat=True)
+        ) == [Action.START_AUDIT, Action.FINISH_AUDIT]
+
+    def test_rollback_discards_entries(self, cavalete, manager_user):
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                log_cavalete_action(cavalete, manager_user, Action.UPDATE)
+                raise RuntimeError
+
+        assert not CavaleteHistory.objects.exists()
+
+    def test_rollback_does_not_leak_into_next_transaction(self, cavalete, manager_user):
+        """Lote de uma transação desfeita não é reaproveitado pela seguinte."""
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                log_cavalete_action(cavalete, manager_user, Action.UPDATE, "x")
+                raise RuntimeError
+        with transaction.atomic():
+            log_cavalete_action(cavalete, manager_user, Action.UPDATE, "ok")
+
+        descriptions = CavaleteHistory.objects.values_list("description", flat=True)
+        assert list(descriptions) == ["ok"]
+
+    def test_savepoint_rollback_discards_only_nested(self, cavalete, manager_user):
+        with transaction.atomic():
+            log_cavalete_action(cavalete, manager_user, Action.UPDATE, "fora")
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    log_cavalete_action(cavalete, manager_user, Action.UPDATE, "x")
+                    raise RuntimeError
+            with transaction.atomic():
+                log_cavalete_action(cavalete, manager_user, Action.UPDATE, "dentro")
+
+        descriptions = CavaleteHistory.objects.values_list("description", flat=True)
+        assert sorted(descriptions) == ["dentro", "fora"]
+
+    def test_deleted_reference_is_nulled(self, cavalete, manager_user):
+        """Entrada de objeto excluído na mesma transação fica com FK nula."""
+        with transaction.atomic():
+            log_cavalete_action(cavalete, manager_user, Action.DELETE, "CAV01")
+            cavalete.delete()
+
+        entry = CavaleteHistory.objects.get()
+        assert entry.cavalete_id is None
+        assert entry.user == manager_user
+
+
+@pytest.mark.django_db(transaction=True)
+def test_background_writer(settings, cavalete, manager_user):
+    """Modo background: entradas gravadas pela thread após o commit."""
+    settings.INVENTORY_HISTORY_WRITER = history.BACKGROUND
+
+    with transaction.atomic():
+        log_cavalete_action(cavalete, manager_user, Action.UPDATE)
+    history._flusher.join()
+
+    assert CavaleteHistory.objects.filter(cavalete=cavalete).count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_background_full_queue_writes_synchronously(cavalete, manager_user):
+    """Fila cheia: o excedente é gravado na hora, sem perder entradas."""
+    flusher = history.BackgroundFlusher(maxsize=1)
+    flusher._ensure_started = lambda: None
+    entries = [
+        CavaleteHistory(cavalete=cavalete, user=manager_user, action=a)
+        for a in (Action.UPDATE, Action.DELETE)
+    ]
+
+    flusher.submit(entries)
+
+    assert CavaleteHistory.objects.get().action == Action.DELETE
+    flusher.drain()
+    assert CavaleteHistory.objects.count() == 2
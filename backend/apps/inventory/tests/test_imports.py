@@ -0,0 +1,181 @@
+import io
+import zipfile
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+
+from apps.cavaletes.models import Cavalete, Slot
+from apps.inventory.imports import CavaleteImportError, import_cavaletes, iter_rows
+from apps.inventory.models import Action, CavaleteHistory
+
+
+def _rows(content, filename="cavaletes.csv"):
+    return iter_rows(io.BytesIO(content.encode("utf-8")), filename)
+
+
+@pytest.mark.django_db
+class TestImportCavaletes:
+    def test_import_creates_structure_and_history(self, manager_user):
+        """Cria cavaletes, slots por lado e histórico CREATE."""
+        content = "code,type,slots_a,slots_b\nCAV01,DEFAULT,2,1\nCAV02,,1,0\n"
+
+        result = import_cavaletes(_rows(content), user=manager_user, batch_size=1)
+
+        assert result.created == 2
+        assert result.slots_created == 4
+        assert result.error_count == 0
+        cavalete = Cavalete.objects.get(code="CAV01")
+        assert cavalete.slots_total == 3
+        assert cavalete.slots.filter(side=Slot.Side.SIDE_A).count() == 2
+        assert cavalete.slots.filter(side=Slot.Side.SIDE_B).count() == 1
+        assert (
+            CavaleteHistory.objects.filter(
+                action=Action.CREATE, user=manager_user
+            ).count()
+            == 2
+        )
+
+    def test_import_semicolon_and_bom(self, manager_user):
+        """Aceita separador ";" e UTF-8 com BOM (exportação do Excel)."""
+        content = "\ufeffcode;type;slots_a;slots_b\nCAV01;DEFAULT;1;1\n"
+
+        result = import_cavaletes(_rows(content), user=manager_user)
+
+        assert result.created == 1
+        assert Slot.objects.count() == 2
+
+    def test_import_reports_invalid_rows(self, manager_user):
+        """Linhas inválidas são reportadas sem impedir as demais."""
+        Cavalete.objects.create(code="CAV00")
+        content = (
+            "code,type,slots_a,slots_b\n"
+            "CAV00,DEFAULT,1,0\n"
+            "CAV01,DEFAULT,1,0\n"
+            "CAV01,DEFAULT,1,0\n"
+            "CAV02,XYZ,1,0\n"
+            "CAV03,DEFAULT,0,0\n"
+            ",DEFAULT,x,1\n"
+        )
+
+        result = import_cavaletes(_rows(content), user=manager_user)
+
+        assert result.rows == 6
+        assert result.created == 1
+        assert result.error_count == 5
+        assert [error["line"] for error in result.errors] == [4, 5, 6, 7, 2]
+        assert Cavalete.objects.count() == 2
+
+    def test_dry_run_does_not_write(self, manager_user):
+        """dry_run valida e conta, mas não grava nada."""
+        content = "code,type,slots_a,slots_b\nCAV01,DEFAULT,2,2\n"
+
+        result = import_cavaletes(_rows(content), user=manager_user, dry_run=True)
+
+        assert result.created == 1
+        assert result.slots_created == 4
+        assert not Cavalete.objects.exists()
+        assert not CavaleteHistory.objects.exists()
+
+    def test_history_uses_configured_writer(
+        self, manager_user, settings, django_capture_on_commit_callbacks
+    ):
+        """Com o writer adiado, o histórico CREATE é gravado no commit."""
+        settings.INVENTORY_HISTORY_WRITER = "deferred"
+        content = "code,type,slots_a,slots_b\nCAV01,DEFAULT,1,0\n"
+
+        with django_capture_on_commit_callbacks(execute=True):
+            import_cavaletes(_rows(content), user=manager_user)
+            assert not CavaleteHistory.objects.exists()
+
+        assert CavaleteHistory.objects.get().action == Action.CREATE
+
+    def test_code_created_concurrently_is_reported(self, manager_user, monkeypatch):
+        """Código cadastrado entre a conferência e o insert vira erro da linha."""
+        from apps.inventory import imports
+
+        original = imports._drop_existing
+        calls = []
+
+        def racing_drop_existing(valid, result):
+            checked = original(valid, result)
+            if not calls:
+                Cavalete.objects.create(code="CAV02")
+            calls.append(1)
+            return checked
+
+        monkeypatch.setattr(imports, "_drop_existing", racing_drop_existing)
+        content = "code,type,slots_a,slots_b\nCAV01,DEFAULT,1,0\nCAV02,DEFAULT,1,0\n"
+
+        result = import_cavaletes(_rows(content), user=manager_user)
+
+        assert result.created == 1
+        assert [(e["line"], e["code"]) for e in result.errors] == [(3, "CAV02")]
+        assert Cavalete.objects.get(code="CAV01").slots.count() == 1
+        assert CavaleteHistory.objects.count() == 1
+
+    def test_missing_columns(self):
+        """Cabeçalho sem colunas obrigatórias é rejeitado."""
+        with pytest.raises(CavaleteImportError):
+            import_cavaletes(_rows("code,type\nCAV01,DEFAULT\n"))
+
+    def test_invalid_encoding(self):
+        """CSV fora de UTF-8 vira CavaleteImportError, não UnicodeDecodeError."""
+        content = "code,type,slots_a,slots_b\nCAVÇ,DEFAULT,1,0\n".encode("latin-1")
+        with pytest.raises(CavaleteImportError, match="codificação"):
+            import_cavaletes(iter_rows(io.BytesIO(content), "cavaletes.csv"))
+
+    def test_xlsx_not_a_zip(self):
+        """Arquivo .xlsx que não é ZIP (BadZipFile) é rejeitado."""
+        pytest.importorskip("openpyxl")
+        with pytest.raises(CavaleteImportError, match="XLSX inválido"):
+            import_cavaletes(iter_rows(io.BytesIO(b"code,type"), "cavaletes.xlsx"))
+
+    def test_xlsx_zip_without_workbook(self):
+        """ZIP sem as partes de uma planilha é rejeitado."""
+        pytest.importorskip("openpyxl")
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr("leia-me.txt", "não é planilha")
+        buffer.seek(0)
+        with pytest.raises(CavaleteImportError, match="XLSX inválido"):
+            import_cavaletes(iter_rows(buffer, "cavaletes.xlsx"))
+
+    def test_xlsx_invalid_file_exception(self):
+        """InvalidFileException do openpyxl é convertida em CavaleteImportError."""
+        pytest.importorskip("openpyxl")
+        from openpyxl.utils.exceptions import InvalidFileException
+
+        with patch(
+            "openpyxl.load_workbook", side_effect=InvalidFileException("formato")
+        ):
+            with pytest.raises(CavaleteImportError, match="XLSX inválido"):
+                import_cavaletes(iter_rows(io.BytesIO(b""), "cavaletes.xlsx"))
+
+    def test_import_xlsx(self, manager_user):
+        """Lê planilhas XLSX em modo read_only."""
+        openpyxl = pytest.importorskip("openpyxl")
+        workbook = openpyxl.Workbook()
+        workbook.active.append(["code", "type", "slots_a", "slots_b"])
+        workbook.active.append(["CAV01", "DEFAULT", 3, None])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        buffer.seek(0)
+
+        result = import_cavaletes(
+            iter_rows(buffer, "cavaletes.xlsx"), user=manager_user
+        )
+
+        assert result.created == 1
+        assert result.slots_created == 3
+
+    def test_management_command(self, manager_user, tmp_path):
+        """Comando import_cavaletes importa o arquivo e imprime o resumo."""
+        path = tmp_path / "cavaletes.csv"
+        path.write_text("code,type,slots_a,slots_b\nCAV01,DEFAULT,1,1\n")
+        out = io.StringIO()
+
+        call_command("import_cavaletes", str(path), user="manager", stdout=out)
+
+        assert Cavalete.objects.filter(code="CAV01").exists()
+        assert "1 cavaletes e 2 slots criados" in out.getvalue()
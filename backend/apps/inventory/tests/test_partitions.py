@@ -0,0 +1,110 @@
+"""Particionamento mensal do histórico (helpers e comando de manutenção)."""
+
+import io
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from apps.inventory.models import Action, CavaleteHistory, SlotHistory
+from apps.inventory.partitions import (
+    add_months,
+    create_partition,
+    default_partition_name,
+    detach_partitions,
+    ensure_partitions,
+    is_partitioned,
+    list_partitions,
+    month_start,
+    partition_name,
+)
+
+postgresql_only = pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="Particionamento só no PostgreSQL."
+)
+
+
+class TestHelpers:
+    def test_month_start_uses_utc(self):
+        value = datetime(2026, 3, 1, 1, 30, tzinfo=timezone(timedelta(hours=3)))
+
+        assert month_start(value) == date(2026, 2, 1)
+        assert month_start(date(2026, 3, 17)) == date(2026, 3, 1)
+
+    def test_add_months_crosses_years(self):
+        assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+        assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+    def test_partition_name(self):
+        assert (
+            partition_name("inventory_slothistory", date(2026, 4, 1))
+            == "inventory_slothistory_202604"
+        )
+
+
+@pytest.mark.django_db
+class TestNonPostgresql:
+    @pytest.mark.skipif(connection.vendor == "postgresql", reason="Outros bancos.")
+    def test_command_is_noop(self):
+        out = io.StringIO()
+
+        call_command("manage_history_partitions", stdout=out)
+
+        assert "apenas no PostgreSQL" in out.getvalue()
+        assert not is_partitioned(SlotHistory)
+        assert ensure_partitions(SlotHistory) == []
+
+
+@postgresql_only
+@pytest.mark.django_db
+class TestPostgresqlPartitions:
+    @pytest.mark.parametrize("model", [CavaleteHistory, SlotHistory])
+    def test_tables_are_partitioned_ahead(self, model):
+        current = month_start(datetime.now(timezone.utc))
+        months = [month for month, _ in list_partitions(model)]
+
+        assert is_partitioned(model)
+        assert add_months(current, 3) in months
+
+    def test_rows_go_to_their_month(self, manager_user):
+        entry = CavaleteHistory.objects.create(user=manager_user, action=Action.CREATE)
+        name = partition_name(
+            CavaleteHistory._meta.db_table, month_start(entry.timestamp)
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT id FROM {name}")
+            assert [row[0] for row in cursor.fetchall()] == [entry.id]
+
+    def test_detach_keeps_recent_partitions(self):
+        current = month_start(datetime.now(timezone.utc))
+        old = add_months(current, -30)
+        ensure_partitions(SlotHistory, first_month=old)
+
+        detached = detach_partitions(SlotHistory, add_months(current, -24), drop=True)
+
+        months = [month for month, _ in list_partitions(SlotHistory)]
+        assert partition_name(SlotHistory._meta.db_table, old) in detached
+        assert min(months) >= add_months(current, -24)
+
+    def test_row_without_monthly_partition_goes_to_default(self, manager_user):
+        """Mês sem partição cai na DEFAULT; criar a partição move as linhas."""
+        table = CavaleteHistory._meta.db_table
+        future = add_months(month_start(datetime.now(timezone.utc)), 12)
+        moment = datetime(future.year, future.month, 15, tzinfo=timezone.utc)
+        entry = CavaleteHistory.objects.create(
+            user=manager_user, action=Action.CREATE, timestamp=moment
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT id FROM {default_partition_name(table)}")
+            assert [row[0] for row in cursor.fetchall()] == [entry.id]
+
+        create_partition(CavaleteHistory, future)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT id FROM {partition_name(table, future)}")
+            assert [row[0] for row in cursor.fetchall()] == [entry.id]
+            cursor.execute(f"SELECT COUNT(*) FROM {default_partition_name(table)}")
+            assert cursor.fetchone()[0] == 0
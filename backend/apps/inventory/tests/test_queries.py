@@ -0,0 +1,117 @@
+"""Orçamento de queries dos endpoints de histórico (protege contra N+1)."""
+
+import io
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.accounts.models import User
+from apps.cavaletes.models import Cavalete, Slot
+from apps.inventory.models import Action, CavaleteHistory, SlotHistory
+
+
+@pytest.fixture
+def history_rows(manager_user):
+    """Histórico com vários usuários, para expor lazy-load de `user`."""
+    users = [
+        User.objects.create_user(username=f"aud{i}", password="password")
+        for i in range(5)
+    ]
+    for i, user in enumerate(users * 3):
+        cavalete = Cavalete.objects.create(code=f"H-{i:03d}", user=manager_user)
+        slot = Slot.objects.create(cavalete=cavalete, side="A", number=1)
+        CavaleteHistory.objects.create(
+            cavalete=cavalete, user=user, action=Action.CREATE
+        )
+        SlotHistory.objects.create(slot=slot, user=user, action=Action.UPDATE)
+
+
+@pytest.mark.django_db
+class TestHistoryQueryBudget:
+    """COUNT da paginação + página com join em user."""
+
+    def test_cavalete_history_list(
+        self, api_client, manager_user, history_rows, django_assert_num_queries
+    ):
+        api_client.force_authenticate(user=manager_user)
+
+        with django_assert_num_queries(2):
+            api_client.get("/api/inventory/history/cavaletes/")
+
+    def test_slot_history_list(
+        self, api_client, manager_user, history_rows, django_assert_num_queries
+    ):
+        api_client.force_authenticate(user=manager_user)
+
+        with django_assert_num_queries(2):
+            api_client.get("/api/inventory/history/slots/")
+
+    def test_change_feed(
+        self,
+        api_client,
+        manager_user,
+        history_rows,
+        django_assert_num_queries,
+        settings,
+    ):
+        settings.INVENTORY_CHANGE_FEED_MAX_WAIT = 10
+        api_client.force_authenticate(user=manager_user)
+
+        # Long-poll ligado: um EXISTS (já há entradas) e o SELECT da página
+        with django_assert_num_queries(2):
+            api_client.get(
+                "/api/inventory/history/slots/changes/", {"after_id": 0, "wait": 5}
+            )
+
+
+@pytest.mark.django_db
+class TestHistoryIndexes:
+    """Consultas filtradas usam o índice composto (filtro, -timestamp, -id)."""
+
+    def test_filters_use_composite_indexes(self, history_rows):
+        user = User.objects.get(username="aud0")
+        plans = {
+            "slothist_user_ts_idx": SlotHistory.objects.filter(user=user),
+            "slothist_action_ts_idx": SlotHistory.objects.filter(action="UPDATE"),
+            "cavhist_user_ts_idx": CavaleteHistory.objects.filter(user=user),
+        }
+        for index_name, queryset in plans.items():
+            assert index_name in queryset[:20].explain()
+
+    def test_benchmark_command(self, manager_user):
+        out = io.StringIO()
+        call_command("benchmark_history_queries", "--seed", "50", stdout=out)
+
+        output = out.getvalue()
+        assert "slots: action" in output
+        assert "slothist_action_ts_idx" in output
+        # O estado "antes" é desfeito ao final.
+        assert (
+            "slothist_action_ts_idx"
+            in SlotHistory.objects.filter(action="UPDATE")[:20].explain()
+        )
+
+
+@pytest.mark.django_db
+class TestHistoryAdmin:
+    """Changelist do admin sem COUNT(*) completo e sem lazy-load por linha."""
+
+    @pytest.mark.parametrize("model", ["slothistory", "cavaletehistory"])
+    def test_changelist(self, client, history_rows, model):
+        admin = User.objects.create_user(
+            username="root", password="password", role=User.Role.ADMIN
+        )
+        client.force_login(admin)
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f"/admin/inventory/{model}/", {"q": "H-00"})
+
+        assert response.status_code == 200
+        counts = [q["sql"] for q in context.captured_queries if "COUNT(" in q["sql"]]
+        assert counts and all("LIMIT" in sql for sql in counts)
+        history_selects = [
+            q for q in context.captured_queries if f"inventory_{model}" in q["sql"]
+        ]
+        assert len(history_selects) == 2
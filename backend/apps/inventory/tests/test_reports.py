@@ -0,0 +1,164 @@
+"""Relatório de divergências (agregação no banco + cache incremental)."""
+
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.cavaletes.models import Cavalete, Slot
+from apps.inventory.compaction import compact_slot_history
+from apps.inventory.models import Action, SlotHistory
+from apps.inventory.reports import divergence_report
+
+URL = "/api/inventory/reports/divergences/"
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def slot(db):
+    cavalete = Cavalete.objects.create(code="DIV-001")
+    return Slot.objects.create(cavalete=cavalete, side="A", number=1)
+
+
+def edit(slot, user, old, new, old_code="P1", new_code="P1", **kwargs):
+    return SlotHistory.objects.create(
+        slot=slot,
+        user=user,
+        action=Action.UPDATE,
+        old_quantity=old,
+        new_quantity=new,
+        old_product_code=old_code,
+        new_product_code=new_code,
+        **kwargs,
+    )
+
+
+@pytest.mark.django_db
+class TestDivergenceReport:
+    def test_aggregates_by_product_and_auditor(self, slot, manager_user, auditor_user):
+        edit(slot, auditor_user, 10, 7)
+        edit(slot, auditor_user, 7, 7)
+        edit(slot, manager_user, 7, 9)
+        edit(slot, manager_user, None, 4, old_code=None, new_code="P2")
+        edit(slot, manager_user, 4, 4, old_code="P2", new_code="P3")
+        SlotHistory.objects.create(slot=slot, user=manager_user, action=Action.CREATE)
+
+        report = divergence_report()
+
+        assert report["totals"] == {
+            "updates": 5,
+            "quantity_changes": 3,
+            "quantity_delta": 3,
+            "quantity_abs_delta": 9,
+            "code_changes": 1,
+        }
+        by_product = {row["product_code"]: row for row in report["by_product"]}
+        assert by_product["P1"]["quantity_abs_delta"] == 5
+        assert by_product["P3"]["code_changes"] == 1
+        by_auditor = {row["username"]: row for row in report["by_auditor"]}
+        assert by_auditor["auditor"]["updates"] == 2
+        assert by_auditor["manager"]["quantity_delta"] == 6
+
+    def test_period_filter(self, slot, auditor_user):
+        now = timezone.now()
+        edit(slot, auditor_user, 1, 2, timestamp=now - timedelta(days=10))
+        edit(slot, auditor_user, 1, 5)
+
+        report = divergence_report(start=now - timedelta(days=1))
+
+        assert report["totals"]["quantity_delta"] == 4
+
+    def test_cache_refreshes_incrementally(
+        self, slot, auditor_user, django_assert_num_queries
+    ):
+        """Com o cache quente: uma query do trecho novo e uma do final do período."""
+        old = timezone.now() - timedelta(hours=1)
+        edit(slot, auditor_user, 1, 2, timestamp=old)
+        divergence_report()
+        edit(slot, auditor_user, 2, 5)
+
+        with django_assert_num_queries(2):
+            report = divergence_report()
+
+        assert report["totals"]["quantity_delta"] == 4
+
+    def test_late_commit_with_lower_id_is_counted(self, slot, auditor_user):
+        """Entrada gravada depois do cache quente, com id menor, entra no total."""
+        now = timezone.now()
+        edit(slot, auditor_user, 1, 2, id=10, timestamp=now - timedelta(hours=1))
+        edit(slot, auditor_user, 2, 3, id=20, timestamp=now - timedelta(minutes=2))
+        assert divergence_report()["totals"]["quantity_delta"] == 2
+
+        edit(slot, auditor_user, 3, 7, id=15, timestamp=now - timedelta(minutes=1))
+
+        assert divergence_report()["totals"]["quantity_delta"] == 6
+
+    def test_settled_period_is_served_from_cache(
+        self, slot, auditor_user, django_assert_num_queries
+    ):
+        now = timezone.now()
+        edit(slot, auditor_user, 1, 2, timestamp=now - timedelta(days=2))
+        end = now - timedelta(days=1)
+        divergence_report(end=end)
+
+        # Período todo assentado: nenhuma query com o cache quente.
+        with django_assert_num_queries(0):
+            report = divergence_report(end=end)
+
+        assert report["totals"]["quantity_delta"] == 1
+        assert report["settled_until"] == end
+
+    def test_refresh_ignores_cache(self, slot, auditor_user):
+        entry = edit(
+            slot, auditor_user, 1, 2, timestamp=timezone.now() - timedelta(hours=1)
+        )
+        divergence_report()
+        SlotHistory.objects.filter(pk=entry.pk).update(new_quantity=3)
+
+        assert divergence_report()["totals"]["quantity_delta"] == 1
+        assert divergence_report(refresh=True)["totals"]["quantity_delta"] == 2
+
+    def test_compaction_invalidates_cache(self, slot, auditor_user):
+        old = timezone.now() - timedelta(hours=1)
+        edit(slot, auditor_user, 1, 2, timestamp=old)
+        edit(slot, auditor_user, 2, 5, timestamp=old + timedelta(seconds=5))
+        assert divergence_report()["totals"]["updates"] == 2
+
+        assert compact_slot_history(window=60) == (1, 1)
+
+        totals = divergence_report()["totals"]
+        assert (totals["updates"], totals["quantity_delta"]) == (1, 4)
+
+
+@pytest.mark.django_db
+class TestDivergenceReportView:
+    def test_manager_gets_report(self, api_client, manager_user, slot):
+        edit(slot, manager_user, 3, 1)
+        api_client.force_authenticate(user=manager_user)
+
+        response = api_client.get(URL, {"start": "2020-01-01"})
+
+        assert response.status_code == 200
+        assert response.data["totals"]["quantity_delta"] == -2
+        assert response.data["by_auditor"][0]["user_id"] == manager_user.id
+
+    def test_invalid_date(self, api_client, manager_user):
+        api_client.force_authenticate(user=manager_user)
+
+        response = api_client.get(URL, {"end": "amanhã"})
+
+        assert response.status_code == 400
+
+    def test_auditor_forbidden(self, api_client):
+        user = User.objects.create_user(username="aud", password="password")
+        api_client.force_authenticate(user=user)
+
+        assert api_client.get(URL).status_code == 403
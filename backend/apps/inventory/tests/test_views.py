@@ -1,28 +1,13 @@
+from datetime import timedelta
+
 import pytest
+from django.core.cache import cache
+from django.utils import timezone
 from rest_framework import status
-from rest_framework.test import APIClient
+from rest_framework.throttling import ScopedRateThrottle
 from apps.accounts.models import User
-from apps.inventory.models import CavaleteHistory, Action
-from apps.cavaletes.models import Cavalete
-
-
-@pytest.fixture
-def api_client():
-    return APIClient()
-
-
-@pytest.fixture
-def manager_user(db):
-    return User.objects.create_user(
-        username="manager", password="password", role=User.Role.MANAGER
-    )
-
-
-@pytest.fixture
-def auditor_user(db):
-    return User.objects.create_user(
-        username="auditor", password="password", role=User.Role.AUDITOR
-    )
+from apps.inventory.models import CavaleteHistory, SlotHistory, Action
+from apps.cavaletes.models import Cavalete, Slot
 
 
 @pytest.fixture
@@ -55,3 +40,219 @@ class TestInventoryPermissions:
         url = "/api/inventory/history/cavaletes/"
         response = api_client.get(url)
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+class TestHistoryCursorPagination:
+    """Paginação por cursor (timestamp, id) sob demanda."""
+
+    def test_cursor_pages_follow_next(self, api_client, manager_user):
+        """?pagination=cursor pagina sem COUNT e segue o link next."""
+        cavalete = Cavalete.objects.create(code="CAV01", user=manager_user)
+        CavaleteHistory.objects.bulk_create(
+            CavaleteHistory(cavalete=cavalete, user=manager_user, action=Action.UPDATE)
+            for _ in range(25)
+        )
+        api_client.force_authenticate(user=manager_user)
+
+        response = api_client.get(
+            "/api/inventory/history/cavaletes/", {"pagination": "cursor"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert "count" not in response.data
+        assert len(response.data["results"]) == 20
+
+        second = api_client.get(response.data["next"])
+        assert len(second.data["results"]) == 5
+        ids = [row["id"] for row in response.data["results"] + second.data["results"]]
+        assert len(set(ids)) == 25
+
+    def test_cursor_with_tied_timestamps(
+        self, api_client, manager_user, django_assert_max_num_queries
+    ):
+        """Muitas linhas no mesmo timestamp: cursor composto, sem OFFSET nem repetição."""
+        cavalete = Cavalete.objects.create(code="CAV01", user=manager_user)
+        moment = timezone.now()
+        CavaleteHistory.objects.bulk_create(
+            CavaleteHistory(
+                cavalete=cavalete,
+                user=manager_user,
+                action=Action.UPDATE,
+                timestamp=moment,
+            )
+            for _ in range(45)
+        )
+        api_client.force_authenticate(user=manager_user)
+        url = "/api/inventory/history/cavaletes/"
+
+        pages = [api_client.get(url, {"pagination": "cursor"}).data]
+        while pages[-1]["next"]:
+            with django_assert_max_num_queries(5) as context:
+                pages.append(api_client.get(pages[-1]["next"]).data)
+            assert not any("OFFSET" in q["sql"] for q in context.captured_queries)
+
+        ids = [row["id"] for page in pages for row in page["results"]]
+        assert [len(page["results"]) for page in pages] == [20, 20, 5]
+        assert ids == sorted(ids, reverse=True)
+        assert len(set(ids)) == 45
+
+        previous = api_client.get(pages[1]["previous"]).data
+        assert previous["results"] == pages[0]["results"]
+        assert previous["previous"] is None
+
+    def test_page_number_is_default(self, api_client, manager_user, cavalete_history):
+        """Sem opt-in, mantém a paginação por número de página."""
+        api_client.force_authenticate(user=manager_user)
+        response = api_client.get("/api/inventory/history/cavaletes/")
+        assert response.data["count"] == 1
+
+
+@pytest.mark.django_db
+class TestHistoryFilters:
+    def test_filter_by_action_and_cavalete(
+        self, api_client, manager_user, cavalete_history
+    ):
+        other = Cavalete.objects.create(code="CAV02")
+        CavaleteHistory.objects.create(
+            cavalete=other, user=manager_user, action=Action.UPDATE
+        )
+        api_client.force_authenticate(user=manager_user)
+        url = "/api/inventory/history/cavaletes/"
+
+        response = api_client.get(url, {"action": Action.UPDATE})
+        assert [item["cavalete"] for item in response.data["results"]] == [other.id]
+
+        response = api_client.get(url, {"cavalete": cavalete_history.cavalete_id})
+        assert response.data["count"] == 1
+
+
+@pytest.mark.django_db
+class TestHistoryChangeFeed:
+    url = "/api/inventory/history/slots/changes/"
+
+    @pytest.fixture
+    def slot_entries(self, manager_user):
+        cavalete = Cavalete.objects.create(code="CAV01")
+        slot = Slot.objects.create(cavalete=cavalete, side="A", number=1)
+        return SlotHistory.objects.bulk_create(
+            SlotHistory(slot=slot, user=manager_user, action=Action.UPDATE)
+            for _ in range(5)
+        )
+
+    def test_without_after_id_returns_current_position(
+        self, api_client, manager_user, slot_entries
+    ):
+        api_client.force_authenticate(user=manager_user)
+
+        response = api_client.get(self.url)
+
+        assert response.data == {
+            "results": [],
+            "last_id": slot_entries[-1].id,
+            "has_more": False,
+        }
+
+    def test_returns_newer_entries_in_id_order(
+        self, api_client, manager_user, slot_entries
+    ):
+        api_client.force_authenticate(user=manager_user)
+
+        response = api_client.get(
+            self.url, {"after_id": slot_entries[0].id, "limit": 3}
+        )
+
+        ids = [row["id"] for row in response.data["results"]]
+        assert ids == [entry.id for entry in slot_entries[1:4]]
+        assert response.data["last_id"] == ids[-1]
+        assert response.data["has_more"] is True
+        assert set(response.data["results"][0]) == {
+            "id",
+            "slot_id",
+            "user_id",
+            "action",
+            "timestamp",
+            "new_product_code",
+            "new_quantity",
+        }
+
+        response = api_client.get(self.url, {"after_id": ids[-1]})
+        assert [row["id"] for row in response.data["results"]] == [slot_entries[-1].id]
+        assert response.data["has_more"] is False
+
+    def test_long_poll_is_opt_in(
+        self, api_client, manager_user, slot_entries, monkeypatch
+    ):
+        """Sem INVENTORY_CHANGE_FEED_MAX_WAIT, ?wait= responde na hora."""
+        sleeps = []
+        monkeypatch.setattr("apps.inventory.views.clock.sleep", sleeps.append)
+        api_client.force_authenticate(user=manager_user)
+
+        response = api_client.get(
+            self.url, {"after_id": slot_entries[-1].id, "wait": 60}
+        )
+
+        assert response.data["results"] == []
+        assert response["Retry-After"] == "5"
+        assert sleeps == []
+
+    def test_feed_has_own_throttle_scope(
+        self, api_client, manager_user, slot_entries, monkeypatch
+    ):
+        cache.clear()
+        monkeypatch.setattr(
+            ScopedRateThrottle, "THROTTLE_RATES", {"history_changes": "1/min"}
+        )
+        api_client.force_authenticate(user=manager_user)
+
+        assert api_client.get(self.url).status_code == status.HTTP_200_OK
+        response = api_client.get(self.url)
+        cache.clear()
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    def test_long_poll_times_out_empty(
+        self, api_client, manager_user, slot_entries, monkeypatch, settings
+    ):
+        settings.INVENTORY_CHANGE_FEED_MAX_WAIT = 60
+        sleeps = []
+        monkeypatch.setattr("apps.inventory.views.clock.sleep", sleeps.append)
+        ticks = iter(range(100))
+        monkeypatch.setattr("apps.inventory.views.clock.monotonic", lambda: next(ticks))
+        api_client.force_authenticate(user=manager_user)
+
+        response = api_client.get(
+            self.url, {"after_id": slot_entries[-1].id, "wait": 60}
+        )
+
+        assert response.data["results"] == []
+        assert response.data["last_id"] == slot_entries[-1].id
+        # wait limitado ao teto de 10 s
+        assert len(sleeps) <= 10
+
+    def test_lookback_returns_recent_entries_below_cursor(
+        self, api_client, manager_user, slot_entries
+    ):
+        """Entrada com id menor que o cursor, commitada tarde, volta em "late"."""
+        SlotHistory.objects.filter(id=slot_entries[0].id).update(
+            timestamp=timezone.now() - timedelta(hours=1)
+        )
+        api_client.force_authenticate(user=manager_user)
+
+        response = api_client.get(
+            self.url, {"after_id": slot_entries[3].id, "lookback": 60}
+        )
+
+        assert [row["id"] for row in response.data["results"]] == [slot_entries[4].id]
+        assert [row["id"] for row in response.data["late"]] == [
+            entry.id for entry in slot_entries[1:4]
+        ]
+
+        response = api_client.get(self.url, {"after_id": slot_entries[3].id})
+        assert "late" not in response.data
+
+    def test_invalid_after_id(self, api_client, manager_user):
+        api_client.force_authenticate(user=manager_user)
+
+        response = api_client.get(self.url, {"after_id": "abc"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,109 @@
+"""
+Linha do tempo de um cavalete: CavaleteHistory + SlotHistory dos seus
+slots em uma única query (UNION ALL), do mais recente para o mais antigo.
+
+Paginação por keyset em (timestamp, source, id): o cursor é a última linha
+da página e cada ramo do UNION filtra "antes do cursor" pelo próprio
+índice — (cavalete, -timestamp, -id) no histórico do cavalete e
+(slot, -timestamp, -id) no dos slots, com os ids de slot vindos de uma
+subquery (sem JOIN sobre todo o histórico de slots). Onde o banco aceita
+(PostgreSQL), cada ramo também é ordenado e limitado antes do UNION.
+"""
+
+import base64
+import binascii
+
+from django.db import connection, models
+from django.db.models import F, Q, Subquery, Value
+from django.utils.dateparse import parse_datetime
+
+from apps.cavaletes.models import Slot
+
+from .models import CavaleteHistory, SlotHistory
+
+CAVALETE = "cavalete"
+SLOT = "slot"
+PAGE_SIZE = 20
+ORDERING = ("-timestamp", "-source", "-id")
+COMMON_FIELDS = ("id", "timestamp", "action", "description", "user_id")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(row):
+    raw = f"{row['timestamp'].isoformat()}|{row['source']}|{row['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(value):
+    """(timestamp, source, id) do cursor; InvalidCursor se malformado."""
+    try:
+        timestamp, source, pk = (
+            base64.urlsafe_b64decode(value.encode()).decode().split("|")
+        )
+        timestamp = parse_datetime(timestamp)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(value)
+    if timestamp is None or source not in (CAVALETE, SLOT):
+        raise InvalidCursor(value)
+    return timestamp, source, pk
+
+
+def _before(source, cursor):
+    """Linhas do ramo `source` que vêm depois do cursor na ordem decrescente."""
+    timestamp, cursor_source, pk = cursor
+    if source < cursor_source:
+        return Q(timestamp__lte=timestamp)
+    if source > cursor_source:
+        return Q(timestamp__lt=timestamp)
+    return Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=pk)
+
+
+def _null(field):
+    return Value(None, output_field=field)
+
+
+def timeline_queryset(cavalete, cursor=None, limit=PAGE_SIZE):
+    """Página da linha do tempo (limit linhas) como QuerySet de dicts."""
+    # Colunas extras como anotações nos dois ramos (mesma ordem no UNION);
+    # nomes distintos dos campos dos modelos.
+    cavalete_rows = CavaleteHistory.objects.filter(cavalete=cavalete).values(
+        *COMMON_FIELDS,
+        username=F("user__username"),
+        source=Value(CAVALETE),
+        slot_ref=_null(models.BigIntegerField()),
+        slot_side=_null(models.CharField()),
+        slot_number=_null(models.IntegerField()),
+        product_code_before=_null(models.CharField()),
+        product_code_after=_null(models.CharField()),
+        quantity_before=_null(models.IntegerField()),
+        quantity_after=_null(models.IntegerField()),
+    )
+    slot_ids = Slot.objects.filter(cavalete=cavalete).values("id")
+    slot_rows = SlotHistory.objects.filter(slot_id__in=Subquery(slot_ids)).values(
+        *COMMON_FIELDS,
+        username=F("user__username"),
+        source=Value(SLOT),
+        slot_ref=F("slot_id"),
+        slot_side=F("slot__side"),
+        slot_number=F("slot__number"),
+        product_code_before=F("old_product_code"),
+        product_code_after=F("new_product_code"),
+        quantity_before=F("old_quantity"),
+        quantity_after=F("new_quantity"),
+    )
+
+    if cursor:
+        cavalete_rows = cavalete_rows.filter(_before(CAVALETE, cursor))
+        slot_rows = slot_rows.filter(_before(SLOT, cursor))
+    if connection.features.supports_slicing_ordering_in_compound:
+        cavalete_rows = cavalete_rows.order_by("-timestamp", "-id")[:limit]
+        slot_rows = slot_rows.order_by("-timestamp", "-id")[:limit]
+    else:
+        cavalete_rows = cavalete_rows.order_by()
+        slot_rows = slot_rows.order_by()
+
+    return cavalete_rows.union(slot_rows, all=True).order_by(*ORDERING)[:limit]
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CavaleteHistoryViewSet, SlotHistoryViewSet
+from .views import CavaleteHistoryViewSet, DivergenceReportView, SlotHistoryViewSet
 
 app_name = "inventory"
 
@@ -11,5 +11,10 @@ router.register(
 router.register(r"history/slots", SlotHistoryViewSet, basename="slot-history")
 
 urlpatterns = [
+    path(
+        "reports/divergences/",
+        DivergenceReportView.as_view(),
+        name="divergence-report",
+    ),
     path("", include(router.urls)),
 ]
@@ -1,34 +1,265 @@
-from rest_framework import viewsets, mixins
+import json
+import time as clock
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import status, viewsets, mixins
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
+from rest_framework.views import APIView
+from apps.core import messages as core_messages
+from apps.core.pagination import OptionalCursorPagination
 from apps.core.permissions import IsManager
+from .archive import iter_archived
 from .models import CavaleteHistory, SlotHistory
+from .reports import SETTLE_MARGIN, divergence_report
 from .serializers import CavaleteHistorySerializer, SlotHistorySerializer
 
 
+CHANGE_FEED_LIMIT = 100
+CHANGE_FEED_MAX_LIMIT = 500
+# Teto do long-poll mesmo com INVENTORY_CHANGE_FEED_MAX_WAIT maior
+CHANGE_FEED_WAIT_CAP = 10
+CHANGE_FEED_POLL_INTERVAL = 1
+# Sugestão de intervalo (Retry-After) quando não há entradas novas
+CHANGE_FEED_RETRY_AFTER = 5
+# Teto do ?lookback=, o mesmo horizonte de acomodação do relatório de divergências
+CHANGE_FEED_LOOKBACK_CAP = int(SETTLE_MARGIN.total_seconds())
+
+
+def _parse_moment(value):
+    """Data (AAAA-MM-DD, meia-noite) ou data/hora ISO; ValueError se inválido."""
+    if not value:
+        return None
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class ArchivedHistoryMixin:
+    """
+    GET .../archived/: entradas removidas do banco pelo archive_history,
+    lidas dos arquivos em ordem cronológica e devolvidas em NDJSON
+    (streaming). ?start= e ?end= limitam o período; os filtros do ViewSet
+    valem com os mesmos nomes.
+    """
+
+    archive_kind = None
+    # parâmetro da query -> coluna do arquivo
+    archive_filters = {}
+
+    @action(detail=False, methods=["get"])
+    def archived(self, request):
+        try:
+            start = _parse_moment(request.query_params.get("start"))
+            end = _parse_moment(request.query_params.get("end"))
+        except ValueError:
+            return Response(
+                {"detail": core_messages.INVALID_DATE},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        filters = {
+            column: request.query_params[param]
+            for param, column in self.archive_filters.items()
+            if param in request.query_params
+        }
+        rows = iter_archived(self.archive_kind, start, end, **filters)
+        return StreamingHttpResponse(
+            (json.dumps(row) + "\n" for row in rows),
+            content_type="application/x-ndjson",
+        )
+
+
+class ChangeFeedMixin:
+    """
+    GET .../changes/?after_id=N: entradas com id > N em ordem de id, no
+    formato compacto de `change_fields` (sem join em user), lidas pelo
+    índice da PK. Resposta: {results, last_id, has_more}; o cliente repete
+    com after_id=last_id. Sem after_id, devolve só o last_id atual (ponto de
+    partida). Sem entradas novas, a resposta traz Retry-After.
+
+    ?wait=S (long-poll) só vale com settings.INVENTORY_CHANGE_FEED_MAX_WAIT > 0
+    (teto de CHANGE_FEED_WAIT_CAP): segura a requisição até surgir entrada
+    nova ou o tempo acabar, conferindo a cada segundo com um EXISTS. Cada
+    espera ocupa um worker; só ative com workers gthread/assíncronos.
+    Throttle próprio (escopo "history_changes"). Filtros do ViewSet valem.
+
+    O id sai da sequência no INSERT, não no commit: com transações
+    concorrentes (em qualquer HISTORY_WRITER_MODE) uma entrada pode ficar
+    visível depois de outra com id maior, e um cliente que já passou dela
+    não a recebe. Sozinho, o cursor é "no máximo uma vez" (mesmo motivo do
+    corte por timestamp em reports.py). ?lookback=S (teto de
+    CHANGE_FEED_LOOKBACK_CAP) devolve também, em "late", as entradas com
+    id <= after_id e timestamp dos últimos S segundos; o cliente descarta
+    os ids que já tem.
+    """
+
+    change_fields = ()
+    # Definido só na ação changes (ver @action abaixo)
+    throttle_scope = None
+
+    @action(
+        detail=False,
+        methods=["get"],
+        throttle_classes=[ScopedRateThrottle],
+        throttle_scope="history_changes",
+    )
+    def changes(self, request):
+        try:
+            after_id = self._int_param("after_id", None)
+            limit = self._int_param("limit", CHANGE_FEED_LIMIT)
+            limit = min(max(limit, 1), CHANGE_FEED_MAX_LIMIT)
+            wait = min(self._int_param("wait", 0), self._max_wait())
+            lookback = min(self._int_param("lookback", 0), CHANGE_FEED_LOOKBACK_CAP)
+        except ValueError:
+            return Response(
+                {"detail": core_messages.INVALID_INPUT},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = self.filter_queryset(self.get_queryset()).select_related(None)
+        if after_id is None:
+            last = queryset.order_by("-id").values_list("id", flat=True).first()
+            return Response({"results": [], "last_id": last or 0, "has_more": False})
+
+        recent = queryset
+        queryset = queryset.filter(id__gt=after_id).order_by("id")
+        deadline = clock.monotonic() + wait
+        while clock.monotonic() < deadline and not queryset.exists():
+            clock.sleep(CHANGE_FEED_POLL_INTERVAL)
+
+        rows = list(queryset.values(*self.change_fields)[: limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        headers = {} if rows else {"Retry-After": str(CHANGE_FEED_RETRY_AFTER)}
+        payload = {
+            "results": rows,
+            "last_id": rows[-1]["id"] if rows else after_id,
+            "has_more": has_more,
+        }
+        if lookback:
+            since = timezone.now() - timedelta(seconds=lookback)
+            late = recent.filter(id__lte=after_id, timestamp__gte=since)
+            payload["late"] = list(
+                late.order_by("id").values(*self.change_fields)[:limit]
+            )
+        return Response(payload, headers=headers)
+
+    def _max_wait(self):
+        configured = getattr(settings, "INVENTORY_CHANGE_FEED_MAX_WAIT", 0)
+        return min(configured, CHANGE_FEED_WAIT_CAP)
+
+    def _int_param(self, name, default):
+        value = self.request.query_params.get(name)
+        if value in (None, ""):
+            return default
+        number = int(value)
+        if number < 0:
+            raise ValueError(name)
+        return number
+
+
 class CavaleteHistoryViewSet(
-    mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet
+    ArchivedHistoryMixin,
+    ChangeFeedMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
 ):
     """
     Lista histórico de ações em cavaletes.
     Apenas leitura.
     Acessível por Gestores.
+    Filtros: ?cavalete=, ?user=, ?action= (cada um com índice composto
+    (filtro, -timestamp, -id) alinhado à ordenação).
+    Paginação por cursor (timestamp, id) com ?pagination=cursor.
+    Entradas arquivadas em /archived/; entradas novas em /changes/.
     """
 
-    queryset = CavaleteHistory.objects.all()
+    queryset = CavaleteHistory.objects.select_related("user")
     serializer_class = CavaleteHistorySerializer
     permission_classes = [IsManager]
+    pagination_class = OptionalCursorPagination
+    cursor_ordering = ("-timestamp", "-id")
+    filter_backends = [DjangoFilterBackend]
     filterset_fields = ["cavalete", "user", "action"]
+    change_fields = ("id", "cavalete_id", "user_id", "action", "timestamp")
+    archive_kind = "cavaletes"
+    archive_filters = {"cavalete": "cavalete_id", "user": "user_id", "action": "action"}
 
 
 class SlotHistoryViewSet(
-    mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet
+    ArchivedHistoryMixin,
+    ChangeFeedMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
 ):
     """
     Lista histórico de ações em slots.
     Apenas leitura.
     Acessível por Gestores.
+    Filtros: ?slot=, ?user=, ?action=, ?slot__cavalete= (índices compostos
+    (filtro, -timestamp, -id) alinhados à ordenação).
+    Paginação por cursor (timestamp, id) com ?pagination=cursor.
+    Entradas arquivadas em /archived/; entradas novas em /changes/.
     """
 
-    queryset = SlotHistory.objects.all()
+    queryset = SlotHistory.objects.select_related("user")
     serializer_class = SlotHistorySerializer
     permission_classes = [IsManager]
+    pagination_class = OptionalCursorPagination
+    cursor_ordering = ("-timestamp", "-id")
+    filter_backends = [DjangoFilterBackend]
     filterset_fields = ["slot", "user", "action", "slot__cavalete"]
+    change_fields = (
+        "id",
+        "slot_id",
+        "user_id",
+        "action",
+        "timestamp",
+        "new_product_code",
+        "new_quantity",
+    )
+    archive_kind = "slots"
+    archive_filters = {
+        "slot": "slot_id",
+        "user": "user_id",
+        "action": "action",
+        "slot__cavalete": "cavalete_id",
+    }
+
+
+class DivergenceReportView(APIView):
+    """
+    Divergências das edições de slots (SlotHistory UPDATE) no período:
+    totais, por produto e por auditor. ?start= e ?end= (data ou data/hora
+    ISO; end exclusivo); ?refresh=true recalcula ignorando o cache.
+    Acessível por Gestores.
+    """
+
+    permission_classes = [IsManager]
+
+    def get(self, request):
+        try:
+            start = _parse_moment(request.query_params.get("start"))
+            end = _parse_moment(request.query_params.get("end"))
+        except ValueError:
+            return Response(
+                {"detail": core_messages.INVALID_DATE},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        refresh = request.query_params.get("refresh", "").lower() == "true"
+        report = divergence_report(start, end, refresh=refresh)
+        return Response({"start": start, "end": end, **report})
@@ -1,3 +1,24 @@
 from django.contrib import admin
+from apps.core.admin import LargeTableAdminMixin
+from .models import Product
 
-# Register your models here.
+
+@admin.register(Product)
+class ProductAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ["code", "description", "active", "synced_at", "seen_at"]
+    list_filter = ["active"]
+    # Prefixo no índice único de code
+    search_fields = ["code__startswith"]
+    ordering = ["code"]
+    readonly_fields = [
+        "code",
+        "description",
+        "active",
+        "data",
+        "checksum",
+        "synced_at",
+        "seen_at",
+    ]
+
+    def has_add_permission(self, request):
+        return False
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class SankhyaConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.sankhya"
+
+    def ready(self):
+        # Renovação antecipada do token fora das requisições (ver clients/sankhya/auth.py)
+        if getattr(settings, "SANKHYA_TOKEN_REFRESHER", False):
+            from clients.sankhya.auth import start_token_refresher
+
+            start_token_refresher()
@@ -0,0 +1,109 @@
+"""
+Compara consultas de produto ao Sankhya com conexão nova por chamada (antes) e
+com a sessão HTTP compartilhada do client (depois).
+
+Uso típico:
+    python manage.py benchmark_sankhya_http --requests 500 --concurrency 8
+
+Roda contra um servidor local que imita o ERP (clients/sankhya/stub_server.py);
+--handshake-ms simula o custo de abrir conexão (TCP + TLS), pago uma vez por
+conexão, e --response-ms o tempo de resposta do ERP.
+"""
+
+import logging
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from clients.sankhya.constants import PRODUTOS_PATH
+from clients.sankhya.http import get_timeout, reset_session
+from clients.sankhya.product import _build_product_headers, get_product
+from clients.sankhya.stub_server import StubSankhyaServer
+
+TOKEN = "stub-bearer"
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede consultas de produto contra um Sankhya simulado local: uma conexão "
+        "por chamada (requests.get) versus a sessão compartilhada com keep-alive."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--handshake-ms",
+            type=float,
+            default=20.0,
+            help="Custo simulado para abrir cada conexão (padrão: 20 ms).",
+        )
+        parser.add_argument(
+            "--response-ms",
+            type=float,
+            default=0.0,
+            help="Tempo de resposta simulado do ERP por requisição.",
+        )
+
+    def handle(self, *args, **options):
+        total = options["requests"]
+        # Log de DEBUG do urllib3 (uma linha por conexão/requisição) distorce a medição.
+        logging.getLogger("urllib3").setLevel(logging.WARNING)
+        for label, call in (
+            ("antes (conexão por chamada)", self.call_without_session),
+            ("depois (sessão compartilhada)", self.call_with_session),
+        ):
+            with StubSankhyaServer(
+                handshake_delay=options["handshake_ms"] / 1000,
+                response_delay=options["response_ms"] / 1000,
+            ) as server:
+                with override_settings(
+                    SANKHYA_API_BASE_URL=server.base_url,
+                    SANKHYA_HTTP_POOL_SIZE=options["concurrency"],
+                ):
+                    reset_session()
+                    elapsed, latencies = self.run(
+                        call, server.base_url, total, options["concurrency"]
+                    )
+                    reset_session()
+                self.report(label, total, elapsed, latencies, server.connections)
+
+    def call_without_session(self, base_url, code):
+        response = requests.get(
+            f"{base_url}{PRODUTOS_PATH}/{code}",
+            headers=_build_product_headers(TOKEN),
+            timeout=get_timeout(),
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def call_with_session(self, base_url, code):
+        return get_product(code, TOKEN)
+
+    def run(self, call, base_url, total, concurrency):
+        def timed(code):
+            start = time.perf_counter()
+            call(base_url, code)
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(timed, range(1, total + 1)))
+        return time.perf_counter() - start, latencies
+
+    def report(self, label, total, elapsed, latencies, connections):
+        latencies = sorted(latencies)
+        p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n== {label}"))
+        self.stdout.write(
+            f"{total} requisições em {elapsed:.2f}s ({total / elapsed:.0f} req/s), "
+            f"{connections} conexões abertas"
+        )
+        self.stdout.write(
+            f"latência p50 {statistics.median(latencies) * 1000:.1f} ms, "
+            f"p95 {p95 * 1000:.1f} ms"
+        )
@@ -0,0 +1,45 @@
+"""Contadores e invalidação do cache de produtos Sankhya."""
+
+from django.core.management.base import BaseCommand
+
+from clients.sankhya.product_cache import (
+    invalidate_product,
+    product_cache_stats,
+    reset_product_cache_stats,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mostra os contadores do cache de produtos Sankhya (hits, stale_hits, "
+        "negative_hits, misses) e, opcionalmente, zera os contadores ou remove "
+        "códigos do cache."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--invalidate",
+            nargs="+",
+            metavar="CODIGO",
+            help="Remove estes códigos do cache (próxima consulta vai ao ERP).",
+        )
+        parser.add_argument(
+            "--reset", action="store_true", help="Zera os contadores após exibir."
+        )
+
+    def handle(self, *args, **options):
+        stats = product_cache_stats()
+        lookups = sum(stats.values())
+        for name, value in stats.items():
+            self.stdout.write(f"{name}: {value}")
+        if lookups:
+            served = lookups - stats["misses"]
+            self.stdout.write(f"hit_ratio: {served / lookups:.1%}")
+
+        for code in options["invalidate"] or []:
+            invalidate_product(code)
+        if options["invalidate"]:
+            self.stdout.write(f"{len(options['invalidate'])} código(s) invalidado(s).")
+        if options["reset"]:
+            reset_product_cache_stats()
+            self.stdout.write(self.style.SUCCESS("Contadores zerados."))
@@ -0,0 +1,52 @@
+"""Sincroniza o espelho local de produtos (Product) com o catálogo Sankhya."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.sankhya.services import sync_products
+from clients.sankhya.constants import PRODUTOS_FIRST_PAGE
+from clients.sankhya.exceptions import SankhyaAuthError, SankhyaProductError
+
+
+class Command(BaseCommand):
+    help = (
+        "Percorre GET /v1/produtos página a página e grava o catálogo na tabela "
+        "local de produtos (upsert em lote só dos produtos novos ou alterados)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start-page",
+            type=int,
+            default=PRODUTOS_FIRST_PAGE,
+            help="Página inicial (para continuar uma sincronização interrompida).",
+        )
+        parser.add_argument(
+            "--max-pages",
+            type=int,
+            help="Para após N páginas e informa a próxima.",
+        )
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Desativa produtos que não vieram no catálogo (só em passada completa).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            result = sync_products(
+                start_page=options["start_page"],
+                max_pages=options["max_pages"],
+                prune=options["prune"],
+            )
+        except (SankhyaAuthError, SankhyaProductError) as e:
+            raise CommandError(f"Falha ao sincronizar produtos: {e}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{result.pages} páginas, {result.fetched} produtos lidos: "
+                f"{result.created} novos, {result.updated} alterados, "
+                f"{result.unchanged} sem mudança, {result.deactivated} desativados."
+            )
+        )
+        if result.next_page:
+            self.stdout.write(f"Continue com --start-page {result.next_page}.")
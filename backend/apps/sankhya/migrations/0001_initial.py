@@ -0,0 +1,52 @@
+# Generated by Django 6.0.1 on 2026-10-18 19:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Product",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "code",
+                    models.CharField(
+                        max_length=50, unique=True, verbose_name="código do produto"
+                    ),
+                ),
+                (
+                    "description",
+                    models.CharField(
+                        blank=True, max_length=255, verbose_name="descrição"
+                    ),
+                ),
+                ("active", models.BooleanField(default=True, verbose_name="ativo")),
+                ("data", models.JSONField(verbose_name="dados do Sankhya")),
+                ("checksum", models.CharField(max_length=64)),
+                (
+                    "synced_at",
+                    models.DateTimeField(verbose_name="alterado na sincronização em"),
+                ),
+                ("seen_at", models.DateTimeField(verbose_name="visto no catálogo em")),
+            ],
+            options={
+                "verbose_name": "produto Sankhya",
+                "verbose_name_plural": "produtos Sankhya",
+                "ordering": ["code"],
+            },
+        ),
+    ]
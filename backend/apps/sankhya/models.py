@@ -1,3 +1,28 @@
 from django.db import models
+from django.utils.translation import gettext_lazy as _
 
-# Create your models here.
+
+class Product(models.Model):
+    """
+    Espelho local do catálogo de produtos do Sankhya, mantido pelo comando
+    sync_sankhya_products. As consultas de produto leem daqui primeiro.
+    """
+
+    code = models.CharField(_("código do produto"), max_length=50, unique=True)
+    description = models.CharField(_("descrição"), max_length=255, blank=True)
+    active = models.BooleanField(_("ativo"), default=True)
+    # Produto como veio do ERP (devolvido pela API no lugar da chamada ao vivo)
+    data = models.JSONField(_("dados do Sankhya"))
+    # SHA-256 de `data`: a sincronização só regrava produtos alterados
+    checksum = models.CharField(max_length=64)
+    synced_at = models.DateTimeField(_("alterado na sincronização em"))
+    # Última sincronização em que o produto apareceu no catálogo (--prune)
+    seen_at = models.DateTimeField(_("visto no catálogo em"))
+
+    class Meta:
+        verbose_name = _("produto Sankhya")
+        verbose_name_plural = _("produtos Sankhya")
+        ordering = ["code"]
+
+    def __str__(self):
+        return f"{self.code} - {self.description}"
@@ -0,0 +1,17 @@
+from rest_framework import serializers
+
+
+class ProductBatchSerializer(serializers.Serializer):
+    """Lista de códigos de produto para consulta em lote."""
+
+    MAX_CODES = 100
+
+    codes = serializers.ListField(
+        child=serializers.CharField(max_length=30),
+        allow_empty=False,
+        max_length=MAX_CODES,
+    )
+
+    def validate_codes(self, value):
+        # Remove repetidos mantendo a ordem de envio
+        return list(dict.fromkeys(value))
@@ -0,0 +1,157 @@
+"""
+Espelho local do catálogo Sankhya (Product): sincronização e consulta.
+
+- sync_products: percorre GET /v1/produtos página a página e grava cada página
+  com um bulk upsert, só dos produtos novos ou alterados (checksum do payload).
+  Os demais só têm seen_at atualizado (um UPDATE por página); com prune=True,
+  produtos que sumiram do catálogo são desativados ao final.
+- lookup_product / lookup_products: leem do espelho (só produtos ativos) e vão
+  ao ERP (cache de produtos + chamada ao vivo) para códigos desconhecidos ou
+  inativos no espelho.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.utils import timezone
+
+from clients.sankhya.constants import (
+    PRODUCT_ACTIVE_KEY,
+    PRODUCT_CODE_KEY,
+    PRODUCT_NAME_KEY,
+    PRODUTOS_FIRST_PAGE,
+)
+from clients.sankhya.product import list_products
+from clients.sankhya.product_cache import get_cached_product, get_cached_products
+
+from .models import Product
+
+UPSERT_FIELDS = ["description", "active", "data", "checksum", "synced_at", "seen_at"]
+# Valores de "ativo" no Sankhya que significam produto inativo
+INACTIVE_VALUES = {"N", "NAO", "NÃO", "FALSE", "0"}
+
+
+@dataclass
+class SyncResult:
+    pages: int = 0
+    fetched: int = 0
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deactivated: int = 0
+    next_page: int = None
+
+
+def _checksum(data):
+    raw = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _is_active(data):
+    value = data.get(PRODUCT_ACTIVE_KEY)
+    if value is None:
+        return True
+    return str(value).strip().upper() not in INACTIVE_VALUES
+
+
+def build_product(data, now):
+    """Product (não salvo) a partir de um item da listagem; None se não tiver código."""
+    code = data.get(PRODUCT_CODE_KEY)
+    if code in (None, ""):
+        return None
+    return Product(
+        code=str(code),
+        description=str(data.get(PRODUCT_NAME_KEY) or "")[:255],
+        active=_is_active(data),
+        data=data,
+        checksum=_checksum(data),
+        synced_at=now,
+        seen_at=now,
+    )
+
+
+def _save_page(items, now, result):
+    """Upsert dos produtos novos/alterados da página; marca os demais como vistos."""
+    products = {}
+    for item in items:
+        product = build_product(item, now)
+        if product is not None:
+            products[product.code] = product
+    known = dict(
+        Product.objects.filter(code__in=products).values_list("code", "checksum")
+    )
+    changed = [p for code, p in products.items() if known.get(code) != p.checksum]
+    unchanged = [code for code, p in products.items() if known.get(code) == p.checksum]
+
+    with transaction.atomic():
+        if changed:
+            Product.objects.bulk_create(
+                changed,
+                update_conflicts=True,
+                unique_fields=["code"],
+                update_fields=UPSERT_FIELDS,
+            )
+        if unchanged:
+            Product.objects.filter(code__in=unchanged).update(seen_at=now)
+
+    result.fetched += len(items)
+    result.created += sum(1 for code in products if code not in known)
+    result.updated += sum(1 for p in changed if p.code in known)
+    result.unchanged += len(unchanged)
+
+
+def sync_products(start_page=PRODUTOS_FIRST_PAGE, max_pages=None, prune=False):
+    """
+    Sincroniza o catálogo a partir de start_page. Cada página é gravada na sua
+    própria transação: uma falha no meio mantém o que já foi gravado e o comando
+    pode continuar de result.next_page. prune só vale para a passada completa.
+    O token é obtido a cada página (get_valid_token, em cache), então uma
+    sincronização longa não fica presa a um token que expirou no meio.
+    """
+    started = timezone.now()
+    result = SyncResult()
+    page = start_page
+    while True:
+        items, has_more = list_products(page)
+        _save_page(items, timezone.now(), result)
+        result.pages += 1
+        page += 1
+        if not has_more:
+            break
+        if max_pages and result.pages >= max_pages:
+            result.next_page = page
+            return result
+
+    if prune and start_page == PRODUTOS_FIRST_PAGE:
+        result.deactivated = Product.objects.filter(
+            active=True, seen_at__lt=started
+        ).update(active=False)
+    return result
+
+
+def lookup_product(code):
+    """Produto ativo do espelho local; desconhecido ou inativo vai ao ERP (via cache)."""
+    data = (
+        Product.objects.filter(code=code, active=True)
+        .values_list("data", flat=True)
+        .first()
+    )
+    if data is not None:
+        return data
+    return get_cached_product(code)
+
+
+def lookup_products(codes):
+    """
+    Vários produtos: um SELECT no espelho (só ativos) e get_cached_products para
+    os demais. Mesmo formato de get_cached_products.
+    """
+    results = dict(
+        Product.objects.filter(code__in=codes, active=True).values_list("code", "data")
+    )
+    unknown = [code for code in codes if code not in results]
+    if unknown:
+        results.update(get_cached_products(unknown))
+    return results
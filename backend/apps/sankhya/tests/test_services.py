@@ -0,0 +1,137 @@
+"""Espelho local de produtos: sincronização com o catálogo e consulta local-first."""
+
+from unittest.mock import patch
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+from apps.sankhya.models import Product
+from apps.sankhya.services import lookup_product, lookup_products, sync_products
+from clients.sankhya.http import reset_session
+from clients.sankhya.stub_server import StubSankhyaServer, stub_product
+
+
+@pytest.fixture
+def catalogue():
+    """Sankhya simulado com 120 produtos (3 páginas de 50)."""
+    reset_session()
+    with StubSankhyaServer(catalogue_size=120) as server:
+        with patch.object(settings, "SANKHYA_API_BASE_URL", server.base_url):
+            with patch("clients.sankhya.product.get_valid_token", return_value="b"):
+                yield server
+    reset_session()
+
+
+@pytest.mark.django_db
+class TestSyncProducts:
+    def test_full_sync_upserts_catalogue(self, catalogue):
+        result = sync_products()
+
+        assert (result.pages, result.fetched, result.created) == (3, 120, 120)
+        product = Product.objects.get(code="7")
+        assert product.description == "Produto 7"
+        assert product.active is True
+        assert product.data == stub_product(7)
+
+    def test_resync_only_rewrites_changed_products(self, catalogue):
+        sync_products()
+        Product.objects.filter(code="1").update(checksum="velho", description="x")
+
+        result = sync_products()
+
+        assert (result.created, result.updated, result.unchanged) == (0, 1, 119)
+        assert Product.objects.get(code="1").description == "Produto 1"
+
+    def test_max_pages_reports_next_page(self, catalogue):
+        first = sync_products(max_pages=2)
+        assert (first.pages, first.next_page) == (2, 3)
+
+        rest = sync_products(start_page=first.next_page)
+        assert rest.next_page is None
+        assert Product.objects.count() == 120
+
+    def test_prune_deactivates_missing_products(self, catalogue):
+        sync_products()
+        catalogue.catalogue_size = 100
+
+        result = sync_products(prune=True)
+
+        assert result.deactivated == 20
+        assert not Product.objects.get(code="101").active
+        assert Product.objects.get(code="100").active
+
+    def test_token_is_requested_per_page(self, catalogue):
+        """Token renovado no meio da sincronização vale para as páginas seguintes."""
+        with patch(
+            "clients.sankhya.product.get_valid_token", side_effect=["b1", "b2", "b3"]
+        ) as mock_token:
+            result = sync_products()
+
+        assert result.pages == 3
+        assert mock_token.call_count == 3
+
+    def test_command_summary(self, catalogue, capsys):
+        call_command("sync_sankhya_products", "--max-pages", "1")
+        out = capsys.readouterr().out
+        assert "50 novos" in out
+        assert "--start-page 2" in out
+
+
+@pytest.mark.django_db
+class TestLookup:
+    def _local(self, code, active=True):
+        return Product.objects.create(
+            code=code,
+            active=active,
+            description=f"Local {code}",
+            data={"codigoProduto": code, "nome": f"Local {code}"},
+            checksum="x",
+            synced_at="2026-01-01T00:00Z",
+            seen_at="2026-01-01T00:00Z",
+        )
+
+    @patch("apps.sankhya.services.get_cached_product")
+    def test_known_code_is_served_locally(self, mock_cached):
+        self._local("123")
+        assert lookup_product("123")["nome"] == "Local 123"
+        mock_cached.assert_not_called()
+
+    @patch("apps.sankhya.services.get_cached_product")
+    def test_unknown_code_falls_back_to_erp(self, mock_cached):
+        mock_cached.return_value = {"codigoProduto": 9}
+        assert lookup_product("9") == {"codigoProduto": 9}
+        mock_cached.assert_called_once_with("9")
+
+    @patch("apps.sankhya.services.get_cached_product")
+    def test_inactive_code_falls_back_to_erp(self, mock_cached):
+        self._local("5", active=False)
+        mock_cached.return_value = {"codigoProduto": 5}
+        assert lookup_product("5") == {"codigoProduto": 5}
+        mock_cached.assert_called_once_with("5")
+
+    @patch("apps.sankhya.services.get_cached_products")
+    def test_batch_skips_inactive_local_products(self, mock_cached):
+        self._local("1")
+        self._local("2", active=False)
+        mock_cached.return_value = {"2": {"codigoProduto": 2}}
+
+        results = lookup_products(["1", "2"])
+
+        assert results["2"] == {"codigoProduto": 2}
+        mock_cached.assert_called_once_with(["2"])
+
+    @patch("apps.sankhya.services.get_cached_products")
+    def test_batch_only_fetches_unknown_codes(
+        self, mock_cached, django_assert_num_queries
+    ):
+        self._local("1")
+        self._local("2")
+        mock_cached.return_value = {"3": {"codigoProduto": 3}}
+
+        with django_assert_num_queries(1):
+            results = lookup_products(["1", "2", "3"])
+
+        assert results["1"]["nome"] == "Local 1"
+        assert results["3"] == {"codigoProduto": 3}
+        mock_cached.assert_called_once_with(["3"])
@@ -3,12 +3,19 @@
 from unittest.mock import patch
 
 import pytest
+from django.core.cache import cache
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
 
 from apps.accounts.models import User
-from clients.sankhya.exceptions import SankhyaAuthError, SankhyaProductError
+from apps.sankhya.models import Product
+from clients.sankhya.exceptions import (
+    SankhyaAuthError,
+    SankhyaProductError,
+    SankhyaProductNotFoundError,
+)
 
 
 @pytest.fixture
@@ -23,6 +30,13 @@ def user():
     )
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.mark.django_db
 class TestProductDetailView:
     """Testes para o endpoint GET /api/sankhya/products/{code}/."""
@@ -33,8 +47,8 @@ class TestProductDetailView:
         response = api_client.get(url)
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
-    @patch("apps.sankhya.views.get_valid_token")
-    @patch("apps.sankhya.views.get_product")
+    @patch("clients.sankhya.product_cache.get_valid_token")
+    @patch("clients.sankhya.product_cache.get_product")
     def test_get_product_success(
         self, mock_get_product, mock_get_token, api_client, user
     ):
@@ -52,7 +66,45 @@ class TestProductDetailView:
         mock_get_token.assert_called_once()
         mock_get_product.assert_called_once_with("123", "bearer_token")
 
-    @patch("apps.sankhya.views.get_valid_token")
+    @patch("clients.sankhya.product_cache.get_valid_token")
+    @patch("clients.sankhya.product_cache.get_product")
+    def test_get_product_served_from_cache(
+        self, mock_get_product, mock_get_token, api_client, user
+    ):
+        """Segunda consulta do mesmo código não vai ao ERP."""
+        api_client.force_authenticate(user=user)
+        mock_get_token.return_value = "bearer_token"
+        mock_get_product.return_value = {"codigo": 123, "descricao": "Produto Teste"}
+
+        url = reverse("sankhya:product-detail", args=["123"])
+        api_client.get(url)
+        response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["descricao"] == "Produto Teste"
+        mock_get_product.assert_called_once()
+
+    @patch("clients.sankhya.product_cache.get_product")
+    def test_get_product_from_local_mirror(self, mock_get_product, api_client, user):
+        """Código sincronizado no espelho local não vai ao ERP."""
+        Product.objects.create(
+            code="123",
+            description="Produto Local",
+            data={"codigo": 123, "descricao": "Produto Local"},
+            checksum="x",
+            synced_at=timezone.now(),
+            seen_at=timezone.now(),
+        )
+        api_client.force_authenticate(user=user)
+
+        url = reverse("sankhya:product-detail", args=["123"])
+        response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["descricao"] == "Produto Local"
+        mock_get_product.assert_not_called()
+
+    @patch("clients.sankhya.product_cache.get_valid_token")
     def test_get_product_auth_error(self, mock_get_token, api_client, user):
         """Retorna 503 quando falha autenticação no Sankhya."""
         api_client.force_authenticate(user=user)
@@ -64,15 +116,17 @@ class TestProductDetailView:
         assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
         assert "Falha no login" in response.data["detail"]
 
-    @patch("apps.sankhya.views.get_valid_token")
-    @patch("apps.sankhya.views.get_product")
+    @patch("clients.sankhya.product_cache.get_valid_token")
+    @patch("clients.sankhya.product_cache.get_product")
     def test_get_product_not_found(
         self, mock_get_product, mock_get_token, api_client, user
     ):
         """Retorna 404 quando produto não existe no Sankhya."""
         api_client.force_authenticate(user=user)
         mock_get_token.return_value = "bearer_token"
-        mock_get_product.side_effect = SankhyaProductError("Produto não encontrado.")
+        mock_get_product.side_effect = SankhyaProductNotFoundError(
+            "Produto não encontrado."
+        )
 
         url = reverse("sankhya:product-detail", args=["999"])
         response = api_client.get(url)
@@ -80,8 +134,8 @@ class TestProductDetailView:
         assert response.status_code == status.HTTP_404_NOT_FOUND
         assert "Produto não encontrado" in response.data["detail"]
 
-    @patch("apps.sankhya.views.get_valid_token")
-    @patch("apps.sankhya.views.get_product")
+    @patch("clients.sankhya.product_cache.get_valid_token")
+    @patch("clients.sankhya.product_cache.get_product")
     def test_get_product_sankhya_error(
         self, mock_get_product, mock_get_token, api_client, user
     ):
@@ -94,3 +148,85 @@ class TestProductDetailView:
         response = api_client.get(url)
 
         assert response.status_code == status.HTTP_502_BAD_GATEWAY
+
+
+@pytest.mark.django_db
+class TestProductBatchView:
+    """Testes para o endpoint POST /api/sankhya/products/batch/."""
+
+    url = reverse("sankhya:product-batch")
+
+    def test_batch_unauthenticated(self, api_client):
+        """Requer autenticação."""
+        response = api_client.post(self.url, {"codes": ["123"]}, format="json")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.parametrize("payload", [{}, {"codes": []}, {"codes": ["1"] * 101}])
+    def test_batch_invalid_payload(self, api_client, user, payload):
+        """Lista ausente, vazia ou acima do limite."""
+        api_client.force_authenticate(user=user)
+        response = api_client.post(self.url, payload, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @patch("clients.sankhya.product_cache.get_valid_token")
+    @patch("clients.sankhya.product_cache.get_product")
+    def test_batch_mixed_results(
+        self, mock_get_product, mock_get_token, api_client, user
+    ):
+        """Resultado por código, na ordem enviada, sem repetidos nem falha geral."""
+
+        def fake_get_product(code, token):
+            if code == "999":
+                raise SankhyaProductNotFoundError("Produto não encontrado.")
+            if code == "500":
+                raise SankhyaProductError("Sankhya produtos retornou status 500.")
+            return {"codigo": code}
+
+        api_client.force_authenticate(user=user)
+        mock_get_token.return_value = "bearer_token"
+        mock_get_product.side_effect = fake_get_product
+
+        response = api_client.post(
+            self.url, {"codes": ["123", "999", "123", "500"]}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["results"] == [
+            {"code": "123", "status": 200, "product": {"codigo": "123"}},
+            {"code": "999", "status": 404, "detail": "Produto não encontrado."},
+            {
+                "code": "500",
+                "status": 502,
+                "detail": "Sankhya produtos retornou status 500.",
+            },
+        ]
+        assert mock_get_product.call_count == 3
+        mock_get_token.assert_called_once()
+
+    @patch("clients.sankhya.product_cache.get_valid_token")
+    @patch("clients.sankhya.product_cache.get_product")
+    def test_batch_serves_cached_codes_without_erp(
+        self, mock_get_product, mock_get_token, api_client, user
+    ):
+        """Códigos já em cache não vão ao ERP; só os novos são buscados."""
+        api_client.force_authenticate(user=user)
+        mock_get_token.return_value = "bearer_token"
+        mock_get_product.side_effect = lambda code, token: {"codigo": code}
+
+        api_client.post(self.url, {"codes": ["1", "2"]}, format="json")
+        mock_get_product.reset_mock()
+        response = api_client.post(self.url, {"codes": ["1", "2", "3"]}, format="json")
+
+        assert [item["status"] for item in response.data["results"]] == [200] * 3
+        mock_get_product.assert_called_once_with("3", "bearer_token")
+
+    @patch("clients.sankhya.product_cache.get_valid_token")
+    def test_batch_auth_error_per_code(self, mock_get_token, api_client, user):
+        """Falha no login vira 503 em cada código, com 200 no lote."""
+        api_client.force_authenticate(user=user)
+        mock_get_token.side_effect = SankhyaAuthError("Falha no login")
+
+        response = api_client.post(self.url, {"codes": ["1", "2"]}, format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["status"] for item in response.data["results"]] == [503, 503]
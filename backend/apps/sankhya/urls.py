@@ -1,8 +1,10 @@
 from django.urls import path
-from .views import ProductDetailView
+from .views import ProductBatchView, ProductDetailView
 
 app_name = "sankhya"
 
 urlpatterns = [
+    # Antes do detalhe: "batch" também casaria com <str:code>
+    path("products/batch/", ProductBatchView.as_view(), name="product-batch"),
     path("products/<str:code>/", ProductDetailView.as_view(), name="product-detail"),
 ]
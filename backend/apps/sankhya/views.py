@@ -4,13 +4,16 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.throttling import ScopedRateThrottle
 from rest_framework import status
 
-from clients.sankhya.auth import get_valid_token
-from clients.sankhya.product import get_product
+from apps.core.exceptions import sankhya_error_status
+
+from .serializers import ProductBatchSerializer
+from .services import lookup_product, lookup_products
 
 
 class ProductDetailView(APIView):
     """
-    Busca detalhes de um produto no Sankhya pelo código.
+    Busca detalhes de um produto pelo código: espelho local (Product) e, para
+    códigos desconhecidos, Sankhya via cache de produtos.
     Rate limit: 60 requisições por minuto por usuário.
     """
 
@@ -28,7 +31,44 @@ class ProductDetailView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        token = get_valid_token()
-        product_data = get_product(code, token)
+        product_data = lookup_product(code)
 
         return Response(product_data)
+
+
+class ProductBatchView(APIView):
+    """
+    Busca vários produtos no Sankhya em uma requisição (conta uma vez no rate
+    limit). Códigos do espelho local e hits do cache saem na hora; os demais são
+    buscados no ERP em paralelo.
+    """
+
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = "sankhya"
+
+    def post(self, request):
+        """
+        Body: {"codes": ["123", ...]} (até 100, repetidos ignorados). Retorna um
+        item por código, na ordem enviada: status 200 com `product` ou o status
+        do erro (404, 502, 503) com `detail`. Falhas não afetam os outros códigos.
+        """
+        serializer = ProductBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        codes = serializer.validated_data["codes"]
+
+        outcomes = lookup_products(codes)
+        results = []
+        for code in codes:
+            outcome = outcomes[code]
+            if isinstance(outcome, Exception):
+                results.append(
+                    {
+                        "code": code,
+                        "status": sankhya_error_status(outcome),
+                        "detail": str(outcome),
+                    }
+                )
+            else:
+                results.append({"code": code, "status": 200, "product": outcome})
+        return Response({"results": results})
@@ -1,14 +1,17 @@
-"""Cliente Sankhya: auth (login legado) e product (API V1)."""
+"""Cliente Sankhya: auth (login legado), product (API V1) e product_cache."""
 
 from clients.sankhya.auth import get_valid_token, login as sankhya_login, refresh_token_if_needed
 from clients.sankhya.exceptions import SankhyaAuthError, SankhyaProductError
 from clients.sankhya.product import get_product
+from clients.sankhya.product_cache import get_cached_product, product_cache_stats
 
 __all__ = [
     "SankhyaAuthError",
     "SankhyaProductError",
+    "get_cached_product",
     "get_product",
     "get_valid_token",
+    "product_cache_stats",
     "refresh_token_if_needed",
     "sankhya_login",
 ]
@@ -1,6 +1,18 @@
-"""Login legado Sankhya (POST /login) e cache do bearerToken para chamadas subsequentes."""
+"""
+Login legado Sankhya (POST /login) e cache do bearerToken para chamadas subsequentes.
+
+Renovação em voo único: só quem pega a trava (cache.add) chama /login; os demais
+esperam e reaproveitam o token gravado. A trava só vale entre processos com um cache
+compartilhado (Redis); com LocMemCache cada processo tem a sua e faz o próprio login.
+
+start_token_refresher() (chamado no AppConfig.ready() com SANKHYA_TOKEN_REFRESHER)
+sobe uma thread por processo que renova o token BEARER_REFRESH_AHEAD_SECONDS antes
+de expirar, fora das requisições, enquanto o atual continua sendo servido.
+"""
 
 import logging
+import threading
+import time as clock
 
 import requests
 from django.conf import settings
@@ -8,18 +20,28 @@ from django.core.cache import cache
 
 from clients.sankhya.constants import (
     BEARER_CACHE_TIMEOUT_SECONDS,
+    BEARER_REFRESH_AHEAD_SECONDS,
     HEADER_APPKEY,
     HEADER_PASSWORD,
     HEADER_TOKEN,
     HEADER_USERNAME,
+    LOGIN_LOCK_SECONDS,
     LOGIN_PATH,
+    LOGIN_WAIT_POLL_SECONDS,
+    LOGIN_WAIT_SECONDS,
+    REFRESHER_INTERVAL_SECONDS,
     RESPONSE_BEARER_KEY,
-    SANKHYA_HTTP_TIMEOUT,
 )
 from clients.sankhya.exceptions import SankhyaAuthError
+from clients.sankhya import http
 
 logger = logging.getLogger(__name__)
 
+TOKEN_CACHE_KEY = "sankhya:v1:token:service_user"
+# Presente enquanto o token não precisa de renovação antecipada
+TOKEN_FRESH_KEY = f"{TOKEN_CACHE_KEY}:fresh"
+TOKEN_LOCK_KEY = f"{TOKEN_CACHE_KEY}:lock"
+
 
 def _login_url():
     base = (getattr(settings, "SANKHYA_API_BASE_URL", None) or "").rstrip("/")
@@ -50,7 +72,7 @@ def login() -> str:
 
     headers = _build_login_headers(appkey, token, username, password)
     try:
-        response = requests.post(url, headers=headers, timeout=SANKHYA_HTTP_TIMEOUT)
+        response = http.post(url, headers=headers)
     except requests.RequestException as e:
         logger.exception("Erro de rede ao chamar Sankhya /login: %s", e)
         raise SankhyaAuthError("Erro de rede ao chamar Sankhya /login.") from e
@@ -71,28 +93,104 @@ def login() -> str:
     return bearer
 
 
+def _login_and_store() -> str:
+    """Faz login e grava o token (e a marca de token ainda fresco)."""
+    bearer = login()
+    cache.set(TOKEN_CACHE_KEY, bearer, timeout=BEARER_CACHE_TIMEOUT_SECONDS)
+    cache.set(TOKEN_FRESH_KEY, True, timeout=BEARER_CACHE_TIMEOUT_SECONDS - BEARER_REFRESH_AHEAD_SECONDS)
+    return bearer
+
+
+def _wait_for_renewal():
+    """Espera quem está com a trava terminar; retorna o token gravado (ou None)."""
+    deadline = clock.monotonic() + LOGIN_WAIT_SECONDS
+    while cache.get(TOKEN_LOCK_KEY) and clock.monotonic() < deadline:
+        clock.sleep(LOGIN_WAIT_POLL_SECONDS)
+    return cache.get(TOKEN_CACHE_KEY)
+
+
+def _renew() -> str:
+    """Login em voo único. Se quem renovava falhou, uma segunda rodada assume a trava."""
+    for _ in range(2):
+        if cache.add(TOKEN_LOCK_KEY, 1, timeout=LOGIN_LOCK_SECONDS):
+            try:
+                return _login_and_store()
+            finally:
+                cache.delete(TOKEN_LOCK_KEY)
+        bearer = _wait_for_renewal()
+        if bearer:
+            return bearer
+    raise SankhyaAuthError("Renovação do token Sankhya em andamento não concluiu.")
+
+
+def refresh_if_due() -> bool:
+    """
+    Renova o token se ele falta ou está a menos de BEARER_REFRESH_AHEAD_SECONDS de
+    expirar. Não espera: se outro processo já está renovando, não faz nada.
+    Retorna True se fez login.
+    """
+    if cache.get(TOKEN_FRESH_KEY):
+        return False
+    if not cache.add(TOKEN_LOCK_KEY, 1, timeout=LOGIN_LOCK_SECONDS):
+        return False
+    try:
+        _login_and_store()
+        logger.info("Token Sankhya renovado antes de expirar.")
+        return True
+    except SankhyaAuthError:
+        logger.warning("Falha na renovação antecipada do token Sankhya; token atual segue em uso.")
+        return False
+    finally:
+        cache.delete(TOKEN_LOCK_KEY)
+
+
+_refresher_lock = threading.Lock()
+_refresher_started = False
+
+
+def start_token_refresher(interval: float = REFRESHER_INTERVAL_SECONDS) -> bool:
+    """Sobe a thread de renovação antecipada (uma por processo). Retorna False se já existe."""
+    global _refresher_started
+    with _refresher_lock:
+        if _refresher_started:
+            return False
+        _refresher_started = True
+
+    def run():
+        while True:
+            try:
+                refresh_if_due()
+            except Exception:
+                logger.exception("Erro na renovação antecipada do token Sankhya.")
+            clock.sleep(interval)
+
+    threading.Thread(target=run, name="sankhya-token-refresher", daemon=True).start()
+    return True
+
+
 def get_valid_token(force_refresh: bool = False) -> str:
-    """BearerToken válido (cache global + renovação). Raises SankhyaAuthError se falhar."""
-    cache_key = "sankhya:v1:token:service_user"
-    cached = cache.get(cache_key)
-
-    if force_refresh or not cached:
-        logger.info("Token Sankhya não em cache ou refresh forçado. Renovando login.")
-        try:
-            cached = login()
-            cache.set(cache_key, cached, timeout=BEARER_CACHE_TIMEOUT_SECONDS)
-        except SankhyaAuthError as e:
-            logger.error("Falha ao renovar token Sankhya.")
-            raise SankhyaAuthError("Não foi possível autenticar na Sankhya (login de renovação falhou).") from e
-
-    return cached
-
-
-def refresh_token_if_needed(response_status_code: int) -> bool:
-    """Limpa cache do token se response_status_code for 401 ou 403. Retorna True se limpou."""
-    if response_status_code in (401, 403):
-        cache_key = "sankhya:v1:token:service_user"
-        cache.delete(cache_key)
+    """BearerToken válido (cache global + renovação em voo único). Raises SankhyaAuthError se falhar."""
+    cached = None if force_refresh else cache.get(TOKEN_CACHE_KEY)
+    if cached:
+        return cached
+
+    logger.info("Token Sankhya não em cache ou refresh forçado. Renovando login.")
+    try:
+        return _renew()
+    except SankhyaAuthError as e:
+        logger.error("Falha ao renovar token Sankhya.")
+        raise SankhyaAuthError("Não foi possível autenticar na Sankhya (login de renovação falhou).") from e
+
+
+def refresh_token_if_needed(response_status_code: int, bearer_token: str = None) -> bool:
+    """
+    Retorna True se response_status_code for 401 ou 403 (pedir token novo e repetir).
+    Limpa o token do cache, a menos que bearer_token (o recusado) já tenha sido
+    substituído por outra requisição.
+    """
+    if response_status_code not in (401, 403):
+        return False
+    if bearer_token is None or cache.get(TOKEN_CACHE_KEY) == bearer_token:
+        cache.delete(TOKEN_CACHE_KEY)
         logger.warning("Token Sankhya invalidado (status %s). Cache limpo.", response_status_code)
-        return True
-    return False
+    return True
@@ -8,9 +8,46 @@ HEADER_APPKEY = "appkey"
 HEADER_USERNAME = "username"
 HEADER_PASSWORD = "password"
 BEARER_CACHE_TIMEOUT_SECONDS = 25 * 60
+# Renovação antecipada e em voo único do token
+BEARER_REFRESH_AHEAD_SECONDS = 3 * 60
+LOGIN_LOCK_SECONDS = 30
+LOGIN_WAIT_SECONDS = 15
+LOGIN_WAIT_POLL_SECONDS = 0.05
+# Intervalo entre verificações da thread de renovação antecipada
+REFRESHER_INTERVAL_SECONDS = 30
 
-# HTTP
-SANKHYA_HTTP_TIMEOUT = 30
+# HTTP (padrões; sobrescritos pelo settings)
+SANKHYA_HTTP_CONNECT_TIMEOUT = 5
+SANKHYA_HTTP_READ_TIMEOUT = 30
+SANKHYA_HTTP_POOL_SIZE = 10
+SANKHYA_HTTP_MIN_READ_TIMEOUT = 1
+# Retry de falhas transitórias (segundos)
+SANKHYA_HTTP_RETRIES = 3
+SANKHYA_HTTP_BACKOFF = 0.2
+SANKHYA_HTTP_BACKOFF_MAX = 2
+SANKHYA_HTTP_RETRY_BUDGET = 10
+RETRY_STATUSES = (500, 502, 503, 504)
 
 # API V1
 PRODUTOS_PATH = "/v1/produtos"
+# Listagem paginada GET /v1/produtos?page=N
+PRODUTOS_FIRST_PAGE = 1
+RESPONSE_PRODUCTS_KEY = "produtos"
+RESPONSE_PAGINATION_KEY = "pagination"
+RESPONSE_HAS_MORE_KEY = "hasMore"
+# Campos do produto usados no espelho local (apps.sankhya.models.Product)
+PRODUCT_CODE_KEY = "codigoProduto"
+PRODUCT_NAME_KEY = "nome"
+PRODUCT_ACTIVE_KEY = "ativo"
+
+# Cache de produtos (TTLs vêm do settings)
+PRODUCT_CACHE_PREFIX = "sankhya:v1:product"
+PRODUCT_CACHE_STATS = ("hits", "stale_hits", "negative_hits", "misses")
+PRODUCT_REFRESH_LOCK_SECONDS = 60
+# Renovações de entradas velhas: threads por processo e renovações pendentes
+# (além disso a renovação é descartada e o valor velho continua servido)
+PRODUCT_REFRESH_WORKERS = 2
+PRODUCT_REFRESH_MAX_PENDING = 50
+PRODUCT_NOT_FOUND_MESSAGE = "Produto não encontrado."
+# Busca em lote: threads buscando misses no ERP ao mesmo tempo
+BATCH_WORKERS = 8
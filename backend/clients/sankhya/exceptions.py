@@ -11,3 +11,9 @@ class SankhyaProductError(Exception):
     """Erro ao buscar produto na API Sankhya."""
 
     pass
+
+
+class SankhyaProductNotFoundError(SankhyaProductError):
+    """Produto inexistente no Sankhya (404)."""
+
+    pass
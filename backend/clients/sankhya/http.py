@@ -0,0 +1,162 @@
+"""
+Sessão HTTP compartilhada do client Sankhya (uma por processo).
+
+Reaproveita conexões TCP/TLS (keep-alive) entre chamadas ao ERP em vez de abrir
+uma conexão por requisição. O pool do urllib3 é thread-safe; o tamanho vem de
+SANKHYA_HTTP_POOL_SIZE. Timeouts separados de conexão e leitura
+(SANKHYA_HTTP_CONNECT_TIMEOUT / SANKHYA_HTTP_READ_TIMEOUT).
+
+get/post repetem falhas transitórias (erro de conexão, timeout, 5xx) com backoff
+exponencial e jitter, até SANKHYA_HTTP_RETRIES novas tentativas e dentro de
+SANKHYA_HTTP_RETRY_BUDGET segundos no total. Cada tentativa é logada com a latência.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from clients.sankhya.constants import (
+    RETRY_STATUSES,
+    SANKHYA_HTTP_BACKOFF,
+    SANKHYA_HTTP_BACKOFF_MAX,
+    SANKHYA_HTTP_CONNECT_TIMEOUT,
+    SANKHYA_HTTP_MIN_READ_TIMEOUT,
+    SANKHYA_HTTP_POOL_SIZE,
+    SANKHYA_HTTP_READ_TIMEOUT,
+    SANKHYA_HTTP_RETRIES,
+    SANKHYA_HTTP_RETRY_BUDGET,
+)
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_session = None
+_session_pid = None
+
+
+def get_timeout() -> tuple:
+    """(connect, read) em segundos, para o parâmetro timeout do requests."""
+    return (
+        getattr(settings, "SANKHYA_HTTP_CONNECT_TIMEOUT", SANKHYA_HTTP_CONNECT_TIMEOUT),
+        getattr(settings, "SANKHYA_HTTP_READ_TIMEOUT", SANKHYA_HTTP_READ_TIMEOUT),
+    )
+
+
+def build_session(pool_size: int) -> requests.Session:
+    """Session com pool de até pool_size conexões keep-alive por host."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=False)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Sessão compartilhada do processo (criada na primeira chamada). Recriada
+    após fork (ex.: workers do Gunicorn) para não dividir sockets entre processos.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _lock:
+            if _session is None or _session_pid != pid:
+                pool_size = getattr(
+                    settings, "SANKHYA_HTTP_POOL_SIZE", SANKHYA_HTTP_POOL_SIZE
+                )
+                _session = build_session(pool_size)
+                _session_pid = pid
+    return _session
+
+
+def reset_session() -> None:
+    """Fecha a sessão compartilhada (a próxima chamada cria outra)."""
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def backoff_delay(attempt: int) -> float:
+    """Espera antes da tentativa attempt + 1: exponencial com teto e jitter total."""
+    base = _setting("SANKHYA_HTTP_BACKOFF", SANKHYA_HTTP_BACKOFF)
+    ceiling = _setting("SANKHYA_HTTP_BACKOFF_MAX", SANKHYA_HTTP_BACKOFF_MAX)
+    return random.uniform(0, min(ceiling, base * 2 ** (attempt - 1)))
+
+
+def _attempt(method: str, url: str, deadline: float, **kwargs):
+    """Uma tentativa; (response, None) ou (None, erro transitório). Leitura limitada ao orçamento."""
+    connect, read = get_timeout()
+    remaining = deadline - time.monotonic()
+    timeout = (connect, max(min(read, remaining), SANKHYA_HTTP_MIN_READ_TIMEOUT))
+    try:
+        return getattr(get_session(), method)(url, timeout=timeout, **kwargs), None
+    except (requests.ConnectionError, requests.Timeout) as e:
+        return None, e
+
+
+def _log_attempt(level, method, url, attempt, outcome, elapsed_ms, delay=None):
+    message = "Sankhya %s %s tentativa %s: %s em %.0f ms"
+    args = [method.upper(), url, attempt, outcome, elapsed_ms]
+    if delay is not None:
+        message += "; nova tentativa em %.0f ms"
+        args.append(delay * 1000)
+    logger.log(level, message, *args)
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """
+    Requisição pela sessão compartilhada com retry de falhas transitórias.
+    Devolve a última resposta (inclusive 5xx esgotadas as tentativas) ou levanta o
+    último erro de conexão/timeout. Demais RequestException sobem na hora.
+    """
+    retries = _setting("SANKHYA_HTTP_RETRIES", SANKHYA_HTTP_RETRIES)
+    deadline = time.monotonic() + _setting(
+        "SANKHYA_HTTP_RETRY_BUDGET", SANKHYA_HTTP_RETRY_BUDGET
+    )
+    attempt = 0
+    while True:
+        attempt += 1
+        started = time.monotonic()
+        response, error = _attempt(method, url, deadline, **kwargs)
+        elapsed_ms = (time.monotonic() - started) * 1000
+        outcome = response.status_code if response is not None else type(error).__name__
+        transient = response is None or response.status_code in RETRY_STATUSES
+
+        delay = backoff_delay(attempt)
+        if transient and attempt <= retries and time.monotonic() + delay < deadline:
+            _log_attempt(
+                logging.WARNING, method, url, attempt, outcome, elapsed_ms, delay
+            )
+            time.sleep(delay)
+            continue
+
+        # Última tentativa: falha definitiva em WARNING, sucesso após retry em INFO.
+        level = (
+            logging.WARNING
+            if transient
+            else logging.INFO if attempt > 1 else logging.DEBUG
+        )
+        _log_attempt(level, method, url, attempt, outcome, elapsed_ms)
+        if response is None:
+            raise error
+        return response
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("get", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("post", url, **kwargs)
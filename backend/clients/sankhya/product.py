@@ -1,12 +1,20 @@
-"""Cliente Sankhya V1: GET /v1/produtos/{codigoProduto}. Requer bearerToken em Authorization."""
+"""Cliente Sankhya V1: GET /v1/produtos/{codigoProduto} e listagem paginada GET /v1/produtos. Requer bearerToken."""
 
 import logging
 
 import requests
 from django.conf import settings
 
-from clients.sankhya.constants import PRODUTOS_PATH, SANKHYA_HTTP_TIMEOUT
-from clients.sankhya.exceptions import SankhyaProductError
+from clients.sankhya import http
+from clients.sankhya.auth import get_valid_token, refresh_token_if_needed
+from clients.sankhya.constants import (
+    PRODUCT_NOT_FOUND_MESSAGE,
+    PRODUTOS_PATH,
+    RESPONSE_HAS_MORE_KEY,
+    RESPONSE_PAGINATION_KEY,
+    RESPONSE_PRODUCTS_KEY,
+)
+from clients.sankhya.exceptions import SankhyaProductError, SankhyaProductNotFoundError
 
 logger = logging.getLogger(__name__)
 
@@ -23,30 +31,26 @@ def _build_product_headers(bearer_token: str) -> dict:
     }
 
 
-def get_product(codigo_produto: int, bearer_token: str) -> dict:
-    """Busca produto por código na API V1. Retorna dict da API. Raises SankhyaProductError em falha."""
-    base = _base_url()
-    if not base:
-        logger.error("SANKHYA_API_BASE_URL não configurado.")
-        raise SankhyaProductError("SANKHYA_API_BASE_URL não configurado.")
-
-    url = f"{base}{PRODUTOS_PATH}/{codigo_produto}"
-    headers = _build_product_headers(bearer_token)
+def _request_product(url: str, codigo_produto, bearer_token: str, params=None):
+    """GET com retry de falhas transitórias (clients.sankhya.http)."""
     try:
-        response = requests.get(url, headers=headers, timeout=SANKHYA_HTTP_TIMEOUT)
+        return http.get(url, headers=_build_product_headers(bearer_token), params=params)
     except requests.RequestException as e:
         logger.exception("Erro de rede ao buscar produto %s: %s", codigo_produto, e)
         raise SankhyaProductError("Erro de rede ao buscar produto.") from e
 
-    if response.status_code == 404:
-        logger.debug("Produto %s não encontrado.", codigo_produto)
-        raise SankhyaProductError("Produto não encontrado.")
-    if response.status_code != 200:
-        logger.warning(
-            "Sankhya produtos retornou status %s para codigo=%s", response.status_code, codigo_produto
-        )
-        raise SankhyaProductError(f"Sankhya produtos retornou status {response.status_code}.")
 
+def _authorized_get(url: str, codigo_produto, bearer_token: str = None, params=None):
+    """GET com token; em 401/403 renova o token e repete uma vez."""
+    bearer_token = bearer_token or get_valid_token()
+    response = _request_product(url, codigo_produto, bearer_token, params)
+    if refresh_token_if_needed(response.status_code, bearer_token):
+        logger.info("Repetindo busca do produto %s com token renovado.", codigo_produto)
+        response = _request_product(url, codigo_produto, get_valid_token(), params)
+    return response
+
+
+def _json_dict(response, codigo_produto) -> dict:
     try:
         data = response.json()
     except ValueError:
@@ -57,3 +61,52 @@ def get_product(codigo_produto: int, bearer_token: str) -> dict:
     if not isinstance(data, dict):
         raise SankhyaProductError("Resposta inválida do Sankhya produtos.")
     return data
+
+
+def get_product(codigo_produto: int, bearer_token: str = None) -> dict:
+    """
+    Busca produto por código na API V1. Retorna dict da API. Raises SankhyaProductError em falha.
+    Sem bearer_token usa get_valid_token(). Em 401/403 renova o token e repete uma vez.
+    """
+    base = _base_url()
+    if not base:
+        logger.error("SANKHYA_API_BASE_URL não configurado.")
+        raise SankhyaProductError("SANKHYA_API_BASE_URL não configurado.")
+
+    url = f"{base}{PRODUTOS_PATH}/{codigo_produto}"
+    response = _authorized_get(url, codigo_produto, bearer_token)
+
+    if response.status_code == 404:
+        logger.debug("Produto %s não encontrado.", codigo_produto)
+        raise SankhyaProductNotFoundError(PRODUCT_NOT_FOUND_MESSAGE)
+    if response.status_code != 200:
+        logger.warning(
+            "Sankhya produtos retornou status %s para codigo=%s", response.status_code, codigo_produto
+        )
+        raise SankhyaProductError(f"Sankhya produtos retornou status {response.status_code}.")
+    return _json_dict(response, codigo_produto)
+
+
+def list_products(page: int, bearer_token: str = None) -> tuple:
+    """
+    Página do catálogo (GET /v1/produtos?page=N). Retorna (lista de produtos, há mais
+    páginas). Raises SankhyaProductError em falha.
+    """
+    base = _base_url()
+    if not base:
+        logger.error("SANKHYA_API_BASE_URL não configurado.")
+        raise SankhyaProductError("SANKHYA_API_BASE_URL não configurado.")
+
+    label = f"página {page}"
+    response = _authorized_get(f"{base}{PRODUTOS_PATH}", label, bearer_token, params={"page": page})
+    if response.status_code != 200:
+        logger.warning("Sankhya produtos retornou status %s para %s", response.status_code, label)
+        raise SankhyaProductError(f"Sankhya produtos retornou status {response.status_code}.")
+
+    data = _json_dict(response, label)
+    items = data.get(RESPONSE_PRODUCTS_KEY)
+    if not isinstance(items, list):
+        raise SankhyaProductError("Resposta inválida do Sankhya produtos (sem lista de produtos).")
+    # A API devolve os valores da paginação como texto ("true"/"false")
+    has_more = (data.get(RESPONSE_PAGINATION_KEY) or {}).get(RESPONSE_HAS_MORE_KEY)
+    return items, str(has_more).lower() == "true"
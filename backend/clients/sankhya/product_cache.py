@@ -0,0 +1,251 @@
+"""
+Cache de produtos Sankhya na frente de get_product.
+
+Cada código tem uma entrada {"data", "missing", "fetched_at"} no cache do Django:
+- fresca (idade < SANKHYA_PRODUCT_CACHE_TTL): servida direto, sem token nem ERP;
+- velha (até TTL + SANKHYA_PRODUCT_STALE_TTL): servida como está e uma única
+  renovação roda em segundo plano (trava por código com cache.add), em um pool
+  pequeno por processo com fila limitada; com a fila cheia a renovação é
+  descartada e a próxima requisição tenta de novo;
+- ausente/expirada: busca no ERP na requisição.
+404 vira entrada negativa curta (SANKHYA_PRODUCT_NEGATIVE_TTL). Outros erros não
+são cacheados. Contadores de hit/miss/stale/negative ficam no próprio cache.
+
+get_cached_products resolve uma lista: hits lidos com um único get_many e
+misses buscados em paralelo (pool limitado a SANKHYA_BATCH_WORKERS), com um
+único token para todo o lote.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+
+from clients.sankhya.auth import get_valid_token
+from clients.sankhya.constants import (
+    BATCH_WORKERS,
+    PRODUCT_CACHE_PREFIX,
+    PRODUCT_CACHE_STATS,
+    PRODUCT_NOT_FOUND_MESSAGE,
+    PRODUCT_REFRESH_LOCK_SECONDS,
+    PRODUCT_REFRESH_MAX_PENDING,
+    PRODUCT_REFRESH_WORKERS,
+)
+from clients.sankhya.exceptions import (
+    SankhyaAuthError,
+    SankhyaProductError,
+    SankhyaProductNotFoundError,
+)
+from clients.sankhya.product import get_product
+
+logger = logging.getLogger(__name__)
+
+# Código sem entrada utilizável no cache (buscar no ERP)
+_MISS = object()
+
+
+def _ttl():
+    return getattr(settings, "SANKHYA_PRODUCT_CACHE_TTL", 0)
+
+
+def _stale_ttl():
+    return getattr(settings, "SANKHYA_PRODUCT_STALE_TTL", 0)
+
+
+def _negative_ttl():
+    return getattr(settings, "SANKHYA_PRODUCT_NEGATIVE_TTL", 0)
+
+
+def _key(codigo_produto) -> str:
+    return f"{PRODUCT_CACHE_PREFIX}:{codigo_produto}"
+
+
+def _stat_key(name: str) -> str:
+    return f"{PRODUCT_CACHE_PREFIX}:stats:{name}"
+
+
+def _count(name: str) -> None:
+    key = _stat_key(name)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Chave removida entre o add e o incr (ex.: reset_product_cache_stats).
+        cache.add(key, 1, timeout=None)
+
+
+def product_cache_stats() -> dict:
+    """Contadores do cache de produtos (compartilhados entre processos se o cache for Redis)."""
+    values = cache.get_many([_stat_key(name) for name in PRODUCT_CACHE_STATS])
+    return {name: values.get(_stat_key(name), 0) for name in PRODUCT_CACHE_STATS}
+
+
+def reset_product_cache_stats() -> None:
+    cache.delete_many([_stat_key(name) for name in PRODUCT_CACHE_STATS])
+
+
+def invalidate_product(codigo_produto) -> None:
+    cache.delete(_key(codigo_produto))
+
+
+def _store(codigo_produto, data, missing=False) -> None:
+    """Grava a entrada; a positiva fica no cache por TTL + janela de stale."""
+    if missing:
+        timeout = _negative_ttl()
+    else:
+        timeout = _ttl() + _stale_ttl()
+    if timeout <= 0:
+        return
+    entry = {"data": data, "missing": missing, "fetched_at": time.time()}
+    cache.set(_key(codigo_produto), entry, timeout=timeout)
+
+
+def _fetch(codigo_produto, bearer_token=None) -> dict:
+    """Busca no ERP e atualiza o cache (404 vira entrada negativa)."""
+    try:
+        data = get_product(codigo_produto, bearer_token or get_valid_token())
+    except SankhyaProductNotFoundError:
+        _store(codigo_produto, None, missing=True)
+        raise
+    _store(codigo_produto, data)
+    return data
+
+
+def _refresh(codigo_produto, lock_key: str) -> None:
+    try:
+        _fetch(codigo_produto)
+    except (SankhyaAuthError, SankhyaProductError):
+        # Mantém a entrada velha até expirar; a próxima requisição tenta de novo.
+        logger.warning("Falha ao renovar produto %s em segundo plano.", codigo_produto)
+    finally:
+        cache.delete(lock_key)
+
+
+class RefreshPool:
+    """Pool de threads por processo com no máximo `max_pending` tarefas pendentes."""
+
+    def __init__(
+        self, workers=PRODUCT_REFRESH_WORKERS, max_pending=PRODUCT_REFRESH_MAX_PENDING
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+        self._pid = None
+
+    def submit(self, fn, *args) -> bool:
+        """Agenda fn(*args); retorna False (sem agendar) se o limite foi atingido."""
+        executor, slots = self._ensure_started()
+        if not slots.acquire(blocking=False):
+            return False
+        future = executor.submit(fn, *args)
+        future.add_done_callback(lambda _: slots.release())
+        return True
+
+    def _ensure_started(self):
+        # Após fork (ex.: workers do gunicorn) as threads do pai não existem.
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._slots = threading.BoundedSemaphore(self.max_pending)
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="sankhya-refresh"
+                )
+            return self._executor, self._slots
+
+
+_refresh_pool = RefreshPool()
+
+
+def _start_refresh(codigo_produto) -> None:
+    """Agenda uma renovação em segundo plano, se nenhuma outra estiver rodando."""
+    lock_key = f"{_key(codigo_produto)}:refresh"
+    if not cache.add(lock_key, 1, timeout=PRODUCT_REFRESH_LOCK_SECONDS):
+        return
+    if not _refresh_pool.submit(_refresh, codigo_produto, lock_key):
+        cache.delete(lock_key)
+        logger.debug("Fila de renovação cheia; produto %s segue velho.", codigo_produto)
+
+
+def _serve(codigo_produto, entry):
+    """
+    Valor da entrada do cache, contando hit/stale/negative/miss: dict do produto,
+    SankhyaProductError (404 cacheado) ou _MISS. Entrada velha dispara renovação.
+    """
+    if entry is None:
+        _count("misses")
+        return _MISS
+    if entry["missing"]:
+        _count("negative_hits")
+        return SankhyaProductNotFoundError(PRODUCT_NOT_FOUND_MESSAGE)
+
+    if time.time() - entry["fetched_at"] < _ttl():
+        _count("hits")
+    else:
+        _count("stale_hits")
+        _start_refresh(codigo_produto)
+    return entry["data"]
+
+
+def get_cached_product(codigo_produto) -> dict:
+    """
+    Produto pelo código, passando pelo cache. Mesmo contrato de get_product
+    (dict da API; SankhyaProductError/SankhyaAuthError em falha), mas o token só
+    é pedido quando é preciso ir ao ERP.
+    """
+    if _ttl() <= 0:
+        return get_product(codigo_produto, get_valid_token())
+
+    value = _serve(codigo_produto, cache.get(_key(codigo_produto)))
+    if value is _MISS:
+        return _fetch(codigo_produto)
+    if isinstance(value, Exception):
+        raise value
+    return value
+
+
+def _fetch_outcome(codigo_produto, bearer_token):
+    try:
+        return _fetch(codigo_produto, bearer_token)
+    except (SankhyaAuthError, SankhyaProductError) as e:
+        return e
+
+
+def _workers():
+    return getattr(settings, "SANKHYA_BATCH_WORKERS", BATCH_WORKERS)
+
+
+def get_cached_products(codes) -> dict:
+    """
+    Vários produtos de uma vez: {codigo: dict do produto ou exceção Sankhya}.
+    Uma falha não interrompe os demais códigos. Códigos repetidos devem ser
+    removidos antes (ver ProductBatchView).
+    """
+    results = {}
+    misses = list(codes)
+    if _ttl() > 0:
+        entries = cache.get_many([_key(code) for code in codes])
+        misses = []
+        for code in codes:
+            value = _serve(code, entries.get(_key(code)))
+            if value is _MISS:
+                misses.append(code)
+            else:
+                results[code] = value
+    if not misses:
+        return results
+
+    try:
+        bearer_token = get_valid_token()
+    except SankhyaAuthError as e:
+        results.update((code, e) for code in misses)
+        return results
+    with ThreadPoolExecutor(max_workers=min(_workers(), len(misses))) as pool:
+        outcomes = pool.map(lambda code: _fetch_outcome(code, bearer_token), misses)
+        results.update(zip(misses, outcomes))
+    return results
@@ -0,0 +1,142 @@
+"""
+Servidor HTTP local que imita o Sankhya (POST /login, GET /v1/produtos/{codigo} e
+a listagem paginada GET /v1/produtos?page=N, com catalogue_size produtos).
+
+Usado pelo comando benchmark_sankhya_http e pelos testes do client. Responde em
+HTTP/1.1 com keep-alive, conta as conexões TCP aceitas e pode simular o custo de
+abrir conexão (handshake_delay, aplicado uma vez por conexão) e o tempo de
+resposta do ERP (response_delay, por requisição).
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from clients.sankhya.constants import (
+    LOGIN_PATH,
+    PRODUCT_ACTIVE_KEY,
+    PRODUCT_CODE_KEY,
+    PRODUCT_NAME_KEY,
+    PRODUTOS_FIRST_PAGE,
+    PRODUTOS_PATH,
+    RESPONSE_BEARER_KEY,
+    RESPONSE_HAS_MORE_KEY,
+    RESPONSE_PAGINATION_KEY,
+    RESPONSE_PRODUCTS_KEY,
+)
+
+_PRODUCT_PATH = re.compile(rf"^{PRODUTOS_PATH}/(\w+)$")
+CATALOGUE_PAGE_SIZE = 50
+
+
+def stub_product(code):
+    return {
+        PRODUCT_CODE_KEY: code,
+        PRODUCT_NAME_KEY: f"Produto {code}",
+        PRODUCT_ACTIVE_KEY: "S",
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Cabeçalho e corpo saem em writes separados; com keep-alive, Nagle + ACK
+    # atrasado do cliente segurariam cada resposta por ~40 ms.
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.count_connection()
+        if self.server.handshake_delay:
+            time.sleep(self.server.handshake_delay)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.server.count_request()
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        if self.path != LOGIN_PATH:
+            return self._reply(404, {"error": "not found"})
+        self._reply(200, {RESPONSE_BEARER_KEY: "stub-bearer", "error": None})
+
+    def do_GET(self):
+        self.server.count_request()
+        if self.server.response_delay:
+            time.sleep(self.server.response_delay)
+        url = urlsplit(self.path)
+        if url.path == PRODUTOS_PATH:
+            return self._reply_page(
+                int(parse_qs(url.query).get("page", [PRODUTOS_FIRST_PAGE])[0])
+            )
+        match = _PRODUCT_PATH.match(url.path)
+        if not match:
+            return self._reply(404, {"error": "not found"})
+        self._reply(200, stub_product(match.group(1)))
+
+    def _reply_page(self, page):
+        start = (page - PRODUTOS_FIRST_PAGE) * CATALOGUE_PAGE_SIZE + 1
+        end = min(start + CATALOGUE_PAGE_SIZE, self.server.catalogue_size + 1)
+        has_more = end <= self.server.catalogue_size
+        self._reply(
+            200,
+            {
+                RESPONSE_PRODUCTS_KEY: [
+                    stub_product(code) for code in range(start, end)
+                ],
+                RESPONSE_PAGINATION_KEY: {
+                    "page": str(page),
+                    RESPONSE_HAS_MORE_KEY: str(has_more).lower(),
+                },
+            },
+        )
+
+
+class StubSankhyaServer(ThreadingHTTPServer):
+    """Servidor em thread própria; use como context manager e leia base_url."""
+
+    daemon_threads = True
+
+    def __init__(self, handshake_delay=0.0, response_delay=0.0, catalogue_size=0):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.handshake_delay = handshake_delay
+        self.response_delay = response_delay
+        self.catalogue_size = catalogue_size
+        self.connections = 0
+        self.requests = 0
+        self._counter_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count_connection(self):
+        with self._counter_lock:
+            self.connections += 1
+
+    def count_request(self):
+        with self._counter_lock:
+            self.requests += 1
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
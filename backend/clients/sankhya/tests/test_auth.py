@@ -1,11 +1,24 @@
 """Testes do módulo auth do client Sankhya."""
 
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
 
 import pytest
 from django.conf import settings
-
-from clients.sankhya.auth import get_valid_token, login, refresh_token_if_needed
+from django.core.cache import cache
+
+from clients.sankhya.auth import (
+    TOKEN_CACHE_KEY,
+    TOKEN_FRESH_KEY,
+    TOKEN_LOCK_KEY,
+    get_valid_token,
+    login,
+    refresh_if_due,
+    refresh_token_if_needed,
+    start_token_refresher,
+)
+from clients.sankhya.constants import BEARER_CACHE_TIMEOUT_SECONDS
 from clients.sankhya.exceptions import SankhyaAuthError
 
 
@@ -27,7 +40,7 @@ class TestLogin:
             login()
         assert "Credenciais Sankhya incompletas" in str(exc.value)
 
-    @patch("clients.sankhya.auth.requests.post")
+    @patch("clients.sankhya.http.requests.Session.post")
     def test_login_returns_bearer_on_200(self, mock_post):
         """Retorna bearerToken quando resposta 200 com bearerToken."""
         mock_post.return_value.status_code = 200
@@ -40,7 +53,7 @@ class TestLogin:
                         with patch.object(settings, "SANKHYA_PASSWORD", "service_pass"):
                             assert login() == "abc123_service"
 
-    @patch("clients.sankhya.auth.requests.post")
+    @patch("clients.sankhya.http.requests.Session.post")
     def test_login_raises_on_non_200(self, mock_post):
         """Raises SankhyaAuthError quando status != 200."""
         mock_post.return_value.status_code = 401
@@ -76,7 +89,9 @@ class TestGetValidToken:
         
         assert get_valid_token() == "new_bearer_service"
         mock_login.assert_called_once()
-        mock_cache.set.assert_called_once()
+        mock_cache.set.assert_any_call(
+            TOKEN_CACHE_KEY, "new_bearer_service", timeout=BEARER_CACHE_TIMEOUT_SECONDS
+        )
 
     @patch("clients.sankhya.auth.cache")
     @patch("clients.sankhya.auth.login")
@@ -110,3 +125,90 @@ class TestRefreshTokenIfNeeded:
         """Retorna False e não mexe no cache para status 200."""
         assert refresh_token_if_needed(200) is False
         mock_cache.delete.assert_not_called()
+
+
+@pytest.fixture
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.usefixtures("clear_cache")
+class TestSingleFlightToken:
+    """Renovação em voo único e antecipada (cache real)."""
+
+    @patch("clients.sankhya.auth.login")
+    def test_concurrent_misses_log_in_once(self, mock_login):
+        """Requisições simultâneas sem token: um login, todas recebem o mesmo token."""
+        def slow_login():
+            time.sleep(0.2)
+            return "bearer_unico"
+
+        mock_login.side_effect = slow_login
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            tokens = list(pool.map(lambda _: get_valid_token(), range(8)))
+
+        assert tokens == ["bearer_unico"] * 8
+        mock_login.assert_called_once()
+
+    @patch("clients.sankhya.auth.login", return_value="bearer_novo")
+    def test_expiring_token_is_served_without_login(self, mock_login):
+        """Na requisição, token perto de expirar é servido; quem renova é o refresher."""
+        cache.set(TOKEN_CACHE_KEY, "bearer_atual")
+        with patch("clients.sankhya.auth.threading.Thread") as mock_thread:
+            assert get_valid_token() == "bearer_atual"
+        mock_thread.assert_not_called()
+        mock_login.assert_not_called()
+
+    @patch("clients.sankhya.auth.login", return_value="bearer_novo")
+    def test_refresh_if_due_renews_expiring_token(self, mock_login):
+        """Sem a marca de fresco, renova; com ela (ou com a trava de outro), não faz nada."""
+        cache.set(TOKEN_CACHE_KEY, "bearer_atual")
+
+        assert refresh_if_due() is True
+        assert cache.get(TOKEN_CACHE_KEY) == "bearer_novo"
+        assert cache.get(TOKEN_FRESH_KEY)
+        assert cache.get(TOKEN_LOCK_KEY) is None
+
+        assert refresh_if_due() is False
+        cache.delete(TOKEN_FRESH_KEY)
+        cache.set(TOKEN_LOCK_KEY, 1)
+        assert refresh_if_due() is False
+        mock_login.assert_called_once()
+
+    @patch("clients.sankhya.auth.login", side_effect=SankhyaAuthError("falhou"))
+    def test_refresh_failure_keeps_current_token(self, mock_login):
+        cache.set(TOKEN_CACHE_KEY, "bearer_atual")
+
+        assert refresh_if_due() is False
+        assert cache.get(TOKEN_CACHE_KEY) == "bearer_atual"
+        assert cache.get(TOKEN_LOCK_KEY) is None
+
+    def test_refresher_starts_once_per_process(self, monkeypatch):
+        monkeypatch.setattr("clients.sankhya.auth._refresher_started", False)
+        with patch("clients.sankhya.auth.threading.Thread") as mock_thread:
+            assert start_token_refresher() is True
+            assert start_token_refresher() is False
+        mock_thread.assert_called_once()
+        assert mock_thread.call_args.kwargs["daemon"] is True
+
+    def test_app_ready_starts_refresher_when_enabled(self, settings):
+        from django.apps import apps
+
+        config = apps.get_app_config("sankhya")
+        with patch("clients.sankhya.auth.start_token_refresher") as mock_start:
+            config.ready()
+            mock_start.assert_not_called()
+            settings.SANKHYA_TOKEN_REFRESHER = True
+            config.ready()
+        mock_start.assert_called_once_with()
+
+    def test_stale_rejection_keeps_renewed_token(self):
+        """401 de um token já substituído não apaga o token novo."""
+        cache.set(TOKEN_CACHE_KEY, "bearer_novo")
+        assert refresh_token_if_needed(401, "bearer_antigo") is True
+        assert cache.get(TOKEN_CACHE_KEY) == "bearer_novo"
+
+        assert refresh_token_if_needed(401, "bearer_novo") is True
+        assert cache.get(TOKEN_CACHE_KEY) is None
@@ -0,0 +1,60 @@
+"""Testes da sessão HTTP compartilhada (clients.sankhya.http)."""
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from django.conf import settings
+
+from clients.sankhya.http import get_session, get_timeout, reset_session
+from clients.sankhya.product import get_product
+from clients.sankhya.stub_server import StubSankhyaServer
+
+
+@pytest.fixture(autouse=True)
+def fresh_session():
+    reset_session()
+    yield
+    reset_session()
+
+
+class TestSession:
+    """get_session / get_timeout."""
+
+    def test_same_session_across_threads(self):
+        """Uma única sessão por processo, mesmo com chamadas concorrentes."""
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            sessions = set(map(id, pool.map(lambda _: get_session(), range(32))))
+        assert len(sessions) == 1
+
+    def test_pool_size_from_settings(self):
+        """Tamanho do pool vem de SANKHYA_HTTP_POOL_SIZE."""
+        with patch.object(settings, "SANKHYA_HTTP_POOL_SIZE", 4):
+            adapter = get_session().get_adapter("https://api.sankhya.com.br")
+        assert adapter._pool_maxsize == 4
+
+    def test_new_session_after_fork(self):
+        """Processo filho (pid diferente) não reaproveita a sessão do pai."""
+        parent = get_session()
+        with patch("clients.sankhya.http.os.getpid", return_value=-1):
+            assert get_session() is not parent
+
+    def test_timeout_is_connect_and_read(self):
+        """Timeout é a tupla (connect, read) do settings."""
+        with patch.object(settings, "SANKHYA_HTTP_CONNECT_TIMEOUT", 2):
+            with patch.object(settings, "SANKHYA_HTTP_READ_TIMEOUT", 15):
+                assert get_timeout() == (2, 15)
+
+
+class TestKeepAlive:
+    """Reaproveitamento de conexões contra o servidor local simulado."""
+
+    def test_sequential_lookups_reuse_one_connection(self):
+        """Várias consultas seguidas usam uma única conexão TCP."""
+        with StubSankhyaServer() as server:
+            with patch.object(settings, "SANKHYA_API_BASE_URL", server.base_url):
+                for code in range(1, 6):
+                    assert get_product(code, "bearer")["codigoProduto"] == str(code)
+            reset_session()
+        assert server.requests == 5
+        assert server.connections == 1
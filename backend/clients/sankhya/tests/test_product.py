@@ -1,12 +1,27 @@
 """Testes do módulo product do client Sankhya."""
 
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
+import requests
 from django.conf import settings
 
-from clients.sankhya.exceptions import SankhyaProductError
-from clients.sankhya.product import get_product
+from clients.sankhya.exceptions import SankhyaProductError, SankhyaProductNotFoundError
+from clients.sankhya.product import get_product, list_products
+
+
+@pytest.fixture(autouse=True)
+def sleeps(monkeypatch):
+    """Backoff do retry sem esperar de verdade; devolve as esperas pedidas."""
+    calls = []
+    monkeypatch.setattr("clients.sankhya.http.time.sleep", calls.append)
+    return calls
+
+
+def _response(status_code, payload=None):
+    response = MagicMock(status_code=status_code)
+    response.json.return_value = payload
+    return response
 
 
 class TestGetProduct:
@@ -18,7 +33,7 @@ class TestGetProduct:
             with pytest.raises(SankhyaProductError):
                 get_product(123, "bearer")
 
-    @patch("clients.sankhya.product.requests.get")
+    @patch("clients.sankhya.http.requests.Session.get")
     def test_returns_dict_on_200(self, mock_get):
         """Retorna dict da API quando status 200."""
         mock_get.return_value.status_code = 200
@@ -33,7 +48,7 @@ class TestGetProduct:
         call_kw = mock_get.call_args[1]
         assert call_kw["headers"]["Authorization"] == "Bearer bearer"
 
-    @patch("clients.sankhya.product.requests.get")
+    @patch("clients.sankhya.http.requests.Session.get")
     def test_raises_on_404(self, mock_get):
         """Raises SankhyaProductError quando status 404."""
         mock_get.return_value.status_code = 404
@@ -41,7 +56,7 @@ class TestGetProduct:
             with pytest.raises(SankhyaProductError):
                 get_product(999, "bearer")
 
-    @patch("clients.sankhya.product.requests.get")
+    @patch("clients.sankhya.http.requests.Session.get")
     def test_raises_on_500(self, mock_get):
         """Raises SankhyaProductError quando status 500."""
         mock_get.return_value.status_code = 500
@@ -49,7 +64,7 @@ class TestGetProduct:
             with pytest.raises(SankhyaProductError):
                 get_product(123, "bearer")
 
-    @patch("clients.sankhya.product.requests.get")
+    @patch("clients.sankhya.http.requests.Session.get")
     def test_raises_on_request_exception(self, mock_get):
         """Raises SankhyaProductError em caso de RequestException."""
         import requests
@@ -59,7 +74,7 @@ class TestGetProduct:
             with pytest.raises(SankhyaProductError):
                 get_product(123, "bearer")
 
-    @patch("clients.sankhya.product.requests.get")
+    @patch("clients.sankhya.http.requests.Session.get")
     def test_raises_on_non_json_response(self, mock_get):
         """Raises SankhyaProductError quando resposta não é JSON."""
         mock_get.return_value.status_code = 200
@@ -68,3 +83,111 @@ class TestGetProduct:
         with patch.object(settings, "SANKHYA_API_BASE_URL", "https://api.sankhya.com.br"):
             with pytest.raises(SankhyaProductError):
                 get_product(123, "bearer")
+
+
+@patch.object(settings, "SANKHYA_API_BASE_URL", "https://api.sankhya.com.br")
+class TestGetProductResilience:
+    """Renovação de token em 401/403 e retry de falhas transitórias."""
+
+    @patch("clients.sankhya.product.get_valid_token")
+    @patch("clients.sankhya.product.refresh_token_if_needed", return_value=True)
+    @patch("clients.sankhya.http.requests.Session.get")
+    def test_replays_once_with_new_token_on_401(self, mock_get, mock_refresh, mock_token):
+        """401 invalida o token, renova e repete a chamada uma vez."""
+        mock_get.side_effect = [_response(401), _response(200, {"codigoProduto": 123})]
+        mock_token.return_value = "novo"
+
+        assert get_product(123, "expirado") == {"codigoProduto": 123}
+        mock_refresh.assert_called_once_with(401, "expirado")
+        mock_token.assert_called_once_with()
+        assert mock_get.call_args[1]["headers"]["Authorization"] == "Bearer novo"
+
+    @patch("clients.sankhya.product.get_valid_token", return_value="novo")
+    @patch("clients.sankhya.http.requests.Session.get")
+    def test_second_401_is_not_replayed(self, mock_get, mock_token):
+        """Token renovado também recusado: erro, sem laço de renovação."""
+        mock_get.return_value = _response(403)
+        with pytest.raises(SankhyaProductError, match="status 403"):
+            get_product(123, "expirado")
+        assert mock_get.call_count == 2
+
+    @patch("clients.sankhya.product.get_valid_token", return_value="bearer")
+    @patch("clients.sankhya.http.requests.Session.get")
+    def test_uses_valid_token_when_none_given(self, mock_get, mock_token):
+        """Sem token explícito, busca o token válido do cache."""
+        mock_get.return_value = _response(200, {"codigoProduto": 123})
+        get_product(123)
+        mock_token.assert_called_once_with()
+
+    @patch("clients.sankhya.http.requests.Session.get")
+    def test_retries_transient_errors_with_backoff(self, mock_get, sleeps, caplog):
+        """503 e erro de conexão são repetidos com espera crescente até dar certo."""
+        caplog.set_level("INFO", logger="clients.sankhya.http")
+        mock_get.side_effect = [
+            _response(503),
+            requests.ConnectionError("reset"),
+            _response(200, {"codigoProduto": 123}),
+        ]
+        with patch.object(settings, "SANKHYA_HTTP_BACKOFF", 0.2):
+            assert get_product(123, "bearer") == {"codigoProduto": 123}
+        assert mock_get.call_count == 3
+        assert len(sleeps) == 2
+        assert 0 <= sleeps[0] <= 0.2 and 0 <= sleeps[1] <= 0.4
+        attempts = [r.getMessage() for r in caplog.records]
+        assert "tentativa 1: 503 em" in attempts[0]
+        assert "tentativa 2: ConnectionError em" in attempts[1]
+        assert "tentativa 3: 200 em" in attempts[2]
+
+    @patch("clients.sankhya.http.requests.Session.get")
+    def test_gives_up_after_retries(self, mock_get, sleeps):
+        """Esgotadas as tentativas, 5xx vira SankhyaProductError (502)."""
+        mock_get.return_value = _response(502)
+        with patch.object(settings, "SANKHYA_HTTP_RETRIES", 2):
+            with pytest.raises(SankhyaProductError, match="status 502"):
+                get_product(123, "bearer")
+        assert mock_get.call_count == 3
+
+    @patch("clients.sankhya.http.requests.Session.get")
+    def test_respects_total_budget(self, mock_get, sleeps):
+        """Não inicia nova tentativa se a espera estouraria o orçamento."""
+        mock_get.side_effect = requests.Timeout("read timeout")
+        with patch.object(settings, "SANKHYA_HTTP_RETRY_BUDGET", 0):
+            with pytest.raises(SankhyaProductError, match="Erro de rede"):
+                get_product(123, "bearer")
+        assert mock_get.call_count == 1
+        assert sleeps == []
+
+    @patch("clients.sankhya.http.requests.Session.get")
+    def test_not_found_is_not_retried(self, mock_get, sleeps):
+        """404 é resposta definitiva."""
+        mock_get.return_value = _response(404)
+        with pytest.raises(SankhyaProductNotFoundError):
+            get_product(123, "bearer")
+        assert mock_get.call_count == 1
+
+
+@patch.object(settings, "SANKHYA_API_BASE_URL", "https://api.sankhya.com.br")
+class TestListProducts:
+    """GET /v1/produtos?page=N (catálogo paginado)."""
+
+    @patch("clients.sankhya.http.requests.Session.get")
+    def test_returns_items_and_has_more(self, mock_get):
+        """Lista da página e hasMore (texto "true"/"false") como bool."""
+        mock_get.return_value = _response(
+            200,
+            {"produtos": [{"codigoProduto": 1}], "pagination": {"hasMore": "true"}},
+        )
+        assert list_products(1, "bearer") == ([{"codigoProduto": 1}], True)
+        assert mock_get.call_args[1]["params"] == {"page": 1}
+
+        mock_get.return_value = _response(
+            200, {"produtos": [], "pagination": {"hasMore": "false"}}
+        )
+        assert list_products(2, "bearer") == ([], False)
+
+    @patch("clients.sankhya.http.requests.Session.get")
+    def test_raises_without_product_list(self, mock_get):
+        """Resposta sem a lista de produtos é inválida."""
+        mock_get.return_value = _response(200, {"error": "x"})
+        with pytest.raises(SankhyaProductError):
+            list_products(1, "bearer")
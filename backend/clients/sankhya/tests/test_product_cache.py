@@ -0,0 +1,236 @@
+"""Testes do cache de produtos (clients.sankhya.product_cache)."""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+
+from clients.sankhya.exceptions import (
+    SankhyaProductError,
+    SankhyaProductNotFoundError,
+)
+from clients.sankhya.product_cache import (
+    RefreshPool,
+    get_cached_product,
+    get_cached_products,
+    product_cache_stats,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def ttls():
+    with patch.object(settings, "SANKHYA_PRODUCT_CACHE_TTL", 100):
+        with patch.object(settings, "SANKHYA_PRODUCT_STALE_TTL", 50):
+            with patch.object(settings, "SANKHYA_PRODUCT_NEGATIVE_TTL", 10):
+                yield
+
+
+@pytest.fixture
+def erp():
+    """get_product/get_valid_token do módulo de cache simulados."""
+    with patch("clients.sankhya.product_cache.get_valid_token", return_value="bearer"):
+        with patch("clients.sankhya.product_cache.get_product") as mock_get:
+            mock_get.return_value = {"codigoProduto": 123, "nome": "Produto X"}
+            yield mock_get
+
+
+@pytest.fixture
+def clock():
+    """Relógio controlado do módulo (time.time)."""
+    now = [1000.0]
+    with patch("clients.sankhya.product_cache.time.time", side_effect=lambda: now[0]):
+        yield now
+
+
+@pytest.fixture
+def inline_refresh():
+    """Renovação em segundo plano executada na hora (sem thread)."""
+    with patch("clients.sankhya.product_cache._refresh_pool.submit") as mock_submit:
+        mock_submit.side_effect = lambda fn, *args: fn(*args) or True
+        yield mock_submit
+
+
+class TestGetCachedProduct:
+    """get_cached_product (TTL, negativo, stale-while-revalidate)."""
+
+    def test_second_lookup_is_served_from_cache(self, ttls, erp, clock):
+        """Só a primeira consulta vai ao ERP dentro do TTL."""
+        assert get_cached_product(123) == {"codigoProduto": 123, "nome": "Produto X"}
+        clock[0] += 99
+        assert get_cached_product(123)["nome"] == "Produto X"
+
+        erp.assert_called_once_with(123, "bearer")
+        assert product_cache_stats() == {
+            "hits": 1,
+            "stale_hits": 0,
+            "negative_hits": 0,
+            "misses": 1,
+        }
+
+    def test_hit_does_not_request_token(self, ttls, erp, clock):
+        """Hit não pede token (não há login quando tudo está em cache)."""
+        get_cached_product(123)
+        with patch("clients.sankhya.product_cache.get_valid_token") as mock_token:
+            get_cached_product(123)
+        mock_token.assert_not_called()
+
+    def test_not_found_is_cached_briefly(self, ttls, erp, clock):
+        """404 vira entrada negativa até o NEGATIVE_TTL."""
+        erp.side_effect = SankhyaProductNotFoundError("Produto não encontrado.")
+        with pytest.raises(SankhyaProductError):
+            get_cached_product(999)
+        with pytest.raises(SankhyaProductError, match="Produto não encontrado"):
+            get_cached_product(999)
+
+        erp.assert_called_once()
+        assert product_cache_stats()["negative_hits"] == 1
+
+    def test_other_errors_are_not_cached(self, ttls, erp, clock):
+        """Erro genérico do ERP não é cacheado."""
+        erp.side_effect = SankhyaProductError("Sankhya produtos retornou status 500.")
+        for _ in range(2):
+            with pytest.raises(SankhyaProductError):
+                get_cached_product(123)
+        assert erp.call_count == 2
+
+    def test_stale_entry_is_served_and_refreshed_once(
+        self, ttls, erp, clock, inline_refresh
+    ):
+        """Depois do TTL serve o valor velho e dispara uma renovação."""
+        get_cached_product(123)
+        clock[0] += 120
+        erp.return_value = {"codigoProduto": 123, "nome": "Produto Novo"}
+
+        assert get_cached_product(123)["nome"] == "Produto X"
+        assert get_cached_product(123)["nome"] == "Produto Novo"
+        assert erp.call_count == 2
+        assert product_cache_stats()["stale_hits"] == 1
+
+    def test_only_one_refresh_runs_per_code(self, ttls, erp, clock):
+        """Com a trava ocupada, outras requisições só servem o valor velho."""
+        get_cached_product(123)
+        clock[0] += 120
+        with patch("clients.sankhya.product_cache._refresh_pool.submit") as mock_submit:
+            get_cached_product(123)
+            get_cached_product(123)
+        mock_submit.assert_called_once()
+
+    def test_refresh_is_dropped_when_pool_is_full(self, ttls, erp, clock):
+        """Fila cheia: serve o valor velho, libera a trava e não cria thread."""
+        get_cached_product(123)
+        clock[0] += 120
+        with patch(
+            "clients.sankhya.product_cache._refresh_pool.submit", return_value=False
+        ):
+            assert get_cached_product(123)["nome"] == "Produto X"
+        assert cache.get("sankhya:v1:product:123:refresh") is None
+        erp.assert_called_once()
+
+    def test_failed_refresh_keeps_stale_entry(self, ttls, erp, clock, inline_refresh):
+        """ERP fora do ar durante a renovação: a entrada velha continua servida."""
+        get_cached_product(123)
+        clock[0] += 120
+        erp.side_effect = SankhyaProductError("Erro de rede ao buscar produto.")
+
+        assert get_cached_product(123)["nome"] == "Produto X"
+        assert get_cached_product(123)["nome"] == "Produto X"
+
+    def test_ttl_zero_disables_cache(self, erp):
+        """SANKHYA_PRODUCT_CACHE_TTL=0 vai sempre ao ERP."""
+        with patch.object(settings, "SANKHYA_PRODUCT_CACHE_TTL", 0):
+            get_cached_product(123)
+            get_cached_product(123)
+        assert erp.call_count == 2
+        assert product_cache_stats()["misses"] == 0
+
+
+class TestGetCachedProducts:
+    """get_cached_products (lote com fan-out limitado)."""
+
+    def test_fetches_misses_concurrently_with_one_token(self, ttls, clock):
+        """Misses em paralelo (até SANKHYA_BATCH_WORKERS), um único get_valid_token."""
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def fake_get_product(code, token):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            return {"codigoProduto": code}
+
+        with patch.object(settings, "SANKHYA_BATCH_WORKERS", 3):
+            with patch(
+                "clients.sankhya.product_cache.get_valid_token", return_value="bearer"
+            ) as mock_token:
+                with patch(
+                    "clients.sankhya.product_cache.get_product",
+                    side_effect=fake_get_product,
+                ):
+                    results = get_cached_products(list(range(9)))
+
+        assert results == {code: {"codigoProduto": code} for code in range(9)}
+        mock_token.assert_called_once()
+        assert peak[0] == 3
+
+    def test_errors_are_returned_per_code(self, ttls, erp, clock):
+        """Erro de um código volta como exceção só para ele."""
+
+        def fake_get_product(code, token):
+            if code == 2:
+                raise SankhyaProductNotFoundError("Produto não encontrado.")
+            return {"codigoProduto": code}
+
+        erp.side_effect = fake_get_product
+        results = get_cached_products([1, 2])
+        assert results[1] == {"codigoProduto": 1}
+        assert isinstance(results[2], SankhyaProductError)
+
+
+class TestNegativeEntries:
+    """Entrada negativa depende do tipo da exceção, não da mensagem."""
+
+    def test_not_found_with_other_message_is_cached(self, ttls, erp, clock):
+        """404 com outro texto continua cacheado como negativo."""
+        erp.side_effect = SankhyaProductNotFoundError("Product not found")
+        for _ in range(2):
+            with pytest.raises(SankhyaProductNotFoundError):
+                get_cached_product(999)
+        erp.assert_called_once()
+
+    def test_generic_error_with_not_found_text_is_not_cached(self, ttls, erp, clock):
+        """Erro genérico com o mesmo texto do 404 não vira entrada negativa."""
+        erp.side_effect = SankhyaProductError("Produto não encontrado.")
+        for _ in range(2):
+            with pytest.raises(SankhyaProductError):
+                get_cached_product(999)
+        assert erp.call_count == 2
+
+
+class TestRefreshPool:
+    """Pool das renovações em segundo plano (limite de pendentes)."""
+
+    def test_submit_is_refused_beyond_max_pending(self):
+        pool = RefreshPool(workers=1, max_pending=2)
+        release = threading.Event()
+        done = []
+
+        assert pool.submit(release.wait)
+        assert pool.submit(done.append, "segunda")
+        assert not pool.submit(done.append, "descartada")
+
+        release.set()
+        pool._executor.shutdown(wait=True)
+        assert done == ["segunda"]
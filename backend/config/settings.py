@@ -194,6 +194,7 @@ REST_FRAMEWORK = {
         "anon": "100/day",
         "user": "2000/day",
         "sankhya": "60/min",  # Proteção específica para o ERP
+        "history_changes": "120/min",  # Feed changes/ do histórico (polling)
     },
 }
 
@@ -251,11 +252,29 @@ CORS_ALLOWED_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "").split(",")
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Permite ao frontend ler o ETag para requisições condicionais (If-None-Match)
+CORS_EXPOSE_HEADERS = ["ETag"]
+
 # =========================================================
 # DEFAULT FIELD
 # =========================================================
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# =========================================================
+# HISTÓRICO (INVENTORY)
+# =========================================================
+# immediate (padrão): grava na transação da requisição; deferred: um
+# bulk_create no commit; background: thread grava em lotes após o commit.
+INVENTORY_HISTORY_WRITER = os.getenv("HISTORY_WRITER_MODE", "immediate")
+# Janela (segundos) para juntar edições seguidas do mesmo slot/usuário em um
+# único UPDATE no histórico; 0 desliga (ver apps/inventory/compaction.py)
+INVENTORY_HISTORY_COMPACT_WINDOW = int(os.getenv("HISTORY_COMPACT_WINDOW", "0"))
+# Destino dos arquivos do comando archive_history (JSONL.gz + manifestos)
+HISTORY_ARCHIVE_DIR = Path(os.getenv("HISTORY_ARCHIVE_DIR", BASE_DIR / "archive"))
+# Long-poll do feed changes/ (?wait=): espera máxima em segundos (teto 10);
+# 0 desliga. Cada espera prende um worker: só com gunicorn gthread/ASGI
+INVENTORY_CHANGE_FEED_MAX_WAIT = int(os.getenv("CHANGE_FEED_MAX_WAIT", "0"))
+
 # =========================================================
 # SANKHYA API (Base URL, AppKey, Token)
 # =========================================================
@@ -264,3 +283,31 @@ SANKHYA_APPKEY = os.getenv("SANKHYA_APPKEY", "")
 SANKHYA_TOKEN = os.getenv("SANKHYA_TOKEN", "")
 SANKHYA_USER = os.getenv("SANKHYA_USER", "")
 SANKHYA_PASSWORD = os.getenv("SANKHYA_PASSWORD", "")
+# Token: a trava de renovação em voo único (cache.add) só é compartilhada entre
+# processos com REDIS_URL; com LocMemCache cada worker faz o próprio /login.
+# SANKHYA_TOKEN_REFRESHER sobe no AppConfig.ready() uma thread por processo que
+# renova o token antes de expirar (para servidores web, não para comandos).
+# Com gunicorn --preload a thread ficaria só no master: não use os dois juntos.
+SANKHYA_TOKEN_REFRESHER = os.getenv("SANKHYA_TOKEN_REFRESHER", "False").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+# Sessão HTTP compartilhada (clients/sankhya/http.py): conexões keep-alive no
+# pool e timeouts (segundos) de conexão e de leitura
+SANKHYA_HTTP_POOL_SIZE = int(os.getenv("SANKHYA_HTTP_POOL_SIZE", "10"))
+SANKHYA_HTTP_CONNECT_TIMEOUT = float(os.getenv("SANKHYA_HTTP_CONNECT_TIMEOUT", "5"))
+SANKHYA_HTTP_READ_TIMEOUT = float(os.getenv("SANKHYA_HTTP_READ_TIMEOUT", "30"))
+# Retry de erro de conexão/timeout/5xx: novas tentativas, backoff base e teto
+# (exponencial com jitter) e tempo total máximo da chamada, em segundos
+SANKHYA_HTTP_RETRIES = int(os.getenv("SANKHYA_HTTP_RETRIES", "3"))
+SANKHYA_HTTP_BACKOFF = float(os.getenv("SANKHYA_HTTP_BACKOFF", "0.2"))
+SANKHYA_HTTP_BACKOFF_MAX = float(os.getenv("SANKHYA_HTTP_BACKOFF_MAX", "2"))
+SANKHYA_HTTP_RETRY_BUDGET = float(os.getenv("SANKHYA_HTTP_RETRY_BUDGET", "10"))
+# Cache de produtos (segundos): fresco, janela servida velha enquanto renova e
+# 404 cacheado; TTL 0 desliga (ver clients/sankhya/product_cache.py)
+SANKHYA_PRODUCT_CACHE_TTL = int(os.getenv("SANKHYA_PRODUCT_CACHE_TTL", "3600"))
+SANKHYA_PRODUCT_STALE_TTL = int(os.getenv("SANKHYA_PRODUCT_STALE_TTL", "600"))
+SANKHYA_PRODUCT_NEGATIVE_TTL = int(os.getenv("SANKHYA_PRODUCT_NEGATIVE_TTL", "60"))
+# Consulta em lote: produtos buscados no ERP ao mesmo tempo (<= SANKHYA_HTTP_POOL_SIZE)
+SANKHYA_BATCH_WORKERS = int(os.getenv("SANKHYA_BATCH_WORKERS", "8"))